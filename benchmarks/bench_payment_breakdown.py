@@ -0,0 +1,179 @@
+"""
+Benchmark dos totais por forma de pagamento.
+
+Compara, sobre uma tabela de vendas sintética (1.000.000 de linhas por
+padrão), três formas de calcular os totais de separating_sales_by_payments:
+
+- legado: carrega todas as vendas da empresa e soma em Python;
+- group_by: agregação no banco (GROUP BY payment_method), com e sem
+  janela de datas e filtro de caixa;
+- resumo: leitura do resumo diário (core/sales_rollup.py).
+
+Uso (SQLite em arquivo temporário), a partir da raiz do repositório:
+
+    python benchmarks/bench_payment_breakdown.py --rows 1000000
+
+O banco é descartável: as chaves estrangeiras ficam desligadas para que
+as vendas possam ser inseridas sem criar produtos e funcionários.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict
+
+# Pacote em src/ (layout do setup.py)
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')
+)
+
+from tortoise import Tortoise  # noqa: E402
+
+from qodo.conf.database import DatabaseConfig  # noqa: E402
+from qodo.controllers.sales.separate_payment_methods import (  # noqa: E402
+    _aggregate_sales,
+)
+from qodo.core.sales_rollup import TIMEZONE, sales_rollup  # noqa: E402
+from qodo.model.sale import PaymentMethods, Sales  # noqa: E402
+
+USER_ID = 1
+INSERT_BATCH = 50_000
+
+INSERT_SQL = (
+    'INSERT INTO sales (product_name, quantity, total_price, lucro_total, '
+    'cost_price, sale_code, payment_method, criado_em, usuario_id, '
+    'funcionario_id, produto_id, caixa_id) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+
+async def _populate(rows: int, days: int) -> None:
+    connection = Tortoise.get_connection('default')
+    await connection.execute_script('PRAGMA foreign_keys = OFF;')
+
+    methods = [method.value for method in PaymentMethods]
+    start = datetime.now(TIMEZONE).replace(tzinfo=None) - timedelta(days=days)
+    seconds = days * 86400
+    rng = random.Random(42)
+
+    for offset in range(0, rows, INSERT_BATCH):
+        batch = []
+        for index in range(offset, min(offset + INSERT_BATCH, rows)):
+            quantity = rng.randint(1, 5)
+            price = round(rng.uniform(2, 80), 2)
+            cost = round(price * 0.6, 2)
+            batch.append(
+                (
+                    f'Produto {index % 500}',
+                    quantity,
+                    price * quantity,
+                    (price - cost) * quantity,
+                    cost * quantity,
+                    f'{index // 3:06X}'[-6:],
+                    rng.choice(methods),
+                    start
+                    + timedelta(seconds=seconds * index // max(rows, 1)),
+                    USER_ID,
+                    rng.choice((None, 1, 2, 3)),
+                    index % 500 + 1,
+                    rng.randint(1, 4),
+                )
+            )
+        await connection.execute_many(INSERT_SQL, batch)
+
+
+async def _legacy() -> Dict[str, Any]:
+    """Implementação anterior: todas as vendas carregadas e somadas."""
+    methods: Dict[str, Dict[str, Any]] = {
+        method.value: {'total_value': 0.0, 'total_quantity': 0}
+        for method in PaymentMethods
+    }
+    for sale in await Sales.filter(usuario_id=USER_ID):
+        key = sale.payment_method.upper()
+        if key in methods:
+            methods[key]['total_value'] += sale.total_price
+            methods[key]['total_quantity'] += sale.quantity
+    return methods
+
+
+async def _timed(
+    label: str, func: Callable[[], Awaitable[Any]], repeat: int
+) -> None:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - started)
+    print(f'{label:<32} {min(timings) * 1000:>10.1f} ms')
+
+
+async def main(rows: int, days: int, repeat: int, db_path: str) -> None:
+    config = DatabaseConfig.get_sqlite_config(db_path)
+    await Tortoise.init(config=config)
+    await Tortoise.generate_schemas()
+
+    try:
+        started = time.perf_counter()
+        await _populate(rows, days)
+        elapsed = time.perf_counter() - started
+        print(f'{rows} vendas inseridas em {elapsed:.1f}s')
+
+        started = time.perf_counter()
+        await sales_rollup.rebuild(USER_ID)
+        elapsed = time.perf_counter() - started
+        print(f'resumo diário construído em {elapsed:.1f}s')
+
+        today = datetime.now(TIMEZONE).date()
+        week = today - timedelta(days=7)
+
+        await _timed('legado (todas as vendas)', _legacy, min(repeat, 2))
+        await _timed(
+            'group_by (histórico)',
+            lambda: _aggregate_sales(USER_ID, None, None, None, None),
+            repeat,
+        )
+        await _timed(
+            'group_by (7 dias)',
+            lambda: _aggregate_sales(USER_ID, week, today, None, None),
+            repeat,
+        )
+        await _timed(
+            'group_by (7 dias, caixa 1)',
+            lambda: _aggregate_sales(USER_ID, week, today, 1, None),
+            repeat,
+        )
+        await _timed(
+            'resumo (histórico)',
+            lambda: sales_rollup.by_payment(USER_ID),
+            repeat,
+        )
+        await _timed(
+            'resumo (7 dias, funcionário 1)',
+            lambda: sales_rollup.by_payment(USER_ID, week, today, 1),
+            repeat,
+        )
+    finally:
+        await Tortoise.close_connections()
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--db',
+        default=os.path.join(tempfile.mkdtemp(), 'bench_sales.db'),
+        help='Arquivo SQLite (descartável)',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    asyncio.run(main(args.rows, args.days, args.repeat, args.db))
@@ -69,6 +69,7 @@ setup(
         'console_scripts': [
             'qodo-pdv=qodo.main:main',
             'qodo-server=qodo.main:main',
+            'qodo-import=qodo.utils.import_products:main',
         ],
     },
     
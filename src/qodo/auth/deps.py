@@ -41,6 +41,13 @@ class SystemUser(BaseModel):
     model_config = {'from_attributes': True}
 
 
+def get_company_id(current_user: SystemUser) -> int:
+    """Empresa do usuário: o funcionário usa empresa_id; o dono, o ID."""
+    return (
+        current_user.empresa_id if current_user.empresa_id else current_user.id
+    )
+
+
 async def get_current_user(
     token: str = Depends(reuseable_oauth),
 ) -> SystemUser:
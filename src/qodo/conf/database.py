@@ -7,6 +7,8 @@ from dotenv import load_dotenv
 from tortoise import Tortoise
 from tortoise.exceptions import ConfigurationError
 
+from qodo.conf.migrations import apply_migrations
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -39,6 +41,12 @@ class DatabaseConfig:
                         'qodo.model.partial',
                         'qodo.model.carItems',
                         'qodo.model.product',
+                        'qodo.model.catalog',
+                        'qodo.model.stock_alert',
+                        'qodo.model.stock_entry',
+                        'qodo.model.stock_movement',
+                        'qodo.model.sales_rollup',
+                        'qodo.model.abc_curve',
                         'qodo.model.fornecedor',
                         'qodo.model.membros',
                         'qodo.model.cnpjCache',
@@ -90,6 +98,12 @@ class DatabaseConfig:
                             'qodo.model.partial',
                             'qodo.model.carItems',
                             'qodo.model.product',
+                            'qodo.model.catalog',
+                            'qodo.model.stock_alert',
+                            'qodo.model.stock_entry',
+                            'qodo.model.stock_movement',
+                            'qodo.model.sales_rollup',
+                            'qodo.model.abc_curve',
                             'qodo.model.fornecedor',
                             'qodo.model.membros',
                             'qodo.model.cnpjCache',
@@ -124,6 +138,10 @@ async def init_database(config: Optional[Dict[str, Any]] = None) -> bool:
         await Tortoise.init(config=config)
         print('✅ Tortoise ORM inicializado!')
 
+        # Colunas/índices novos em tabelas existentes (antes do
+        # generate_schemas e do backfill das chaves de busca)
+        await apply_migrations()
+
         # Cria as tabelas se não existirem
         await Tortoise.generate_schemas()
         print('✅ Tabelas criadas/verificadas!')
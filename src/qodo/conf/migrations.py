@@ -0,0 +1,157 @@
+# src/conf/migrations.py
+from typing import List, Set, Tuple
+
+from tortoise import Tortoise
+
+from qodo.logs.infos import LOGGER
+from qodo.model.customers import Customer
+from qodo.model.fornecedor import Fornecedor
+from qodo.model.product import Produto
+from qodo.model.sale import Sales
+
+"""
+migrations: Colunas e índices novos em tabelas que já existem.
+
+`generate_schemas` só cria as tabelas que ainda não existem: colunas
+acrescentadas depois aos modelos nunca chegam a um banco já em uso.
+`apply_migrations` roda na inicialização (init_database), antes do
+generate_schemas e do backfill das chaves de busca, e é idempotente:
+consulta o catálogo do banco e só executa o que falta
+(ALTER TABLE ... ADD COLUMN e CREATE INDEX). Tabelas que ainda não existem
+são ignoradas; o generate_schemas as cria completas.
+
+Para uma coluna nova: acrescentar a linha em COLUMNS (definição válida no
+SQLite e no MySQL) e os índices que a usam em INDEXES.
+"""
+
+# (modelo, coluna, definição SQL)
+COLUMNS = [
+    (Produto, 'search_name', 'VARCHAR(150) NULL'),
+    (Customer, 'search_name', 'VARCHAR(150) NULL'),
+    (Fornecedor, 'search_name', 'VARCHAR(200) NULL'),
+    (Fornecedor, 'search_trade_name', 'VARCHAR(200) NULL'),
+    (Produto, 'catalog_version', 'BIGINT NOT NULL DEFAULT 0'),
+    (Produto, 'image_hash', 'VARCHAR(64) NULL'),
+]
+
+# (modelo, colunas do índice)
+INDEXES = [
+    (Produto, ('search_name',)),
+    (Customer, ('search_name',)),
+    (Fornecedor, ('search_name',)),
+    (Fornecedor, ('search_trade_name',)),
+    (Produto, ('usuario_id', 'catalog_version')),
+    (Produto, ('usuario_id', 'date_expired')),
+    (Produto, ('image_hash',)),
+    (Sales, ('usuario_id', 'criado_em')),
+]
+
+
+class _Schema:
+    """Consulta ao catálogo do banco (SQLite ou MySQL)."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.dialect = connection.capabilities.dialect
+
+    def quote(self, name: str) -> str:
+        return f'`{name}`' if self.dialect == 'mysql' else f'"{name}"'
+
+    async def _rows(self, sql: str, *values) -> List[dict]:
+        return await self.connection.execute_query_dict(sql, list(values))
+
+    async def tables(self) -> Set[str]:
+        if self.dialect == 'mysql':
+            rows = await self._rows(
+                'SELECT TABLE_NAME AS name FROM information_schema.TABLES '
+                'WHERE TABLE_SCHEMA = DATABASE()'
+            )
+        else:
+            rows = await self._rows(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        return {row['name'] for row in rows}
+
+    async def columns(self, table: str) -> Set[str]:
+        if self.dialect == 'mysql':
+            rows = await self._rows(
+                'SELECT COLUMN_NAME AS name FROM information_schema.COLUMNS '
+                'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                table,
+            )
+        else:
+            rows = await self._rows(f'PRAGMA table_info({self.quote(table)})')
+        return {row['name'] for row in rows}
+
+    async def indexes(self, table: str) -> Set[Tuple[str, ...]]:
+        """Colunas (em ordem) de cada índice da tabela."""
+        if self.dialect == 'mysql':
+            rows = await self._rows(
+                'SELECT INDEX_NAME AS idx, COLUMN_NAME AS col '
+                'FROM information_schema.STATISTICS '
+                'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s '
+                'ORDER BY INDEX_NAME, SEQ_IN_INDEX',
+                table,
+            )
+        else:
+            rows = []
+            for index in await self._rows(
+                f'PRAGMA index_list({self.quote(table)})'
+            ):
+                info = await self._rows(
+                    f"PRAGMA index_info({self.quote(index['name'])})"
+                )
+                rows += [
+                    {'idx': index['name'], 'col': column['name']}
+                    for column in sorted(info, key=lambda c: c['seqno'])
+                ]
+
+        by_index = {}
+        for row in rows:
+            by_index.setdefault(row['idx'], []).append(row['col'])
+        return {tuple(columns) for columns in by_index.values()}
+
+
+async def apply_migrations(connection_name: str = 'default') -> List[str]:
+    """
+    Acrescenta as colunas e índices que faltam; retorna os comandos
+    executados (lista vazia quando o banco já está em dia).
+    """
+    connection = Tortoise.get_connection(connection_name)
+    schema = _Schema(connection)
+    if schema.dialect not in ('sqlite', 'mysql'):
+        LOGGER.warning(f'Migrações não suportadas para {schema.dialect}')
+        return []
+
+    tables = await schema.tables()
+    executed = []
+
+    for model, column, definition in COLUMNS:
+        table = model._meta.db_table
+        if table not in tables or column in await schema.columns(table):
+            continue
+        sql = (
+            f'ALTER TABLE {schema.quote(table)} '
+            f'ADD COLUMN {schema.quote(column)} {definition}'
+        )
+        await connection.execute_script(sql)
+        executed.append(sql)
+
+    for model, columns in INDEXES:
+        table = model._meta.db_table
+        if table not in tables or columns in await schema.indexes(table):
+            continue
+        name = f"idx_{table}_{'_'.join(columns)}"[:64]
+        sql = (
+            f'CREATE INDEX {schema.quote(name)} ON {schema.quote(table)} '
+            f"({', '.join(schema.quote(column) for column in columns)})"
+        )
+        await connection.execute_script(sql)
+        executed.append(sql)
+
+    for sql in executed:
+        LOGGER.info(f'Migração aplicada: {sql}')
+    return executed
+
+
+__all__ = ['apply_migrations']
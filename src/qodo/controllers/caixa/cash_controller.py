@@ -8,6 +8,8 @@ from tortoise.transactions import in_transaction
 
 from qodo.controllers.sales.note import Note
 from qodo.controllers.sales.sales import Checkout
+from qodo.core.barcode_map import barcode_map
+from qodo.core.cache_tags import TAG_CASH, TAG_SALES, tagged_cache
 from qodo.logs.infos import LOGGER
 from qodo.model.caixa import Caixa
 from qodo.model.cashmovement import CashMovement
@@ -76,8 +78,16 @@ class CashController:
             usuario_id=company_id,
             funcionario_id=funcionario_id,
         )
+        await tagged_cache.bump(company_id, TAG_CASH)
 
         print(f'✅ Caixa aberto para {employee.nome}: ID {caixa.caixa_id}')
+
+        # Pré-carrega o mapa de códigos de barras para a primeira leitura
+        try:
+            await barcode_map.preload(company_id)
+        except Exception as e:
+            LOGGER.warning(f'Falha ao pré-carregar mapa de códigos: {e}')
+
         return caixa
 
     @staticmethod
@@ -122,6 +132,7 @@ class CashController:
         )
 
         await caixa.save()
+        await tagged_cache.bump(caixa.usuario_id, TAG_CASH, TAG_SALES)
 
         return caixa
 
@@ -325,6 +336,7 @@ class CashController:
                 usuario_id=checkout.usuario_id,
                 funcionario_id=checkout.funcionario_id,
             )
+            await tagged_cache.bump(checkout.usuario_id, TAG_CASH)
 
             # 5. Prepara os dados de retorno
             response_data.append(
@@ -608,6 +620,7 @@ class FinalizationObjcts:
             # Atualiza a venda com o caixa_id
             venda_obj.caixa_id = caixa.id
             await venda_obj.save()
+            await tagged_cache.bump(caixa.usuario_id, TAG_CASH, TAG_SALES)
 
             print(
                 f'✅ Finalização concluída. Venda #{venda_obj.id}, Caixa atualizado, Nota gerada.'
@@ -1,4 +1,3 @@
-import json
 from datetime import date, datetime
 from typing import Optional
 from zoneinfo import ZoneInfo
@@ -6,8 +5,9 @@ from zoneinfo import ZoneInfo
 from fastapi import HTTPException, status
 from tortoise.expressions import Q
 
-# Cache Redis
-from qodo.core.cache import client
+# Cache Redis (chaves versionadas por tag)
+from qodo.core.cache_tags import TAG_CASH, TAG_SALES
+from qodo.core.cached import cached
 from qodo.model.caixa import Caixa
 from qodo.model.cashmovement import CashMovement
 from qodo.model.employee import Employees
@@ -18,6 +18,11 @@ from qodo.utils.status_code import *
 
 
 class CashReportController:
+    @cached(
+        'cash_reports:{user_id}:{filter_data}:{employee_name}',
+        ttl=1800,
+        tags=(TAG_CASH, TAG_SALES),
+    )
     async def get_cash_reports(
         self,
         user_id: int,
@@ -30,15 +35,6 @@ class CashReportController:
         # Define a data padrão se nenhuma for fornecida
         current_date_tz = datetime.now(ZoneInfo('America/Sao_Paulo'))
 
-        # 🔹 Chave do cache melhorada
-        cache_key = f'cash_reports:{user_id}:{filter_data}:{employee_name}'
-        cache = await client.get(cache_key)
-
-        # 🔹 Tenta retornar do cache se a chave existir
-        if cache:
-            print(f'✅ Retornando dados do cache para a chave: {cache_key}')
-            return json.loads(cache)
-
         current_user = await Usuario.get_or_none(id=user_id)
         if not current_user:
             raise HTTPException(
@@ -127,10 +123,6 @@ class CashReportController:
 
         # 🔹 CORREÇÃO: Ordenar por data mais recente primeiro
         movement_data.sort(key=lambda x: x['data_hora'], reverse=True)
-
-        await client.setex(
-            cache_key, 300, json.dumps(movement_data)
-        )  # 5 minutos de cache
         return movement_data
 
     async def get_cash_summary(
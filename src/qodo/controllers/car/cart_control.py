@@ -4,7 +4,11 @@ from decimal import ROUND_HALF_UP, Decimal
 from typing import Any, Dict, List, Optional
 
 from fastapi import HTTPException, status
+from tortoise.transactions import in_transaction
 
+from qodo.core.barcode_map import barcode_map
+from qodo.core.catalog import stamp, stock_changed
+from qodo.core.stock_ledger import CART, stock_ledger
 from qodo.model.caixa import Caixa
 from qodo.model.carItems import CartItem
 from qodo.model.product import Produto
@@ -129,6 +133,34 @@ class CartManagerDB:
         self._produto_cache[cache_key] = produto
         return produto
 
+    async def adicionar_por_codigo(
+        self, code: str, quantity: int = 1
+    ) -> Dict[str, Any]:
+        """
+        Adiciona produto ao carrinho a partir do código lido pelo scanner.
+
+        Args:
+            code: product_code ou lot_bar_code
+            quantity: Quantidade a adicionar
+
+        Returns:
+            Dict: Resultado da operação (mesmo formato de add_produto)
+
+        Raises:
+            HTTPException: Se o código não corresponder a um produto ativo
+        """
+        record = await barcode_map.resolve(self.company_id, code)
+        if not record:
+            logger.warning(
+                f'Código {code} não encontrado para empresa {self.company_id}'
+            )
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='Produto não encontrado para o código informado.',
+            )
+
+        return await self.add_produto(product_id=record.id, quantity=quantity)
+
     def _calcular_total(
         self,
         price: Decimal,
@@ -223,9 +255,23 @@ class CartManagerDB:
                 addition=0.0,
             )
 
-            # Atualiza estoque
-            produto.stock -= quantity
-            await produto.save()
+            # Atualiza estoque (histórico e versão na mesma transação)
+            async with in_transaction():
+                produto.stock -= quantity
+                await produto.save()
+                await stock_ledger.record(
+                    self.company_id,
+                    {produto.id: -quantity},
+                    CART,
+                    reference=f'caixa:{caixa.caixa_id}',
+                )
+                version = await stamp(self.company_id, changed=(produto.id,))
+            await stock_changed(
+                self.company_id,
+                produto.id,
+                deltas={produto.id: -quantity},
+                version=version,
+            )
             self._produto_cache.pop(
                 f'prod_{self.company_id}_{product_id}', None
             )  # Invalida cache
@@ -410,8 +456,24 @@ class CartManagerDB:
                 f'Removendo produto por quantidade zero - Produto: {produto.id}'
             )
             if produto:
-                produto.stock += old_quantity
-                await produto.save()
+                async with in_transaction():
+                    produto.stock += old_quantity
+                    await produto.save()
+                    await stock_ledger.record(
+                        self.company_id,
+                        {produto.id: old_quantity},
+                        CART,
+                        reference=f'caixa:{cart_item.caixa_id}',
+                    )
+                    version = await stamp(
+                        self.company_id, changed=(produto.id,)
+                    )
+                await stock_changed(
+                    self.company_id,
+                    produto.id,
+                    deltas={produto.id: old_quantity},
+                    version=version,
+                )
                 self._produto_cache.pop(
                     f'prod_{self.company_id}_{produto.id}', None
                 )
@@ -433,8 +495,22 @@ class CartManagerDB:
 
         # Ajusta estoque
         if quantity_difference != 0 and produto:
-            produto.stock -= quantity_difference
-            await produto.save()
+            async with in_transaction():
+                produto.stock -= quantity_difference
+                await produto.save()
+                await stock_ledger.record(
+                    self.company_id,
+                    {produto.id: -quantity_difference},
+                    CART,
+                    reference=f'caixa:{cart_item.caixa_id}',
+                )
+                version = await stamp(self.company_id, changed=(produto.id,))
+            await stock_changed(
+                self.company_id,
+                produto.id,
+                deltas={produto.id: -quantity_difference},
+                version=version,
+            )
             self._produto_cache.pop(
                 f'prod_{self.company_id}_{produto.id}', None
             )
@@ -561,8 +637,24 @@ class CartManagerDB:
             produto = await self._get_produto(product_id)
 
             if produto:
-                produto.stock += quantidade_total
-                await produto.save()
+                async with in_transaction():
+                    produto.stock += quantidade_total
+                    await produto.save()
+                    await stock_ledger.record(
+                        self.company_id,
+                        {produto.id: quantidade_total},
+                        CART,
+                        reference=f'caixa:{caixa.caixa_id}',
+                    )
+                    version = await stamp(
+                        self.company_id, changed=(produto.id,)
+                    )
+                await stock_changed(
+                    self.company_id,
+                    produto.id,
+                    deltas={produto.id: quantidade_total},
+                    version=version,
+                )
                 self._produto_cache.pop(
                     f'prod_{self.company_id}_{product_id}', None
                 )
@@ -610,17 +702,35 @@ class CartManagerDB:
             if not itens:
                 return {'success': True, 'aviso': 'Carrinho já está vazio.'}
 
-            # Restaura estoques
-            for item in itens:
-                produto = await Produto.get_or_none(
-                    id=item.product_id, usuario_id=self.company_id
-                )
-                if produto:
-                    produto.stock += int(item.quantity or 0)
-                    await produto.save()
-                    self._produto_cache.pop(
-                        f'prod_{self.company_id}_{item.product_id}', None
+            # Restaura estoques, histórico e versão em uma transação
+            deltas: Dict[int, int] = {}
+            async with in_transaction():
+                for item in itens:
+                    produto = await Produto.get_or_none(
+                        id=item.product_id, usuario_id=self.company_id
                     )
+                    if produto:
+                        produto.stock += int(item.quantity or 0)
+                        await produto.save()
+                        deltas[produto.id] = deltas.get(produto.id, 0) + int(
+                            item.quantity or 0
+                        )
+                        self._produto_cache.pop(
+                            f'prod_{self.company_id}_{item.product_id}', None
+                        )
+
+                await stock_ledger.record(
+                    self.company_id,
+                    deltas,
+                    CART,
+                    reference=f'caixa:{caixa.caixa_id}',
+                )
+                version = await stamp(self.company_id, changed=deltas)
+
+            # Invalidação uma vez para o carrinho inteiro
+            await stock_changed(
+                self.company_id, *deltas, deltas=deltas, version=version
+            )
 
             # Limpa carrinho
             await CartItem.filter(caixa_id=caixa.caixa_id).delete()
@@ -0,0 +1,603 @@
+import asyncio
+import csv
+import itertools
+import os
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import orjson
+from pydantic import ValidationError
+from tortoise.transactions import in_transaction
+
+from qodo.core.cache import client
+from qodo.core.catalog import lock_version, products_bulk_changed, stamp
+from qodo.core.stock_ledger import ADJUSTMENT, stock_ledger
+from qodo.logs.infos import LOGGER
+from qodo.model.product import Produto
+from qodo.schemas.schema_product import (
+    ProductImportUpdateSchema,
+    ProductRegisterSchema,
+    ProductSector,
+    ProductStatus,
+    ProductType,
+)
+from qodo.utils.sales_code_generator import reserve_internal_eans
+from qodo.utils.text_normalize import normalize_text
+
+"""
+bulk_import: Importação em massa de produtos (CSV/XLSX).
+
+- O arquivo é lido linha a linha (csv.reader / openpyxl read_only),
+  então a memória não cresce com o tamanho do arquivo.
+- Cada linha é validada como cadastro (`ProductRegisterSchema`, com os
+  DEFAULTS) e como alteração (`ProductImportUpdateSchema`, só as células
+  preenchidas). Leitura e validação rodam em uma thread (um lote por vez),
+  fora do event loop; erros são registrados por linha e não interrompem a
+  importação.
+- A cada BATCH_SIZE linhas é feito um upsert pela chave
+  (usuario_id, product_code) em uma transação: a versão do catálogo é
+  travada primeiro (importações da mesma empresa rodam em fila), os
+  existentes são lidos com lock, os novos vão por `bulk_create` e os
+  demais por `bulk_update` só com as células preenchidas (célula em branco
+  não altera o produto). Quando a linha traz o estoque, a diferença para
+  o saldo atual é gravada no histórico (core/stock_ledger.py) como AJUSTE.
+- O progresso fica no cache (`import:job:{id}`) para ser consultado por
+  qualquer worker.
+"""
+
+BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '1000'))
+
+# Erros guardados por importação (os demais são apenas contados)
+MAX_ERRORS = 1000
+
+JOB_KEY = 'import:job:{job_id}'
+JOB_TTL = 86400
+
+TIMEZONE = ZoneInfo('America/Sao_Paulo')
+
+# Cabeçalhos aceitos além do próprio nome do campo
+COLUMN_ALIASES = {
+    'codigo': 'product_code',
+    'cod': 'product_code',
+    'codigo_produto': 'product_code',
+    'nome': 'name',
+    'produto': 'name',
+    'estoque': 'stock',
+    'quantidade': 'stock',
+    'estoque_minimo': 'stoke_min',
+    'estoque_maximo': 'stoke_max',
+    'validade': 'date_expired',
+    'data_validade': 'date_expired',
+    'fabricante': 'fabricator',
+    'custo': 'cost_price',
+    'preco_custo': 'cost_price',
+    'preco_unitario': 'price_uni',
+    'preco': 'sale_price',
+    'preco_venda': 'sale_price',
+    'preco_de_venda': 'sale_price',
+    'preco_de_custo': 'cost_price',
+    'fornecedor': 'supplier',
+    'ean': 'lot_bar_code',
+    'gtin': 'lot_bar_code',
+    'codigo_barras': 'lot_bar_code',
+    'codigo_de_barras': 'lot_bar_code',
+    'tipo': 'product_type',
+    'ativo': 'active',
+    'grupo': 'group',
+    'categoria': 'group',
+    'subgrupo': 'sub_group',
+    'setor': 'sector',
+    'unidade': 'unit',
+    'controla_estoque': 'controllstoke',
+}
+
+SCHEMA_FIELDS = frozenset(ProductRegisterSchema.model_fields)
+
+# Valores usados quando a planilha não traz a coluna
+DEFAULTS = {
+    'stoke_min': 0,
+    'stoke_max': 0,
+    'product_type': ProductType.COMMON.value,
+    'active': ProductStatus.YES.value,
+    'sector': ProductSector.RESALE.value,
+    'controllstoke': ProductStatus.YES.value,
+}
+
+FLOAT_FIELDS = frozenset({'cost_price', 'price_uni', 'sale_price'})
+INT_FIELDS = frozenset({'stock', 'stoke_min', 'stoke_max'})
+STATUS_FIELDS = frozenset({'active', 'controllstoke'})
+
+YES_VALUES = frozenset({'1', 'true', 's', 'sim', 'y', 'yes'})
+NO_VALUES = frozenset({'0', 'false', 'n', 'nao', 'no'})
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M')
+
+
+@dataclass
+class ImportRow:
+    """Linha validada como produto novo e como alteração de um existente."""
+
+    line: int
+    code: Optional[str]
+    create: Optional[Dict[str, Any]] = None
+    create_error: Optional[str] = None
+    update: Optional[Dict[str, Any]] = None
+    update_error: Optional[str] = None
+
+
+@dataclass
+class ImportJob:
+    """Estado de uma importação (serializado no cache a cada lote)."""
+
+    id: str
+    usuario_id: int
+    filename: str
+    status: str = 'pendente'
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    message: Optional[str] = None
+
+    def add_error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _column(header: Any) -> Optional[str]:
+    name = normalize_text(str(header or '')).replace(' ', '_')
+    if name in SCHEMA_FIELDS:
+        return name
+    return COLUMN_ALIASES.get(name)
+
+
+def _parse_date(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return value  # o schema acusa o erro
+
+
+def _clean(name: str, value: Any) -> Any:
+    """Converte o texto da planilha para o tipo esperado pelo schema."""
+    if isinstance(value, str):
+        value = value.strip()
+        if value == '':
+            return None
+
+    if name in FLOAT_FIELDS and isinstance(value, str):
+        # Aceita '1.234,56' e '1234.56'
+        if ',' in value:
+            value = value.replace('.', '').replace(',', '.')
+        return value
+    if name in INT_FIELDS and isinstance(value, (str, float)):
+        try:
+            number = float(str(value).replace(',', '.'))
+            return int(number) if number.is_integer() else value
+        except ValueError:
+            return value
+    if name in STATUS_FIELDS:
+        text = normalize_text(str(value))
+        if text in YES_VALUES:
+            return ProductStatus.YES.value
+        if text in NO_VALUES:
+            return ProductStatus.NO.value
+    if name == 'date_expired':
+        return _parse_date(value)
+    if name in ('product_code', 'lot_bar_code') and isinstance(value, float):
+        # Células numéricas do Excel (ex: EAN lido como 7891234567890.0)
+        return str(int(value))
+    if name in ('product_code', 'lot_bar_code', 'name') and not isinstance(
+        value, str
+    ):
+        return str(value)
+    return value
+
+
+def _map_row(
+    columns: List[Optional[str]], values: List[Any]
+) -> Dict[str, Any]:
+    row = {}
+    for name, value in zip(columns, values):
+        if name is None:
+            continue
+        value = _clean(name, value)
+        if value is not None:
+            row[name] = value
+    return row
+
+
+def _csv_rows(path: str) -> Iterator[List[Any]]:
+    """Linhas cruas do CSV (separador ',', ';' ou tab; UTF-8 com ou sem BOM)."""
+    with open(path, newline='', encoding='utf-8-sig', errors='replace') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(f, dialect)
+
+
+def _xlsx_rows(path: str) -> Iterator[List[Any]]:
+    """Linhas cruas da primeira planilha do XLSX (modo somente leitura)."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError(
+            'Importação de XLSX requer o pacote openpyxl '
+            '(pip install openpyxl).'
+        )
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for values in workbook.worksheets[0].iter_rows(values_only=True):
+            yield list(values)
+    finally:
+        workbook.close()
+
+
+def _raw_rows(path: str, filename: str) -> Iterator[List[Any]]:
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        return _xlsx_rows(path)
+    return _csv_rows(path)
+
+
+def read_columns(path: str, filename: str) -> List[Optional[str]]:
+    """Campos do Produto correspondentes ao cabeçalho do arquivo."""
+    rows = _raw_rows(path, filename)
+    try:
+        header = next(rows, None)
+    finally:
+        rows.close()
+    return [_column(name) for name in header or []]
+
+
+def iter_rows(
+    path: str, filename: str
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(número da linha, campos) de cada linha não vazia do arquivo."""
+    rows = _raw_rows(path, filename)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [_column(name) for name in header]
+    for line, values in enumerate(rows, start=2):
+        if any(str(value or '').strip() for value in values):
+            yield line, _map_row(columns, values)
+
+
+def _errors(error: ValidationError) -> str:
+    return '; '.join(
+        f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+def _parse_row(line: int, row: Dict[str, Any]) -> ImportRow:
+    parsed = ImportRow(line=line, code=row.get('product_code'))
+
+    # Produto existente: só as células preenchidas
+    try:
+        parsed.update = _to_changes(ProductImportUpdateSchema(**row))
+    except ValidationError as e:
+        parsed.update_error = _errors(e)
+
+    # Produto novo: cadastro completo, com os valores padrão
+    values = {**DEFAULTS, **row}
+    if 'price_uni' not in values and 'sale_price' in values:
+        values['price_uni'] = values['sale_price']
+    try:
+        parsed.create = _to_model(ProductRegisterSchema(**values))
+    except ValidationError as e:
+        parsed.create_error = _errors(e)
+    return parsed
+
+
+def read_chunk(
+    rows: Iterator[Tuple[int, Dict[str, Any]]], size: int
+) -> List[ImportRow]:
+    """
+    Lê e valida até `size` linhas (executado em uma thread).
+
+    Cada linha é validada dos dois jeitos; qual vale só se sabe no banco,
+    ao procurar o código. Lista vazia no fim do arquivo.
+    """
+    return [
+        _parse_row(line, row) for line, row in itertools.islice(rows, size)
+    ]
+
+
+def _to_model(prod: ProductRegisterSchema) -> Dict[str, Any]:
+    """Campos do Produto a partir do schema validado."""
+    return {
+        'product_code': prod.product_code,
+        'name': prod.name,
+        'search_name': normalize_text(prod.name),
+        'stock': prod.stock,
+        'stoke_min': prod.stoke_min,
+        'stoke_max': prod.stoke_max,
+        'date_expired': prod.date_expired,
+        'fabricator': prod.fabricator,
+        'cost_price': prod.cost_price,
+        'price_uni': prod.price_uni,
+        'sale_price': prod.sale_price,
+        'supplier': prod.supplier,
+        'lot_bar_code': prod.lot_bar_code,
+        'image_url': prod.image_url,
+        'product_type': prod.product_type.value,
+        'active': prod.active == ProductStatus.YES,
+        'group': prod.group,
+        'sub_group': prod.sub_group,
+        'ticket': prod.ticket or 'Novo',
+        'sector': prod.sector.value,
+        'unit': prod.unit,
+        'controllstoke': prod.controllstoke.value,
+        'sales_config': (
+            prod.sales_config.model_dump_json() if prod.sales_config else None
+        ),
+    }
+
+
+def _to_changes(prod: ProductImportUpdateSchema) -> Dict[str, Any]:
+    """Campos do Produto alterados pela linha (células preenchidas)."""
+    changes = prod.model_dump(exclude_unset=True, exclude={'product_code'})
+    for name, value in changes.items():
+        if isinstance(value, Enum):
+            changes[name] = value.value
+    if 'active' in changes:
+        changes['active'] = changes['active'] == ProductStatus.YES.value
+    if 'sales_config' in changes:
+        changes['sales_config'] = (
+            prod.sales_config.model_dump_json() if prod.sales_config else None
+        )
+    if 'name' in changes:
+        changes['search_name'] = normalize_text(prod.name)
+    return changes
+
+
+class ProductImporter:
+    """Executa uma importação e publica o progresso no cache."""
+
+    def __init__(self, job: ImportJob, path: str, remove_file: bool = True):
+        self.job = job
+        self.path = path
+        self.remove_file = remove_file
+
+    async def _save_progress(self) -> None:
+        try:
+            await client.setex(
+                JOB_KEY.format(job_id=self.job.id),
+                JOB_TTL,
+                orjson.dumps(self.job.as_dict()),
+            )
+        except Exception as e:
+            LOGGER.warning(f'Falha ao salvar progresso da importação: {e}')
+
+    async def _flush(self, batch: Dict[str, ImportRow]) -> None:
+        """Upsert de um lote (chave: product_code dentro da empresa)."""
+        if not batch:
+            return
+
+        user_id = self.job.usuario_id
+        now = datetime.now(TIMEZONE)
+        new_products = []
+        changed = []
+        deltas = {}
+        # Cada linha altera só as suas células: um bulk_update por conjunto
+        # de campos
+        by_fields: Dict[Tuple[str, ...], List[Produto]] = {}
+
+        async with in_transaction() as connection:
+            version = await lock_version(user_id, using_db=connection)
+            existing = {
+                code: (product_id, stock)
+                for code, product_id, stock in await Produto.filter(
+                    usuario_id=user_id, product_code__in=list(batch)
+                )
+                .using_db(connection)
+                .select_for_update()
+                .values_list('product_code', 'id', 'stock')
+            }
+
+            for code, row in batch.items():
+                if code not in existing:
+                    if row.create_error:
+                        self.job.add_error(row.line, row.create_error)
+                        continue
+                    new_products.append(
+                        Produto(
+                            usuario_id=user_id,
+                            criado_em=now,
+                            atualizado_em=now,
+                            **row.create,
+                        )
+                    )
+                    continue
+
+                if row.update_error:
+                    self.job.add_error(row.line, row.update_error)
+                    continue
+                product_id, stock = existing[code]
+                if 'stock' in row.update:
+                    # Saldo sobrescrito pela planilha: a diferença vai para
+                    # o histórico, como qualquer outra movimentação
+                    deltas[product_id] = row.update['stock'] - (stock or 0)
+                product = Produto(
+                    id=product_id, atualizado_em=now, **row.update
+                )
+                changed.append(product)
+                fields = tuple(sorted(row.update)) + ('atualizado_em',)
+                by_fields.setdefault(fields, []).append(product)
+
+            if new_products:
+                # Código de barras interno da sequência da empresa
+                without_code = [
+                    product
+                    for product in new_products
+                    if not product.lot_bar_code
+                ]
+                codes = await reserve_internal_eans(
+                    user_id, len(without_code), using_db=connection
+                )
+                for product, code in zip(without_code, codes):
+                    product.lot_bar_code = code
+                await Produto.bulk_create(
+                    new_products, batch_size=BATCH_SIZE, using_db=connection
+                )
+
+            for fields, products in by_fields.items():
+                await Produto.bulk_update(
+                    products,
+                    fields=list(fields),
+                    batch_size=BATCH_SIZE,
+                    using_db=connection,
+                )
+            await stock_ledger.record(
+                user_id,
+                deltas,
+                ADJUSTMENT,
+                reference=f'importacao:{self.job.id}',
+                using_db=connection,
+            )
+
+            # bulk_create não devolve os ids em todos os bancos: busca pelo
+            # código
+            product_ids = [product.id for product in changed]
+            if new_products:
+                product_ids += (
+                    await Produto.filter(
+                        usuario_id=user_id,
+                        product_code__in=[
+                            product.product_code for product in new_products
+                        ],
+                    )
+                    .using_db(connection)
+                    .values_list('id', flat=True)
+                )
+            await stamp(
+                user_id,
+                changed=product_ids,
+                using_db=connection,
+                version=version,
+            )
+
+        await products_bulk_changed(user_id, product_ids, version=version)
+
+        self.job.created += len(new_products)
+        self.job.updated += len(changed)
+
+    async def run(self) -> ImportJob:
+        job = self.job
+        job.status = 'processando'
+        job.started_at = datetime.now(TIMEZONE).isoformat()
+        await self._save_progress()
+
+        batch: Dict[str, ImportRow] = {}
+        try:
+            columns = await asyncio.to_thread(
+                read_columns, self.path, job.filename
+            )
+            if 'product_code' not in columns:
+                raise ValueError(
+                    'Arquivo sem a coluna de código do produto '
+                    '(product_code ou codigo).'
+                )
+
+            rows = iter_rows(self.path, job.filename)
+            try:
+                while True:
+                    chunk = await asyncio.to_thread(
+                        read_chunk, rows, BATCH_SIZE
+                    )
+                    if not chunk:
+                        break
+                    for row in chunk:
+                        job.processed += 1
+                        if not row.code:
+                            job.add_error(row.line, row.update_error)
+                            continue
+
+                        # Código repetido no mesmo lote: a última linha vale
+                        batch[row.code] = row
+                        if len(batch) >= BATCH_SIZE:
+                            await self._flush(batch)
+                            batch = {}
+                            await self._save_progress()
+            finally:
+                rows.close()
+
+            await self._flush(batch)
+            job.status = 'concluido'
+        except Exception as e:
+            LOGGER.error(f'Importação {job.id} falhou: {e}')
+            job.status = 'erro'
+            job.message = str(e)
+        finally:
+            job.finished_at = datetime.now(TIMEZONE).isoformat()
+            await self._save_progress()
+            if self.remove_file:
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+
+        LOGGER.info(
+            f'Importação {job.id}: {job.created} criados, {job.updated} '
+            f'atualizados, {job.failed} com erro'
+        )
+        return job
+
+
+class ImportJobs:
+    """Importações em andamento neste worker."""
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self, usuario_id: int, path: str, filename: str) -> ImportJob:
+        job = ImportJob(
+            id=uuid.uuid4().hex, usuario_id=usuario_id, filename=filename
+        )
+        task = asyncio.create_task(ProductImporter(job, path).run())
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job
+
+    async def get(self, job_id: str, usuario_id: int) -> Optional[Dict]:
+        raw = await client.get(JOB_KEY.format(job_id=job_id))
+        if not raw:
+            return None
+        data = orjson.loads(raw)
+        if data.get('usuario_id') != usuario_id:
+            return None
+        return data
+
+
+# Instância global
+import_jobs = ImportJobs()
+
+__all__ = [
+    'ImportJob',
+    'ImportRow',
+    'ProductImporter',
+    'import_jobs',
+    'iter_rows',
+    'read_chunk',
+    'read_columns',
+]
@@ -0,0 +1,316 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, UploadFile, status
+
+from qodo.core.cache import client
+from qodo.core.process_pool import run_cpu
+from qodo.logs.infos import LOGGER
+from qodo.model.product import Produto
+
+"""
+image_pipeline: Armazenamento das imagens de produto por conteúdo.
+
+1. O upload é copiado para um arquivo temporário em blocos (escrita fora
+   do event loop), calculando o SHA-256 no caminho; arquivos acima de
+   MAX_IMAGE_BYTES são recusados assim que o limite é ultrapassado.
+2. Se o hash já existe no armazenamento, nada é processado (a mesma
+   imagem usada por vários produtos é guardada uma vez).
+3. Senão o Pillow decodifica e gera as variantes WebP em VARIANTS no pool
+   de processos (core/process_pool.py).
+
+Layout: static/images/cas/<2 primeiros do hash>/<hash>/<variante>.webp,
+servido em IMAGE_URL_TEMPLATE com cache imutável.
+
+Trocar ou remover a imagem de um produto não apaga o conteúdo: outro
+upload do mesmo hash pode estar em andamento. A coleta periódica
+(`image_gc`) apaga os hashes sem produto que não foram gravados nem
+reaproveitados há mais de IMAGE_GC_GRACE segundos.
+"""
+
+IMAGES_DIR = Path('static/images')
+STORE_DIR = IMAGES_DIR / 'cas'
+
+# Lado máximo de cada variante (px); 'full' é a imagem de exibição
+VARIANTS = {'64': 64, '128': 128, '256': 256, '512': 512, 'full': 1280}
+DEFAULT_VARIANT = 'full'
+
+MAX_IMAGE_BYTES = int(os.getenv('IMAGE_MAX_BYTES', str(8 * 1024 * 1024)))
+
+# Imagens com mais pixels que isso são recusadas (descompressão maliciosa)
+MAX_IMAGE_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', str(40_000_000)))
+
+ALLOWED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp'}
+
+CHUNK_SIZE = 256 * 1024
+
+WEBP_QUALITY = 80
+
+# Idade mínima de um hash sem produto antes de ser apagado (segundos)
+IMAGE_GC_GRACE = int(os.getenv('IMAGE_GC_GRACE', '86400'))
+
+# Intervalo da coleta de imagens órfãs (segundos)
+IMAGE_GC_INTERVAL = int(os.getenv('IMAGE_GC_INTERVAL', '86400'))
+
+IMAGE_GC_LOCK_KEY = 'lock:image_gc:{slot}'
+
+# Hashes consultados no banco por vez na coleta
+IMAGE_GC_CHUNK = 1000
+
+
+# URL imutável de cada variante (rota em routes/products/upload_img.py)
+IMAGE_URL_TEMPLATE = '/api/v1/produtos/imagens/{hash}/{variant}.webp'
+
+
+def is_valid_hash(digest: str) -> bool:
+    return len(digest) == 64 and all(c in '0123456789abcdef' for c in digest)
+
+
+def image_url_for(digest: str, variant: str = DEFAULT_VARIANT) -> str:
+    return IMAGE_URL_TEMPLATE.format(hash=digest, variant=variant)
+
+
+def variant_dir(digest: str) -> Path:
+    return STORE_DIR / digest[:2] / digest
+
+
+def variant_path(digest: str, variant: str = DEFAULT_VARIANT) -> Path:
+    return variant_dir(digest) / f'{variant}.webp'
+
+
+def is_stored(digest: str) -> bool:
+    return all(variant_path(digest, name).exists() for name in VARIANTS)
+
+
+def image_hash_from_url(image_url: Optional[str]) -> Optional[str]:
+    """Hash gravado em image_url (`<hash>.webp`), se for do armazenamento."""
+    if not image_url:
+        return None
+    name = os.path.basename(image_url)
+    digest, _, ext = name.partition('.')
+    if ext == 'webp' and is_valid_hash(digest):
+        return digest
+    return None
+
+
+def build_variants(source: str, digest: str) -> Dict[str, Any]:
+    """
+    Decodifica `source` e grava as variantes WebP (processo do pool).
+    """
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    target = variant_dir(digest)
+    target.mkdir(parents=True, exist_ok=True)
+
+    with Image.open(source) as image:
+        if image.width * image.height > MAX_IMAGE_PIXELS:
+            raise ValueError('imagem com pixels demais')
+        image.seek(0)  # GIF animado: primeiro quadro
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA') or (
+            image.mode == 'P' and 'transparency' in image.info
+        )
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        width, height = image.size
+
+        for name, side in VARIANTS.items():
+            variant = image.copy()
+            variant.thumbnail((side, side), Image.LANCZOS)
+            partial = target / f'{name}.{os.getpid()}.tmp'
+            variant.save(partial, 'WEBP', quality=WEBP_QUALITY, method=4)
+            os.replace(partial, target / f'{name}.webp')
+
+    return {'width': width, 'height': height}
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        while chunk := source.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _touch(digest: str) -> bool:
+    """Marca o hash como em uso agora (adia a coleta). False se sumiu."""
+    try:
+        os.utime(variant_dir(digest))
+    except FileNotFoundError:
+        return False
+    return is_stored(digest)
+
+
+async def _store(path: str, digest: str) -> str:
+    if await asyncio.to_thread(_touch, digest):
+        return digest
+    try:
+        await run_cpu(build_variants, path, digest)
+    except Exception as e:
+        LOGGER.warning(f'Imagem {digest[:12]} inválida: {e}')
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Arquivo de imagem inválido ou corrompido',
+        )
+    return digest
+
+
+async def store_upload(
+    file: UploadFile, content_length: Optional[int] = None
+) -> str:
+    """Grava o upload no armazenamento e retorna o hash do conteúdo."""
+    ext = Path(file.filename or '').suffix.lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400, detail='Formato de arquivo não suportado'
+        )
+    if content_length and content_length > MAX_IMAGE_BYTES + 64 * 1024:
+        # Recusa antes de ler o corpo (margem para o envelope multipart)
+        raise HTTPException(
+            status_code=413, detail='Imagem maior que o limite permitido'
+        )
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix='qodo_img_', suffix=ext)
+    try:
+        with os.fdopen(fd, 'wb') as buffer:
+            while chunk := await file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_IMAGE_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail='Imagem maior que o limite permitido',
+                    )
+                digest.update(chunk)
+                await asyncio.to_thread(buffer.write, chunk)
+
+        if not size:
+            raise HTTPException(status_code=400, detail='Arquivo vazio')
+        return await _store(path, digest.hexdigest())
+    finally:
+        os.remove(path)
+
+
+# Imagens padrão já armazenadas neste processo (caminho -> hash)
+_known_files: Dict[str, str] = {}
+
+
+async def store_file(path: str) -> str:
+    """Armazena uma imagem do disco (ex.: imagem padrão de produtos)."""
+    key = os.path.abspath(path)
+    digest = _known_files.get(key)
+    if digest is None or not is_stored(digest):
+        digest = await asyncio.to_thread(_hash_file, key)
+        await _store(key, digest)
+        _known_files[key] = digest
+    return digest
+
+
+async def release(image_url: Optional[str]) -> None:
+    """
+    Remove a imagem anterior de um produto (somente arquivos antigos,
+    antes do armazenamento por conteúdo, que nenhum produto usa).
+
+    Hashes do armazenamento ficam para a coleta periódica (`image_gc`).
+    """
+    if not image_url or image_hash_from_url(image_url) is not None:
+        return
+    # Caminho compartilhado (ex.: imagem padrão) não é apagado
+    if await Produto.filter(image_url=image_url).exists():
+        return
+    old_path = IMAGES_DIR / os.path.basename(image_url)
+    if old_path.is_file():
+        await asyncio.to_thread(old_path.unlink)
+
+
+def _stale_hashes(cutoff: float) -> List[str]:
+    """Hashes armazenados sem gravação/reuso desde `cutoff`."""
+    if not STORE_DIR.is_dir():
+        return []
+    stale = []
+    for prefix in STORE_DIR.iterdir():
+        if not prefix.is_dir():
+            continue
+        for entry in prefix.iterdir():
+            try:
+                if is_valid_hash(entry.name) and (
+                    entry.stat().st_mtime < cutoff
+                ):
+                    stale.append(entry.name)
+            except FileNotFoundError:
+                continue
+    return stale
+
+
+def _remove_if_stale(digest: str, cutoff: float) -> bool:
+    target = variant_dir(digest)
+    try:
+        # Reaproveitado por um upload depois da consulta ao banco
+        if target.stat().st_mtime >= cutoff:
+            return False
+    except FileNotFoundError:
+        return False
+    shutil.rmtree(target, ignore_errors=True)
+    return True
+
+
+class OrphanImageCollector:
+    """Apaga periodicamente os hashes que nenhum produto usa."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def collect(self, grace: int = IMAGE_GC_GRACE) -> int:
+        """Remove os hashes órfãos há mais de `grace` segundos (quantos)."""
+        cutoff = time.time() - grace
+        stale = await asyncio.to_thread(_stale_hashes, cutoff)
+        removed = 0
+        for start in range(0, len(stale), IMAGE_GC_CHUNK):
+            chunk = stale[start : start + IMAGE_GC_CHUNK]
+            used = set(
+                await Produto.filter(image_hash__in=chunk).values_list(
+                    'image_hash', flat=True
+                )
+            )
+            for digest in chunk:
+                if digest in used:
+                    continue
+                if await asyncio.to_thread(_remove_if_stale, digest, cutoff):
+                    removed += 1
+        return removed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(IMAGE_GC_INTERVAL)
+            try:
+                slot = int(time.time()) // IMAGE_GC_INTERVAL
+                key = IMAGE_GC_LOCK_KEY.format(slot=slot)
+                if await client.acquire_lock(key, IMAGE_GC_INTERVAL):
+                    removed = await self.collect()
+                    LOGGER.info(f'Coleta de imagens: {removed} removidas')
+            except Exception as e:
+                LOGGER.error(f'Falha na coleta de imagens órfãs: {e}')
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+# Instância global
+image_gc = OrphanImageCollector()
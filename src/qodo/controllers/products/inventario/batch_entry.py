@@ -0,0 +1,390 @@
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F, Q
+from tortoise.transactions import in_transaction
+
+from qodo.core.catalog import stamp, stock_changed
+from qodo.core.stock_ledger import ENTRY, stock_ledger
+from qodo.core.stock_summary import stock_summary
+from qodo.model.product import Produto
+from qodo.model.stock_entry import EntradaEstoque, EntradaEstoqueItem
+
+"""
+batch_entry: Entrada de estoque em lote (lista ou NF-e do fornecedor).
+
+Em vez de uma requisição (e duas ou mais consultas) por produto:
+1. todos os códigos são resolvidos em uma única consulta;
+2. as somas `stock = stock + n` são aplicadas em uma transação, junto com
+   o documento de entrada e suas linhas;
+3. caches, índices e resumo do estoque são atualizados uma vez no final.
+
+Itens da NF-e são procurados só pelo EAN (cEAN): o cProd é o código do
+fornecedor, que não tem relação com o `product_code` da loja. Itens sem
+EAN, com quantidade fracionada ou em embalagem (CX, FD...) não são
+lançados: voltam em `nao_encontrados` com o motivo.
+"""
+
+NFE_NS = {'nfe': 'http://www.portalfiscal.inf.br/nfe'}
+
+# Valor de cEAN das NF-e para produtos sem código de barras
+NO_GTIN = {'', 'SEM GTIN'}
+
+# Limite de linhas por entrada
+MAX_LINES = 5000
+
+# Unidades de compra (uCom) que agrupam várias unidades de venda
+PACK_UNITS = {'CX', 'CAIXA', 'FD', 'FARDO', 'PC', 'PCT', 'PACOTE', 'DZ'}
+
+
+@dataclass
+class EntryLine:
+    """Linha recebida: códigos candidatos, em ordem de preferência."""
+
+    line: int
+    codes: List[str]
+    quantity: int
+    description: Optional[str] = None
+    unit_cost: Optional[float] = None
+    supplier_code: Optional[str] = None
+    # Linha que não pode ser lançada (vai para `nao_encontrados`)
+    reason: Optional[str] = None
+
+
+@dataclass
+class EntryDocument:
+    origin: str
+    lines: List[EntryLine] = field(default_factory=list)
+    nfe_key: Optional[str] = None
+    number: Optional[str] = None
+    supplier_name: Optional[str] = None
+    supplier_cnpj: Optional[str] = None
+    detail: Optional[str] = None
+
+
+def _quantity_error(value: Any) -> Tuple[int, Optional[str]]:
+    """(quantidade inteira, erro) a partir do texto recebido."""
+    try:
+        quantity = Decimal(str(value).strip().replace(',', '.'))
+    except (InvalidOperation, ValueError):
+        return 0, f'quantidade inválida ({value})'
+    if quantity <= 0 or quantity != quantity.to_integral_value():
+        return 0, (
+            f'a quantidade deve ser um inteiro maior que zero ({value})'
+        )
+    return int(quantity), None
+
+
+def _integer_quantity(value: Any, line: int) -> int:
+    quantity, error = _quantity_error(value)
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f'Linha {line}: {error}.',
+        )
+    return quantity
+
+
+def document_from_list(
+    items: List[Dict[str, Any]], detail: Optional[str] = None
+) -> EntryDocument:
+    """Entrada a partir da lista [{code, quantity, unit_cost?}] do painel."""
+    document = EntryDocument(origin='LISTA', detail=detail)
+    for line, item in enumerate(items, start=1):
+        code = str(item.get('code') or '').strip()
+        if not code:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f'Linha {line}: código do produto ausente.',
+            )
+        document.lines.append(
+            EntryLine(
+                line=line,
+                codes=[code],
+                quantity=_integer_quantity(item.get('quantity'), line),
+                unit_cost=item.get('unit_cost'),
+            )
+        )
+    return document
+
+
+def _text(element: Optional[ET.Element], path: str) -> Optional[str]:
+    if element is None:
+        return None
+    found = element.find(path, NFE_NS)
+    if found is None or found.text is None:
+        return None
+    return found.text.strip()
+
+
+def document_from_nfe(
+    xml: bytes, detail: Optional[str] = None
+) -> EntryDocument:
+    """Entrada a partir do XML da NF-e (nfeProc ou NFe) do fornecedor."""
+    try:
+        root = ET.fromstring(xml)
+    except ET.ParseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f'XML da NF-e inválido: {e}',
+        )
+
+    inf = root.find('.//nfe:infNFe', NFE_NS)
+    if inf is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='Arquivo não é uma NF-e (infNFe não encontrado).',
+        )
+
+    emit = inf.find('nfe:emit', NFE_NS)
+    document = EntryDocument(
+        origin='NFE',
+        nfe_key=(inf.get('Id') or '').removeprefix('NFe') or None,
+        number=_text(inf, 'nfe:ide/nfe:nNF'),
+        supplier_name=_text(emit, 'nfe:xNome'),
+        supplier_cnpj=_text(emit, 'nfe:CNPJ') or _text(emit, 'nfe:CPF'),
+        detail=detail,
+    )
+
+    for det in inf.findall('nfe:det', NFE_NS):
+        prod = det.find('nfe:prod', NFE_NS)
+        line = int(det.get('nItem') or len(document.lines) + 1)
+        ean = _text(prod, 'nfe:cEAN') or ''
+        if ean.upper() in NO_GTIN:
+            ean = ''
+        unit = (_text(prod, 'nfe:uCom') or '').upper()
+        quantity, reason = _quantity_error(_text(prod, 'nfe:qCom'))
+        if unit in PACK_UNITS:
+            reason = f'unidade de compra {unit}: lance em unidades'
+        elif not ean:
+            reason = 'item sem EAN (cEAN)'
+        unit_cost = _text(prod, 'nfe:vUnCom')
+        document.lines.append(
+            EntryLine(
+                line=line,
+                codes=[ean] if ean else [],
+                quantity=quantity,
+                description=_text(prod, 'nfe:xProd'),
+                unit_cost=float(unit_cost) if unit_cost else None,
+                supplier_code=_text(prod, 'nfe:cProd'),
+                reason=reason,
+            )
+        )
+    return document
+
+
+class BatchStockEntry:
+    """Aplica uma entrada de estoque inteira de uma vez."""
+
+    def __init__(
+        self,
+        company_id: int,
+        document: EntryDocument,
+        allow_partial: bool = False,
+        update_cost: bool = False,
+    ):
+        self.company_id = company_id
+        self.document = document
+        self.allow_partial = allow_partial
+        self.update_cost = update_cost
+
+    async def _resolve(self) -> Dict[str, int]:
+        """
+        Código -> id, em uma consulta.
+
+        Lista do painel: product_code ou lot_bar_code. NF-e: só o código
+        de barras (o código do fornecedor não é o da loja).
+        """
+        codes = {
+            code
+            for line in self.document.lines
+            if not line.reason
+            for code in line.codes
+        }
+        if not codes:
+            return {}
+
+        barcode_only = self.document.origin == 'NFE'
+        condition = Q(lot_bar_code__in=codes)
+        if not barcode_only:
+            condition |= Q(product_code__in=codes)
+        rows = await Produto.filter(usuario_id=self.company_id).filter(
+            condition
+        ).values('id', 'product_code', 'lot_bar_code')
+
+        by_code: Dict[str, int] = {}
+        # product_code tem prioridade sobre o código de barras
+        for row in rows:
+            if row['lot_bar_code'] in codes:
+                by_code[row['lot_bar_code']] = row['id']
+        if not barcode_only:
+            for row in rows:
+                if row['product_code'] in codes:
+                    by_code[row['product_code']] = row['id']
+        return by_code
+
+    def _match(
+        self, by_code: Dict[str, int]
+    ) -> Tuple[List[Tuple[EntryLine, int]], List[Dict[str, Any]]]:
+        matched, unresolved = [], []
+        for line in self.document.lines:
+            product_id = None
+            if not line.reason:
+                product_id = next(
+                    (by_code[code] for code in line.codes if code in by_code),
+                    None,
+                )
+            if product_id is None:
+                unresolved.append(
+                    {
+                        'line': line.line,
+                        'codes': line.codes,
+                        'supplier_code': line.supplier_code,
+                        'description': line.description,
+                        'reason': line.reason or 'produto não encontrado',
+                    }
+                )
+            else:
+                matched.append((line, product_id))
+        return matched, unresolved
+
+    async def apply(self) -> Dict[str, Any]:
+        document = self.document
+        if not document.lines:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='A entrada não possui itens.',
+            )
+        if len(document.lines) > MAX_LINES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'A entrada excede o limite de {MAX_LINES} linhas.',
+            )
+
+        matched, unresolved = self._match(await self._resolve())
+        if unresolved and not self.allow_partial:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={
+                    'message': 'Produtos não encontrados; nada foi lançado.',
+                    'nao_encontrados': unresolved,
+                },
+            )
+        if not matched:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='Nenhum produto da entrada foi encontrado.',
+            )
+
+        deltas: Dict[int, int] = {}
+        costs: Dict[int, float] = {}
+        for line, product_id in matched:
+            deltas[product_id] = deltas.get(product_id, 0) + line.quantity
+            if line.unit_cost is not None:
+                costs[product_id] = line.unit_cost
+
+        try:
+            async with in_transaction() as connection:
+                entry = await EntradaEstoque.create(
+                    usuario_id=self.company_id,
+                    origem=document.origin,
+                    chave_nfe=document.nfe_key,
+                    numero_nota=document.number,
+                    fornecedor_nome=document.supplier_name,
+                    fornecedor_cnpj=document.supplier_cnpj,
+                    total_itens=sum(deltas.values()),
+                    total_linhas=len(matched),
+                    valor_total=round(
+                        sum(
+                            (line.unit_cost or 0) * line.quantity
+                            for line, _ in matched
+                        ),
+                        2,
+                    ),
+                    detail=document.detail,
+                    using_db=connection,
+                )
+
+                # Trava os produtos em ordem de id (evita deadlock)
+                locked = (
+                    await Produto.filter(
+                        usuario_id=self.company_id, id__in=list(deltas)
+                    )
+                    .using_db(connection)
+                    .select_for_update()
+                    .order_by('id')
+                    .values_list('id', 'stock', 'cost_price')
+                )
+                previous = {
+                    product_id: stock for product_id, stock, _ in locked
+                }
+                cost_changed = self.update_cost and any(
+                    product_id in costs and costs[product_id] != cost
+                    for product_id, _, cost in locked
+                )
+
+                for product_id in sorted(deltas):
+                    update = {'stock': F('stock') + deltas[product_id]}
+                    if self.update_cost and product_id in costs:
+                        update['cost_price'] = costs[product_id]
+                    await Produto.filter(
+                        id=product_id, usuario_id=self.company_id
+                    ).using_db(connection).update(**update)
+
+                # Estoque anterior de cada linha (várias linhas do mesmo
+                # produto acumulam na ordem da nota)
+                running = dict(previous)
+                lines = []
+                for line, product_id in matched:
+                    lines.append(
+                        EntradaEstoqueItem(
+                            entrada_id=entry.id,
+                            produto_id=product_id,
+                            codigo=line.codes[0],
+                            descricao=(line.description or '')[:150] or None,
+                            quantidade=line.quantity,
+                            custo_unitario=line.unit_cost,
+                            estoque_anterior=running[product_id],
+                        )
+                    )
+                    running[product_id] += line.quantity
+                await EntradaEstoqueItem.bulk_create(
+                    lines, using_db=connection
+                )
+                await stock_ledger.record(
+                    self.company_id,
+                    deltas,
+                    ENTRY,
+                    reference=f'entrada:{entry.id}',
+                    using_db=connection,
+                )
+                version = await stamp(
+                    self.company_id, changed=deltas, using_db=connection
+                )
+        except IntegrityError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f'A NF-e {document.nfe_key} já foi lançada.',
+            )
+
+        # Uma única invalidação para a entrada inteira
+        await stock_changed(
+            self.company_id, *deltas, deltas=deltas, version=version
+        )
+        if cost_changed:
+            # O resumo soma custo x estoque: a diferença de estoque não
+            # basta quando o custo mudou
+            await stock_summary.mark_stale(self.company_id)
+
+        return {
+            'entry_id': entry.id,
+            'origem': document.origin,
+            'chave_nfe': document.nfe_key,
+            'produtos_atualizados': len(deltas),
+            'total_itens': sum(deltas.values()),
+            'nao_encontrados': unresolved,
+        }
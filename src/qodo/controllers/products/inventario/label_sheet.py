@@ -0,0 +1,264 @@
+import hashlib
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from fastapi import HTTPException, status
+
+from qodo.core.process_pool import run_cpu
+from qodo.logs.infos import LOGGER
+from qodo.model.product import Produto
+from qodo.utils.sales_code_generator import ean13_check_digit
+
+"""
+label_sheet: Folhas de etiquetas (PDF) para vários produtos de uma vez.
+
+- Os produtos são escolhidos por ids, grupo e/ou versão do catálogo
+  (alterados desde a última impressão), em uma consulta.
+- O PDF é desenhado com reportlab no pool de processos
+  (core/process_pool.py): a renderização é CPU-bound e não pode travar
+  o event loop.
+- O arquivo fica em um cache em disco cuja chave é formada pelos
+  (product_id, preço, versão) das etiquetas: reimprimir a mesma seleção
+  sem alterações não renderiza nada de novo.
+"""
+
+# Layouts suportados: folha A4 (3 x 7, 63,5 x 38,1 mm) e térmica (60 x 40)
+LAYOUTS = ('a4', 'termica')
+
+# Limite de etiquetas por pedido
+MAX_LABELS = int(os.getenv('LABEL_MAX_LABELS', '10000'))
+
+# Cache dos PDFs renderizados
+LABEL_CACHE_DIR = os.getenv(
+    'LABEL_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'qodo_labels')
+)
+LABEL_CACHE_MAX_AGE = int(os.getenv('LABEL_CACHE_MAX_AGE', str(24 * 3600)))
+
+CHUNK_SIZE = 64 * 1024
+
+LABEL_FIELDS = (
+    'id',
+    'name',
+    'sale_price',
+    'unit',
+    'product_code',
+    'lot_bar_code',
+    'catalog_version',
+)
+
+
+def _money(value: float) -> str:
+    text = f'{value:,.2f}'
+    return 'R$ ' + text.replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def _barcode(value: str, width: float, height: float):
+    """EAN-13 quando o código é um EAN válido; senão Code128."""
+    from reportlab.graphics.barcode import createBarcodeDrawing
+
+    # O reportlab recalcula o dígito verificador: códigos antigos (13
+    # dígitos aleatórios) sairiam diferentes do cadastrado
+    if (
+        len(value) == 13
+        and value.isdigit()
+        and ean13_check_digit(value[:12]) == value[12]
+    ):
+        try:
+            return createBarcodeDrawing(
+                'EAN13', value=value[:12], width=width, height=height
+            )
+        except Exception:
+            pass
+    return createBarcodeDrawing(
+        'Code128', value=value, width=width, height=height, humanReadable=True
+    )
+
+
+def _draw_label(canvas, label: Dict[str, Any], x, y, width, height) -> None:
+    from reportlab.graphics import renderPDF
+    from reportlab.lib.units import mm
+
+    padding = 2 * mm
+    name = label['name'] or ''
+    if len(name) > 34:
+        name = name[:33] + '…'
+
+    canvas.setFont('Helvetica-Bold', 7.5)
+    canvas.drawString(x + padding, y + height - padding - 7, name)
+
+    canvas.setFont('Helvetica-Bold', 14)
+    canvas.drawString(
+        x + padding, y + height - padding - 22, _money(label['price'])
+    )
+    if label.get('unit'):
+        canvas.setFont('Helvetica', 7)
+        canvas.drawRightString(
+            x + width - padding,
+            y + height - padding - 22,
+            f"/{label['unit']}",
+        )
+
+    code = label.get('barcode')
+    if code:
+        drawing = _barcode(
+            code, width - 2 * padding, height * 0.5 - padding
+        )
+        renderPDF.draw(drawing, canvas, x + padding, y + padding)
+
+
+def render_label_sheet(
+    labels: List[Dict[str, Any]], layout: str, path: str
+) -> str:
+    """
+    Desenha as etiquetas em `path` (executado no processo de renderização).
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.pdfgen.canvas import Canvas
+
+    partial = f'{path}.{os.getpid()}.tmp'
+    if layout == 'termica':
+        width, height = 60 * mm, 40 * mm
+        canvas = Canvas(partial, pagesize=(width, height))
+        for label in labels:
+            _draw_label(canvas, label, 0, 0, width, height)
+            canvas.showPage()
+    else:
+        columns, rows = 3, 7
+        width, height = 63.5 * mm, 38.1 * mm
+        left, top, pitch_x = 7.2 * mm, 15.15 * mm, 66.0 * mm
+        per_page = columns * rows
+        canvas = Canvas(partial, pagesize=A4)
+        for index, label in enumerate(labels):
+            slot = index % per_page
+            if index and not slot:
+                canvas.showPage()
+            row, column = divmod(slot, columns)
+            x = left + column * pitch_x
+            y = A4[1] - top - (row + 1) * height
+            _draw_label(canvas, label, x, y, width, height)
+        canvas.showPage()
+
+    canvas.save()
+    os.replace(partial, path)
+    return path
+
+
+def _prune_cache() -> None:
+    limit = time.time() - LABEL_CACHE_MAX_AGE
+    try:
+        for entry in os.scandir(LABEL_CACHE_DIR):
+            if entry.is_file() and entry.stat().st_mtime < limit:
+                os.remove(entry.path)
+    except OSError:
+        pass
+
+
+def iter_file(path: str) -> Iterator[bytes]:
+    """Lê o PDF em blocos para a StreamingResponse."""
+    with open(path, 'rb') as pdf:
+        while chunk := pdf.read(CHUNK_SIZE):
+            yield chunk
+
+
+class LabelSheet:
+    """Seleciona os produtos e gera (ou reaproveita) a folha de etiquetas."""
+
+    def __init__(
+        self,
+        company_id: int,
+        product_ids: Optional[List[int]] = None,
+        group: Optional[str] = None,
+        since_version: Optional[int] = None,
+        layout: str = 'a4',
+        copies: int = 1,
+    ):
+        self.company_id = company_id
+        self.product_ids = product_ids
+        self.group = group
+        self.since_version = since_version
+        self.layout = layout
+        self.copies = copies
+
+    async def _products(self) -> List[Dict[str, Any]]:
+        if not (
+            self.product_ids or self.group or self.since_version is not None
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Informe ids, grupo ou versão do catálogo.',
+            )
+
+        query = Produto.filter(usuario_id=self.company_id, active=True)
+        if self.product_ids:
+            query = query.filter(id__in=self.product_ids)
+        if self.group:
+            query = query.filter(group=self.group)
+        if self.since_version is not None:
+            query = query.filter(catalog_version__gt=self.since_version)
+
+        return (
+            await query.order_by('group', 'name', 'id')
+            .limit(MAX_LABELS + 1)
+            .values(*LABEL_FIELDS)
+        )
+
+    def _cache_path(self, labels: List[Dict[str, Any]]) -> str:
+        digest = hashlib.sha256(self.layout.encode())
+        for label in labels:
+            key = f"{label['id']}:{label['price']:.2f}:{label['version']};"
+            digest.update(key.encode())
+        return os.path.join(LABEL_CACHE_DIR, f'{digest.hexdigest()}.pdf')
+
+    async def render(self) -> Dict[str, Any]:
+        """Retorna o caminho do PDF e os dados da seleção."""
+        rows = await self._products()
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='Nenhum produto encontrado para gerar etiquetas.',
+            )
+        if len(rows) * self.copies > MAX_LABELS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f'A seleção excede o limite de {MAX_LABELS} etiquetas.'
+                ),
+            )
+
+        labels = [
+            {
+                'id': row['id'],
+                'name': row['name'],
+                'price': float(row['sale_price'] or 0),
+                'unit': row['unit'],
+                'barcode': row['lot_bar_code'] or row['product_code'],
+                'version': row['catalog_version'],
+            }
+            for row in rows
+            for _ in range(self.copies)
+        ]
+
+        path = self._cache_path(labels)
+        cached = os.path.exists(path)
+        if cached:
+            os.utime(path)
+        else:
+            os.makedirs(LABEL_CACHE_DIR, exist_ok=True)
+            started = time.perf_counter()
+            await run_cpu(render_label_sheet, labels, self.layout, path)
+            LOGGER.info(
+                f'Etiquetas da empresa {self.company_id}: {len(labels)} em '
+                f'{time.perf_counter() - started:.2f}s ({self.layout})'
+            )
+            _prune_cache()
+
+        return {
+            'path': path,
+            'labels': len(labels),
+            'products': len(rows),
+            'version': max(row['catalog_version'] for row in rows),
+            'cached': cached,
+        }
@@ -3,7 +3,10 @@ from typing import Any, Dict, List, Optional, Union
 
 from fastapi import HTTPException, status
 from tortoise.expressions import F
+from tortoise.transactions import in_transaction
 
+from qodo.core.catalog import stamp, stock_changed
+from qodo.core.stock_ledger import ENTRY, stock_ledger
 from qodo.model.product import Produto
 from qodo.model.user import Usuario
 from qodo.utils.get_produtos_user import deep_search, get_product_by_user
@@ -121,13 +124,31 @@ class EntryProducts:
             if self.detail:
                 update_fields['detail'] = self.detail
 
-            # 3. Executa a atualização por ID e usuário (mais seguro)
-            rows_updated = await Produto.filter(
-                id=product_id, usuario_id=self.company_id
-            ).update(**update_fields)
+            # 3. Executa a atualização por ID e usuário (mais seguro), com o
+            # histórico e a versão do catálogo na mesma transação
+            async with in_transaction():
+                rows_updated = await Produto.filter(
+                    id=product_id, usuario_id=self.company_id
+                ).update(**update_fields)
+                if rows_updated > 0:
+                    await stock_ledger.record(
+                        self.company_id,
+                        {product_id: self.new_stock},
+                        ENTRY,
+                        reference=self.detail,
+                    )
+                    version = await stamp(
+                        self.company_id, changed=(product_id,)
+                    )
 
             # 4. Verifica o resultado
             if rows_updated > 0:
+                await stock_changed(
+                    self.company_id,
+                    product_id,
+                    deltas={product_id: self.new_stock},
+                    version=version,
+                )
                 return {
                     'message': 'Atualização de estoque realizada com sucesso.',
                     'product_id': product_id,
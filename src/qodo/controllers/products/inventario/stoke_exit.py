@@ -5,9 +5,11 @@ from zoneinfo import ZoneInfo
 
 from fastapi import HTTPException, status
 from tortoise.expressions import F
-from tortoise.transactions import atomic
+from tortoise.transactions import atomic, in_transaction
 
 # Importações internas necessárias
+from qodo.core.catalog import product_removed, stamp, stock_changed
+from qodo.core.stock_ledger import EXIT, stock_ledger
 from qodo.model.product import (  # Necessário para atualizar e arquivar
     Produto,
     ProdutoArquivado,
@@ -110,14 +112,32 @@ class StockExit:
 
         try:
             # 1. Atualiza o estoque usando F-expression para garantir atomicidade
-            rows_updated = await Produto.filter(id=product.id).update(
-                stock=F('stock') - self.quantity_to_remove,
-                detail=self.detail
-                or product.detail,  # Mantém ou adiciona detalhe
-                atualizado_em=datetime.now(ZoneInfo('America/Sao_Paulo')),
-            )
+            # (histórico e versão do catálogo na mesma transação)
+            async with in_transaction():
+                rows_updated = await Produto.filter(id=product.id).update(
+                    stock=F('stock') - self.quantity_to_remove,
+                    detail=self.detail
+                    or product.detail,  # Mantém ou adiciona detalhe
+                    atualizado_em=datetime.now(ZoneInfo('America/Sao_Paulo')),
+                )
+                if rows_updated > 0:
+                    await stock_ledger.record(
+                        self.company_id,
+                        {product.id: -self.quantity_to_remove},
+                        EXIT,
+                        reference=self.detail,
+                    )
+                    version = await stamp(
+                        self.company_id, changed=(product.id,)
+                    )
 
             if rows_updated > 0:
+                await stock_changed(
+                    self.company_id,
+                    product.id,
+                    deltas={product.id: -self.quantity_to_remove},
+                    version=version,
+                )
                 return {
                     'message': 'Baixa de estoque parcial realizada com sucesso.',
                     'product_id': product.id,
@@ -135,11 +155,19 @@ class StockExit:
     # -------------------------------------------------------------
     # MÉTODO 2: Remover Produto Total (Arquivamento)
     # -------------------------------------------------------------
-    @atomic()
     async def remove_product_total(self) -> dict:
         """
         Remove todo o estoque do produto e o move para a tabela de Arquivados.
+
+        O arquivamento é feito em uma transação (`_archive_product`); índices,
+        cache e o evento para os caixas só depois do commit.
         """
+        result, version = await self._archive_product()
+        await product_removed(self.company_id, result['product_id'], version)
+        return result
+
+    @atomic()
+    async def _archive_product(self) -> tuple:
         self.check_fields()
 
         if not self.detail:
@@ -176,11 +204,19 @@ class StockExit:
         deleted_count = await Produto.filter(id=product.id).delete()
 
         if deleted_count > 0:
+            # O saldo restante sai do estoque junto com o produto
+            await stock_ledger.record(
+                self.company_id,
+                {product.id: -(product.stock or 0)},
+                EXIT,
+                reference=self.detail,
+            )
+            version = await stamp(self.company_id, removed=(product.id,))
             return {
                 'message': 'Produto removido do estoque principal e arquivado com sucesso.',
                 'product_id': product.id,
                 'archived_detail': self.detail,
-            }
+            }, version
 
         rows_deleted = await Produto.filter(
             usuario_id=self.company_id, product_code=self.product_id
@@ -0,0 +1,129 @@
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from tortoise.expressions import F
+
+from qodo.model.product import Produto
+
+"""
+product_listing: Listagem paginada (keyset) e enxuta do catálogo.
+
+Em vez de materializar todos os produtos com todas as colunas, a listagem
+usa `.values()` apenas com os campos pedidos e pagina pelo id
+(`id > cursor ORDER BY id LIMIT n`), que usa a chave primária e custa o
+mesmo na primeira e na última página.
+"""
+
+# Campos retornados quando o cliente não informa `fields`
+DEFAULT_FIELDS = (
+    'id',
+    'name',
+    'product_code',
+    'lot_bar_code',
+    'sale_price',
+    'stock',
+    'stoke_min',
+    'group',
+    'sector',
+    'unit',
+    'active',
+)
+
+# Campos que podem ser pedidos em `fields` (exclui colunas internas)
+ALLOWED_FIELDS = frozenset(
+    name
+    for name in Produto._meta.fields_db_projection
+    if name != 'search_name'
+)
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Converte 'id,name,stock' em lista validada (id sempre incluso)."""
+    if not fields:
+        return list(DEFAULT_FIELDS)
+
+    if fields.strip() == 'all':
+        return sorted(ALLOWED_FIELDS)
+
+    requested = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = sorted(set(requested) - ALLOWED_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Campos inválidos: {", ".join(unknown)}',
+        )
+
+    if 'id' not in requested:
+        requested.insert(0, 'id')
+    return list(dict.fromkeys(requested))
+
+
+def _filtered(
+    usuario_id: int,
+    group: Optional[str],
+    sector: Optional[str],
+    active: Optional[bool],
+    low_stock: bool,
+):
+    query = Produto.filter(usuario_id=usuario_id)
+    if group:
+        query = query.filter(group=group)
+    if sector:
+        query = query.filter(sector=sector)
+    if active is not None:
+        query = query.filter(active=active)
+    if low_stock:
+        # Mesmo critério do painel e dos alertas: estoque <= mínimo
+        query = query.filter(stock__lte=F('stoke_min'))
+    return query
+
+
+async def count_products(
+    usuario_id: int,
+    group: Optional[str] = None,
+    sector: Optional[str] = None,
+    active: Optional[bool] = None,
+    low_stock: bool = False,
+) -> int:
+    """Total de produtos com os mesmos filtros da listagem (COUNT)."""
+    return await _filtered(
+        usuario_id, group, sector, active, low_stock
+    ).count()
+
+
+async def list_products_page(
+    usuario_id: int,
+    cursor: Optional[int] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+    group: Optional[str] = None,
+    sector: Optional[str] = None,
+    active: Optional[bool] = None,
+    low_stock: bool = False,
+) -> Dict[str, Any]:
+    """
+    Retorna uma página de produtos da empresa.
+
+    Returns:
+        {'items': [...], 'next_cursor': int | None, 'has_more': bool}
+    """
+    columns = parse_fields(fields)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    query = _filtered(usuario_id, group, sector, active, low_stock)
+    if cursor:
+        query = query.filter(id__gt=cursor)
+
+    # Busca um item a mais para saber se existe próxima página
+    rows = await query.order_by('id').limit(limit + 1).values(*columns)
+
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    return {
+        'items': items,
+        'next_cursor': items[-1]['id'] if has_more else None,
+        'has_more': has_more,
+    }
@@ -3,11 +3,11 @@ from typing import Any, Dict
 
 from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
-from tortoise.functions import Count, Sum
 
 from qodo.core.cache import client
+from qodo.core.cache_tags import TAG_PRODUCTS, tagged_cache
+from qodo.core.sales_rollup import sales_rollup
 from qodo.model.product import Produto
-from qodo.model.sale import Sales
 from qodo.utils.get_produtos_user import get_product_by_user
 
 
@@ -31,10 +31,14 @@ class Products:
             )
 
         try:
-            cache_key = f'product:{self.user_id}:{product_name.lower()}'
+            cache_key = await tagged_cache.key(
+                self.user_id,
+                f'product:{self.user_id}:{product_name.lower()}',
+                TAG_PRODUCTS,
+            )
 
             # 🔹 Verifica se já tem cache
-            cache = await client.get(cache_key)
+            cache = await client.get(cache_key) if cache_key else None
             if cache:
                 print('[CACHE] Produto encontrado no cache')
                 return {'data': json.loads(cache)}
@@ -51,8 +55,11 @@ class Products:
                     'preço': product.sale_price,
                 }
 
-                # 🔹 Salva no cache por 60 segundos
-                await client.setex(cache_key, 60, json.dumps(product_data))
+                # 🔹 Salva no cache por 10 minutos (invalidado pelas tags)
+                if cache_key:
+                    await client.setex(
+                        cache_key, 600, json.dumps(product_data)
+                    )
 
                 return [product_data]
 
@@ -85,8 +92,12 @@ class Products:
 
         try:
 
-            cache_key = f'product:{self.user_id}:{type_ticket.lower()}'
-            cache = await client.get(cache_key)
+            cache_key = await tagged_cache.key(
+                self.user_id,
+                f'product:{self.user_id}:{type_ticket.lower()}',
+                TAG_PRODUCTS,
+            )
+            cache = await client.get(cache_key) if cache_key else None
             if cache:
                 print('Produto encontrado em cache')
                 return json.loads(cache)
@@ -107,7 +118,10 @@ class Products:
                         }
                     )
 
-                await client.setex(cache_key, 60, json.dumps(products_data))
+                if cache_key:
+                    await client.setex(
+                        cache_key, 600, json.dumps(products_data)
+                    )
                 return products_data
 
             else:
@@ -126,31 +140,12 @@ class Products:
         """
 
         try:
-            # 1. Agrega a Receita Total e Conta o número de códigos de venda únicos (transações)
-            aggregation = (
-                await Sales.filter(usuario_id=self.user_id)
-                .annotate(
-                    # Soma de todos os total_price (Receita Bruta)
-                    total_revenue=Sum('total_price'),
-                    # Conta o número de códigos de vendas únicos (transações).
-                    # Se 'sale_code' puder ser NULL, o COUNT(DISTINCT) é a forma mais segura.
-                    num_transactions=Count('id', distinct=True),
-                )
-                .first()
-            )
-
-            # 2. Verifica e calcula
-            if (
-                aggregation
-                and aggregation.total_revenue is not None
-                and aggregation.num_transactions > 0
-            ):
-
-                total_revenue = aggregation.total_revenue
-                num_transactions = aggregation.num_transactions
+            # Totais lidos do resumo diário (core/sales_rollup.py)
+            totals = await sales_rollup.totals(self.user_id)
 
+            if totals['vendas_distintas'] > 0:
                 # TICKET MÉDIO = Receita Total / Número de Transações
-                ticket_medio = total_revenue / num_transactions
+                ticket_medio = totals['receita'] / totals['vendas_distintas']
 
                 return round(ticket_medio, 2)
 
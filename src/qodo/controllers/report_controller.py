@@ -0,0 +1,267 @@
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+from fastapi import HTTPException, status
+
+from qodo.core.analytics_export import read_partitions
+from qodo.core.process_pool import run_cpu
+from qodo.logs.infos import LOGGER
+from qodo.model.product import Produto
+
+"""
+report_controller: Relatórios analíticos sobre a cópia em Parquet.
+
+Os dados vêm de core/analytics_export.py (partições por dia); nada aqui
+consulta as tabelas de vendas. Os cálculos são vetorizados (pandas/numpy)
+e executados no pool de processos (core/process_pool.py).
+
+- comparação entre o período e o período anterior de mesmo tamanho;
+- mapa de calor por dia da semana x hora;
+- margem por produto.
+
+Os dados do dia corrente chegam com o atraso da exportação incremental
+(ANALYTICS_EXPORT_INTERVAL).
+"""
+
+MAX_REPORT_DAYS = 366
+
+SALES_COLUMNS = [
+    'criado_em',
+    'produto_id',
+    'payment_method',
+    'sale_code',
+    'quantity',
+    'total_price',
+    'cost_price',
+    'lucro_total',
+]
+
+WEEKDAYS = ['seg', 'ter', 'qua', 'qui', 'sex', 'sab', 'dom']
+
+# Faixas de margem (%) do histograma
+MARGIN_BANDS = [float('-inf'), 0, 10, 20, 30, 50, float('inf')]
+MARGIN_LABELS = ['<0', '0-10', '10-20', '20-30', '30-50', '50+']
+
+
+def load_sales(company_id: int, start: date, end: date):
+    """Vendas do período lidas das partições Parquet."""
+    return read_partitions(company_id, 'vendas', start, end, SALES_COLUMNS)
+
+
+def _totals(frame) -> Dict[str, Any]:
+    revenue = float(frame['total_price'].sum())
+    codes = frame['sale_code']
+    distinct = int(codes.nunique() + codes.isna().sum())
+    return {
+        'vendas': int(len(frame)),
+        'vendas_distintas': distinct,
+        'receita': round(revenue, 2),
+        'custo': round(float(frame['cost_price'].sum()), 2),
+        'lucro': round(float(frame['lucro_total'].sum()), 2),
+        'itens': int(frame['quantity'].sum()),
+        'ticket_medio': round(revenue / distinct, 2) if distinct else 0.0,
+    }
+
+
+def _by_payment(frame) -> Dict[str, Dict[str, Any]]:
+    grouped = frame.groupby('payment_method')[
+        ['total_price', 'lucro_total', 'quantity']
+    ].sum()
+    return {
+        str(method): {
+            'receita': round(float(row['total_price']), 2),
+            'lucro': round(float(row['lucro_total']), 2),
+            'itens': int(row['quantity']),
+        }
+        for method, row in grouped.iterrows()
+    }
+
+
+def _change(current: float, previous: float):
+    if current == previous:
+        return 0.0
+    if not previous:
+        return None
+    return round((current - previous) / abs(previous) * 100, 2)
+
+
+def period_comparison(
+    company_id: int, start: date, end: date
+) -> Dict[str, Any]:
+    """Totais do período e do período anterior, com a variação (%)."""
+    length = (end - start).days + 1
+    previous_end = start - timedelta(days=1)
+    previous_start = previous_end - timedelta(days=length - 1)
+
+    current = load_sales(company_id, start, end)
+    previous = load_sales(company_id, previous_start, previous_end)
+    current_totals = _totals(current)
+    previous_totals = _totals(previous)
+
+    return {
+        'atual': {
+            'inicio': start.isoformat(),
+            'fim': end.isoformat(),
+            'totais': current_totals,
+            'por_pagamento': _by_payment(current),
+        },
+        'anterior': {
+            'inicio': previous_start.isoformat(),
+            'fim': previous_end.isoformat(),
+            'totais': previous_totals,
+            'por_pagamento': _by_payment(previous),
+        },
+        'variacao': {
+            key: _change(current_totals[key], previous_totals[key])
+            for key in current_totals
+        },
+    }
+
+
+def hourly_heatmap(company_id: int, start: date, end: date) -> Dict[str, Any]:
+    """Receita e número de vendas por dia da semana (linhas) x hora."""
+    import numpy as np
+    import pandas as pd
+
+    frame = load_sales(company_id, start, end)
+    revenue = np.zeros((7, 24))
+    counts = np.zeros((7, 24), dtype=np.int64)
+
+    if len(frame):
+        stamps = pd.to_datetime(frame['criado_em'])
+        cells = (
+            stamps.dt.weekday.to_numpy(),
+            stamps.dt.hour.to_numpy(),
+        )
+        np.add.at(revenue, cells, frame['total_price'].to_numpy(float))
+        np.add.at(counts, cells, 1)
+
+    peak = None
+    if counts.any():
+        weekday, hour = np.unravel_index(np.argmax(revenue), revenue.shape)
+        peak = {
+            'dia_semana': WEEKDAYS[int(weekday)],
+            'hora': int(hour),
+            'receita': round(float(revenue[weekday, hour]), 2),
+        }
+
+    return {
+        'inicio': start.isoformat(),
+        'fim': end.isoformat(),
+        'dias_semana': WEEKDAYS,
+        'receita': np.round(revenue, 2).tolist(),
+        'vendas': counts.tolist(),
+        'pico': peak,
+    }
+
+
+def margin_analysis(
+    company_id: int, start: date, end: date, limit: int
+) -> Dict[str, Any]:
+    """Margem por produto: maiores lucros, piores margens e faixas."""
+    import numpy as np
+
+    frame = load_sales(company_id, start, end)
+    grouped = frame.groupby('produto_id').agg(
+        receita=('total_price', 'sum'),
+        custo=('cost_price', 'sum'),
+        lucro=('lucro_total', 'sum'),
+        itens=('quantity', 'sum'),
+    )
+    revenue = grouped['receita'].to_numpy(float)
+    profit = grouped['lucro'].to_numpy(float)
+    grouped['margem'] = np.divide(
+        profit * 100,
+        revenue,
+        out=np.zeros_like(profit),
+        where=revenue > 0,
+    )
+
+    counts, _ = np.histogram(grouped['margem'].to_numpy(), MARGIN_BANDS)
+    total_revenue = float(revenue.sum())
+
+    def rows(selection) -> List[Dict[str, Any]]:
+        return [
+            {
+                'produto_id': int(product_id),
+                'receita': round(float(row['receita']), 2),
+                'custo': round(float(row['custo']), 2),
+                'lucro': round(float(row['lucro']), 2),
+                'itens': int(row['itens']),
+                'margem': round(float(row['margem']), 2),
+            }
+            for product_id, row in selection.iterrows()
+        ]
+
+    return {
+        'inicio': start.isoformat(),
+        'fim': end.isoformat(),
+        'margem_geral': (
+            round(float(profit.sum()) / total_revenue * 100, 2)
+            if total_revenue
+            else 0.0
+        ),
+        'faixas': dict(zip(MARGIN_LABELS, counts.tolist())),
+        'maiores_lucros': rows(grouped.nlargest(limit, 'lucro')),
+        'menores_margens': rows(
+            grouped[grouped['receita'] > 0].nsmallest(limit, 'margem')
+        ),
+    }
+
+
+class AnalyticsReports:
+    """Executa os relatórios de uma empresa no pool de processos."""
+
+    def __init__(self, company_id: int, start: date, end: date):
+        if start > end:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='A data inicial deve ser anterior à final.',
+            )
+        if (end - start).days >= MAX_REPORT_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'O período é limitado a {MAX_REPORT_DAYS} dias.',
+            )
+        self.company_id = company_id
+        self.start = start
+        self.end = end
+
+    async def _run(self, func, *args) -> Dict[str, Any]:
+        try:
+            return await run_cpu(
+                func, self.company_id, self.start, self.end, *args
+            )
+        except ImportError as e:
+            LOGGER.error(f'Relatório analítico indisponível: {e}')
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Leitura de Parquet indisponível (instale pyarrow).',
+            )
+
+    async def comparison(self) -> Dict[str, Any]:
+        return await self._run(period_comparison)
+
+    async def heatmap(self) -> Dict[str, Any]:
+        return await self._run(hourly_heatmap)
+
+    async def margins(self, limit: int = 20) -> Dict[str, Any]:
+        report = await self._run(margin_analysis, limit)
+
+        # Nomes dos produtos listados (uma consulta pelos ids)
+        ids = {
+            row['produto_id']
+            for key in ('maiores_lucros', 'menores_margens')
+            for row in report[key]
+        }
+        names = {}
+        if ids:
+            names = dict(
+                await Produto.filter(
+                    usuario_id=self.company_id, id__in=list(ids)
+                ).values_list('id', 'name')
+            )
+        for key in ('maiores_lucros', 'menores_margens'):
+            for row in report[key]:
+                row['nome'] = names.get(row['produto_id'])
+        return report
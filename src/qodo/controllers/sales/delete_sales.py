@@ -1,9 +1,29 @@
 from typing import Optional
 
+from tortoise.expressions import F
+from tortoise.transactions import in_transaction
+
+from qodo.core.cache_tags import TAG_SALES, tagged_cache
+from qodo.core.catalog import stamp, stock_changed
+from qodo.core.sales_rollup import sales_rollup
+from qodo.core.stock_ledger import REVERSAL, stock_ledger
 from qodo.model.product import Produto
 from qodo.model.sale import Sales
 
 
+async def _add_stock(product_id: int, quantity: int, connection) -> int:
+    """Soma `quantity` ao estoque no próprio UPDATE e devolve o saldo."""
+    await Produto.filter(id=product_id).using_db(connection).update(
+        stock=F('stock') + quantity
+    )
+    return (
+        await Produto.filter(id=product_id)
+        .using_db(connection)
+        .first()
+        .values_list('stock', flat=True)
+    )
+
+
 async def delete_or_update_sale(
     user_id: int, sale_id: int, new_quantity: Optional[int] = None
 ):
@@ -24,24 +44,48 @@ async def delete_or_update_sale(
         if not sale:
             return {'status': 404, 'msg': 'Venda não encontrada.'}
 
-        # Busca o produto relacionado à venda
+        # Busca o produto relacionado à venda (preços; o estoque é
+        # alterado direto no banco, dentro da transação)
         produto = await Produto.get(id=sale.produto_id)  # type: ignore
 
         if new_quantity is not None:
             # Guarda quantidade antiga
             old_quantity = sale.quantity
 
-            # Atualiza quantidade, total_price e lucro
-            sale.quantity = new_quantity
-            sale.total_price = new_quantity * produto.sale_price
-            sale.lucro_total = new_quantity * (
-                produto.sale_price - produto.cost_price
-            )
-            await sale.save()
+            # Venda, resumo diário, estoque e histórico: uma transação
+            async with in_transaction() as connection:
+                await sales_rollup.remove_sale(sale)
+                sale.quantity = new_quantity
+                sale.total_price = new_quantity * produto.sale_price
+                sale.lucro_total = new_quantity * (
+                    produto.sale_price - produto.cost_price
+                )
+                await sale.save(using_db=connection)
+                await sales_rollup.record_sale(sale)
 
-            # Ajusta estoque corretamente
-            produto.stock += old_quantity - new_quantity
-            await produto.save()
+                # Ajusta estoque corretamente
+                new_stock = await _add_stock(
+                    produto.id, old_quantity - new_quantity, connection
+                )
+                await stock_ledger.record(
+                    user_id,
+                    {produto.id: old_quantity - new_quantity},
+                    REVERSAL,
+                    reference=sale.sale_code,
+                    using_db=connection,
+                )
+                version = await stamp(
+                    user_id, changed=(produto.id,), using_db=connection
+                )
+
+            # Cache e eventos só depois do commit
+            await tagged_cache.bump(user_id, TAG_SALES)
+            await stock_changed(
+                user_id,
+                produto.id,
+                deltas={produto.id: old_quantity - new_quantity},
+                version=version,
+            )
 
             return {
                 'status': 200,
@@ -51,22 +95,43 @@ async def delete_or_update_sale(
                 'new_total_price': sale.total_price,
                 'old_quantity': old_quantity,
                 'new_quantity': new_quantity,
-                'new_stock': produto.stock,
+                'new_stock': new_stock,
             }
 
         else:
             # Deleta venda e devolve quantidade ao estoque
-            produto.stock += sale.quantity
-            await produto.save()
+            async with in_transaction() as connection:
+                new_stock = await _add_stock(
+                    produto.id, sale.quantity, connection
+                )
+                await stock_ledger.record(
+                    user_id,
+                    {produto.id: sale.quantity},
+                    REVERSAL,
+                    reference=sale.sale_code,
+                    using_db=connection,
+                )
+                await sales_rollup.remove_sale(sale)
+                await sale.delete(using_db=connection)
+                version = await stamp(
+                    user_id, changed=(produto.id,), using_db=connection
+                )
 
-            await sale.delete()
+            # Cache e eventos só depois do commit
+            await tagged_cache.bump(user_id, TAG_SALES)
+            await stock_changed(
+                user_id,
+                produto.id,
+                deltas={produto.id: sale.quantity},
+                version=version,
+            )
             return {
                 'status': 200,
                 'msg': 'Venda deletada com sucesso.',
                 'sale_id': sale_id,
                 'product_id': produto.id,
                 'quantity_returned': sale.quantity,
-                'new_stock': produto.stock,
+                'new_stock': new_stock,
             }
 
     except Exception as e:
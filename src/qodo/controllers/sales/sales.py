@@ -7,6 +7,9 @@ from tortoise.expressions import Q
 from tortoise.transactions import in_transaction
 
 from qodo.controllers.sales.receipt_build import build_receipt
+from qodo.core.barcode_map import barcode_map
+from qodo.core.sales_rollup import sales_rollup
+from qodo.core.search_index import product_index
 from qodo.model.customers import Customer
 from qodo.model.employee import Employees
 from qodo.model.product import Produto
@@ -67,45 +70,43 @@ class Checkout:
         code: Optional[str] = None,
         name: Optional[str] = None,
     ) -> Optional[Produto]:
-        """Busca produto pelo usuário, código ou nome - versão mais flexível e eficiente"""
+        """Busca produto pelo usuário, código ou nome usando o índice em memória"""
 
         try:
-            from tortoise.expressions import Q
-
             if not code and not name:
                 return None
 
-            # Cria a consulta inicial para o usuário
-            query = Q(usuario_id=user_id)
-
-            # Adiciona a lógica de busca por OR
-            search_terms = Q()
+            matches = []
 
+            # Código lido pelo scanner: resolução direta pelo mapa de códigos
             if code:
-                code_clean = str(code).strip().upper()
-                code_no_spaces = code_clean.replace(' ', '')
-
-                search_terms |= Q(product_code=code_clean)
-                search_terms |= Q(product_code__icontains=code_clean)
-
-                # Adiciona a busca sem espaços se for diferente
-                if code_no_spaces != code_clean:
-                    search_terms |= Q(product_code=code_no_spaces)
+                record = await barcode_map.resolve(user_id, code)
+                if record:
+                    return await Produto.get_or_none(
+                        id=record.id, usuario_id=user_id
+                    )
 
-            if name:
-                name_clean = name.strip().upper()
-                search_terms |= Q(name__icontains=name_clean)
+            # Código: apenas correspondência exata, prefixo ou substring
+            if code:
+                matches = await product_index.search(
+                    user_id, str(code).strip(), limit=1, fuzzy=False
+                )
 
-            # Executa a busca combinando todas as condições com AND
-            # O AND é implícito ao passar múltiplos Q objects no filter
-            product = await Produto.filter(query, search_terms).first()
+            # Nome: aceita correspondência aproximada (fuzzy)
+            if not matches and name:
+                matches = await product_index.search(
+                    user_id, name.strip(), limit=1
+                )
 
-            if not product:
+            if not matches:
                 print(
                     f'❌ Nenhum produto encontrado para o usuário {user_id} com os termos fornecidos.'
                 )
+                return None
 
-            return product
+            return await Produto.get_or_none(
+                id=matches[0]['id'], usuario_id=user_id
+            )
 
         except Exception as e:
             print(f'❌ Erro na busca do produto: {e}')
@@ -254,6 +255,7 @@ class Checkout:
                 self.venda = await Sales.create(
                     **sale_data, using_db=connection
                 )
+                await sales_rollup.record_sale(self.venda)
                 self.usuario = admin_user
 
                 # Prepara item para o recibo
@@ -0,0 +1,244 @@
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from tortoise.functions import Count, Sum
+
+from qodo.core.sales_rollup import day_bounds, today
+from qodo.model.caixa import Caixa
+from qodo.model.employee import Employees
+from qodo.model.product import Produto
+from qodo.model.sale import Sales
+
+"""
+sales_explorer: Consulta de vendas por janela de tempo.
+
+Substitui a listagem que carregava todas as vendas da empresa (com
+produto, caixa e funcionário) e as agrupava por caixa em Python.
+
+- `page`: vendas da janela, das mais recentes para as mais antigas, com
+  paginação por cursor (id da última venda da página). Produto, caixa e
+  funcionário vêm no mesmo SELECT (LEFT JOIN) e só a página é lida.
+- `groups`: totais agrupados no banco (GROUP BY) por caixa, funcionário,
+  forma de pagamento ou produto.
+
+A janela é obrigatoriamente limitada (MAX_WINDOW_DAYS) e usa o índice
+(usuario_id, criado_em) de vendas.
+"""
+
+DEFAULT_WINDOW_DAYS = 7
+MAX_WINDOW_DAYS = int(os.getenv('SALES_EXPLORER_MAX_DAYS', '366'))
+
+MAX_PAGE_SIZE = 200
+
+# Dimensão de agrupamento -> coluna de vendas
+GROUP_COLUMNS = {
+    'caixa': 'caixa_id',
+    'funcionario': 'funcionario_id',
+    'pagamento': 'payment_method',
+    'produto': 'produto_id',
+}
+
+PAGE_FIELDS = (
+    'id',
+    'quantity',
+    'total_price',
+    'lucro_total',
+    'cost_price',
+    'sale_code',
+    'payment_method',
+    'criado_em',
+    'produto_id',
+    'produto__name',
+    'produto__lot_bar_code',
+    'produto__image_url',
+    'produto__sale_price',
+    'caixa_id',
+    'caixa__nome',
+    'funcionario_id',
+    'funcionario__nome',
+)
+
+
+def _item(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'sales': {
+            'id': row['id'],
+            'quantity': row['quantity'],
+            'total_price': row['total_price'],
+            'total_profit': row['lucro_total'],
+            'cost_price': row['cost_price'],
+            'sale_code': row['sale_code'],
+            'payment_method': row['payment_method'],
+            'created_in': (
+                row['criado_em'].isoformat() if row['criado_em'] else None
+            ),
+            'employee_id': row['funcionario_id'],
+            'employee': row['funcionario__nome'],
+        },
+        'products': {
+            'id': row['produto_id'],
+            'name': row['produto__name'],
+            'lot_bar_code': row['produto__lot_bar_code'],
+            'image_url': row['produto__image_url'],
+            'sale_price': row['produto__sale_price'],
+        },
+        'caixa': {
+            'id': row['caixa_id'],
+            'name': row['caixa__nome'],
+        },
+    }
+
+
+class SalesExplorer:
+    """Vendas da empresa em uma janela de tempo, com filtros."""
+
+    def __init__(
+        self,
+        company_id: int,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        caixa_id: Optional[int] = None,
+        funcionario_id: Optional[int] = None,
+        payment_method: Optional[str] = None,
+        produto_id: Optional[int] = None,
+    ):
+        self.company_id = company_id
+        self.end = end or today()
+        self.start = start or self.end - timedelta(
+            days=DEFAULT_WINDOW_DAYS - 1
+        )
+        self.caixa_id = caixa_id
+        self.funcionario_id = funcionario_id
+        self.payment_method = payment_method
+        self.produto_id = produto_id
+
+        if self.start > self.end:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='A data inicial deve ser anterior à final.',
+            )
+        if (self.end - self.start).days >= MAX_WINDOW_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f'A janela de consulta é limitada a {MAX_WINDOW_DAYS} '
+                    'dias.'
+                ),
+            )
+
+    def _query(self):
+        query = Sales.filter(
+            usuario_id=self.company_id,
+            criado_em__gte=day_bounds(self.start)[0],
+            criado_em__lte=day_bounds(self.end)[1],
+        )
+        if self.caixa_id is not None:
+            query = query.filter(caixa_id=self.caixa_id)
+        if self.funcionario_id is not None:
+            query = query.filter(funcionario_id=self.funcionario_id)
+        if self.payment_method:
+            query = query.filter(payment_method=self.payment_method.upper())
+        if self.produto_id is not None:
+            query = query.filter(produto_id=self.produto_id)
+        return query
+
+    def _window(self) -> Dict[str, str]:
+        return {'start': self.start.isoformat(), 'end': self.end.isoformat()}
+
+    async def page(
+        self, cursor: Optional[int] = None, limit: int = 50
+    ) -> Dict[str, Any]:
+        """Uma página de vendas, da mais recente para a mais antiga."""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = self._query()
+        if cursor:
+            query = query.filter(id__lt=cursor)
+
+        rows = await query.order_by('-id').limit(limit + 1).values(
+            *PAGE_FIELDS
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            'window': self._window(),
+            'items': [_item(row) for row in rows],
+            'next_cursor': rows[-1]['id'] if has_more else None,
+            'has_more': has_more,
+        }
+
+    async def _labels(
+        self, by: str, keys: List[Any]
+    ) -> Dict[Any, Optional[str]]:
+        ids = [key for key in keys if key is not None]
+        if by == 'pagamento' or not ids:
+            return {}
+        if by == 'caixa':
+            rows = await Caixa.filter(
+                usuario_id=self.company_id, id__in=ids
+            ).values_list('id', 'nome')
+        elif by == 'funcionario':
+            rows = await Employees.filter(
+                usuario_id=self.company_id, id__in=ids
+            ).values_list('id', 'nome')
+        else:
+            rows = await Produto.filter(
+                usuario_id=self.company_id, id__in=ids
+            ).values_list('id', 'name')
+        return dict(rows)
+
+    async def groups(self, by: str, limit: int = 50) -> Dict[str, Any]:
+        """Totais da janela agrupados por `by` (maior receita primeiro)."""
+        column = GROUP_COLUMNS.get(by)
+        if column is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Agrupamento inválido. Use: '
+                + ', '.join(GROUP_COLUMNS),
+            )
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        rows = (
+            await self._query()
+            .annotate(
+                vendas=Count('id'),
+                vendas_distintas=Count('sale_code', distinct=True),
+                receita=Sum('total_price'),
+                lucro=Sum('lucro_total'),
+                itens=Sum('quantity'),
+            )
+            .group_by(column)
+            .order_by('-receita')
+            .limit(limit)
+            .values(
+                column,
+                'vendas',
+                'vendas_distintas',
+                'receita',
+                'lucro',
+                'itens',
+            )
+        )
+        labels = await self._labels(by, [row[column] for row in rows])
+
+        return {
+            'window': self._window(),
+            'group_by': by,
+            'groups': [
+                {
+                    'key': row[column],
+                    'label': (
+                        row[column]
+                        if by == 'pagamento'
+                        else labels.get(row[column])
+                    ),
+                    'sales_count': row['vendas'],
+                    'distinct_sales': row['vendas_distintas'],
+                    'revenue': round(float(row['receita'] or 0), 2),
+                    'profit': round(float(row['lucro'] or 0), 2),
+                    'items': int(row['itens'] or 0),
+                }
+                for row in rows
+            ],
+        }
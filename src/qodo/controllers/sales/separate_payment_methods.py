@@ -1,93 +1,207 @@
-import json
-from datetime import datetime
-from typing import Any, Dict, List
+from datetime import date
+from typing import Any, Dict, List, Optional
 
 from fastapi import HTTPException, status
+from tortoise.functions import Count, Sum
+
+from qodo.core.cache_tags import TAG_SALES
+from qodo.core.cached import cached
+from qodo.core.sales_rollup import day_bounds, sales_rollup, today
+from qodo.model.sale import PaymentMethods, Sales
+
+"""
+Totais de vendas por forma de pagamento em um período.
+
+Sem filtro de caixa os totais vêm do resumo diário (core/sales_rollup.py),
+que já está agrupado por dia, funcionário e forma de pagamento. Com
+filtro de caixa a agregação é feita no banco, com um GROUP BY sobre as
+vendas do período (índice usuario_id, criado_em). Em nenhum caso o
+histórico é carregado para o Python: só as vendas do dia, listadas em
+`sales_list` como antes.
+
+`distinct_sales` (e o `average_ticket`) é contado por forma de pagamento:
+uma venda paga em duas formas conta uma vez em cada uma. A soma dos
+métodos não é o total de vendas distintas do período.
+
+Benchmark: benchmarks/bench_payment_breakdown.py
+"""
+
+
+def _empty() -> Dict[str, Any]:
+    return {
+        'vendas': 0,
+        'vendas_distintas': 0,
+        'receita': 0.0,
+        'lucro': 0.0,
+        'itens': 0,
+    }
+
+
+async def _aggregate_sales(
+    user_id: int,
+    start: Optional[date],
+    end: Optional[date],
+    caixa_id: Optional[int],
+    funcionario_id: Optional[int],
+) -> Dict[str, Dict[str, Any]]:
+    """GROUP BY payment_method sobre as vendas do período."""
+    query = Sales.filter(usuario_id=user_id)
+    if start is not None:
+        query = query.filter(criado_em__gte=day_bounds(start)[0])
+    if end is not None:
+        query = query.filter(criado_em__lte=day_bounds(end)[1])
+    if caixa_id is not None:
+        query = query.filter(caixa_id=caixa_id)
+    if funcionario_id is not None:
+        query = query.filter(funcionario_id=funcionario_id)
+
+    rows = (
+        await query.annotate(
+            vendas=Count('id'),
+            vendas_distintas=Count('sale_code', distinct=True),
+            receita=Sum('total_price'),
+            lucro=Sum('lucro_total'),
+            itens=Sum('quantity'),
+        )
+        .group_by('payment_method')
+        .values(
+            'payment_method',
+            'vendas',
+            'vendas_distintas',
+            'receita',
+            'lucro',
+            'itens',
+        )
+    )
+    return {str(row.pop('payment_method')).upper(): row for row in rows}
+
 
-from qodo.core.cache import client
-from qodo.model.sale import Sales
+async def _sales_of_the_day(
+    user_id: int,
+    day: date,
+    caixa_id: Optional[int],
+    funcionario_id: Optional[int],
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Vendas do dia por forma de pagamento (`sales_list`)."""
+    start_of_day, end_of_day = day_bounds(day)
+    query = Sales.filter(
+        usuario_id=user_id,
+        criado_em__gte=start_of_day,
+        criado_em__lte=end_of_day,
+    )
+    if caixa_id is not None:
+        query = query.filter(caixa_id=caixa_id)
+    if funcionario_id is not None:
+        query = query.filter(funcionario_id=funcionario_id)
+
+    sales: Dict[str, List[Dict[str, Any]]] = {}
+    for prod in await query.order_by('id').values(
+        'id',
+        'product_name',
+        'quantity',
+        'total_price',
+        'payment_method',
+        'criado_em',
+    ):
+        sales.setdefault(str(prod['payment_method']).upper(), []).append(
+            {
+                'id': prod['id'],
+                'Product_name': prod['product_name'],
+                'amount': prod['quantity'],
+                'price': prod['total_price'],
+                'date': prod['criado_em'].strftime('%d/%m/%Y %H:%M:%S'),
+            }
+        )
+    return sales
+
+
+def _format(totals: Dict[str, Any]) -> Dict[str, Any]:
+    count = int(totals['vendas'] or 0)
+    distinct = int(totals['vendas_distintas'] or 0)
+    revenue = float(totals['receita'] or 0)
+    return {
+        'total_value': f'R$ {revenue:.2f}',
+        'total_quantity': int(totals['itens'] or 0),
+        'revenue': round(revenue, 2),
+        'profit': round(float(totals['lucro'] or 0), 2),
+        'sales_count': count,
+        'distinct_sales': distinct,
+        'average_sale': round(revenue / count, 2) if count else 0.0,
+        'average_ticket': round(revenue / distinct, 2) if distinct else 0.0,
+    }
 
 
 async def separating_sales_by_payments(
     user_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    caixa_id: Optional[int] = None,
+    funcionario_id: Optional[int] = None,
 ) -> Dict[str, Dict[str, Any]]:
     """
-    Separa todas as vendas por métodos de pagamentos, calculando o valor total
-    (em Reais) e a quantidade total de itens para cada método.
+    Separa as vendas do período por métodos de pagamento: quantidade de
+    vendas, valor total, lucro, itens e médias (por venda e ticket médio).
 
-    Retorna um dicionário onde a chave é o método de pagamento e o valor
-    contém os totais e a lista detalhada de vendas.
+    Sem `start` considera todo o histórico; sem `end`, até hoje.
+    `caixa_id` e `funcionario_id` restringem a um caixa ou a um
+    funcionário. `sales_list` traz as vendas do dia corrente, qualquer
+    que seja o período.
     """
-
-    # 🎯 ESTRUTURA CORRIGIDA: Inicializa os métodos com os contadores zerados
-    methods: Dict[str, Dict[str, Any]] = {
-        'PIX': {'total_value': 0.0, 'total_quantity': 0, 'sales_list': []},
-        'CARTAO': {'total_value': 0.0, 'total_quantity': 0, 'sales_list': []},
-        'DINHEIRO': {
-            'total_value': 0.0,
-            'total_quantity': 0,
-            'sales_list': [],
-        },
-        'NOTA': {'total_value': 0.0, 'total_quantity': 0, 'sales_list': []},
-        'FIADO': {'total_value': 0.0, 'total_quantity': 0, 'sales_list': []},
-    }
+    # O dia entra na chave do cache: `sales_list` e o fim padrão mudam
+    # na virada do dia
+    day = today()
+    return await _breakdown(
+        user_id,
+        day,
+        start,
+        end if end is not None else day,
+        caixa_id,
+        funcionario_id,
+    )
+
+
+@cached(
+    'payments:{user_id}:{day}:{start}:{end}:{caixa_id}:{funcionario_id}',
+    ttl=600,
+    tags=(TAG_SALES,),
+)
+async def _breakdown(
+    user_id: int,
+    day: date,
+    start: Optional[date],
+    end: date,
+    caixa_id: Optional[int],
+    funcionario_id: Optional[int],
+) -> Dict[str, Dict[str, Any]]:
+    methods = {method.value: _empty() for method in PaymentMethods}
 
     try:
-        cache_key = f'payments:{user_id}'
-        cache = await client.get(cache_key)
-
-        if cache:
-            return json.loads(cache)
-
         if not user_id:
-            return methods
-
-        all_sales = await Sales.filter(usuario_id=user_id)
-
-        for prod in all_sales:
-            # Garante que o método de pagamento seja sempre em UPPERCASE,
-            # para corresponder às chaves do nosso dicionário 'methods'
-            payment_key = prod.payment_method.upper()
-
-            # Monta o objeto de dados detalhado da venda
-            data = {
-                'id': prod.id,
-                'Product_name': prod.product_name,
-                'amount': prod.quantity,
-                'price': prod.total_price,
-                # Ajuste no formato da data para incluir a hora correta da venda
-                'date': prod.criado_em.strftime('%d/%m/%Y %H:%M:%S'),
+            return {
+                key: {**_format(value), 'sales_list': []}
+                for key, value in methods.items()
             }
 
-            # ATUALIZAÇÃO DOS TOTAIS E ADIÇÃO DA VENDA DETALHADA
+        if caixa_id is None:
+            totals = await sales_rollup.by_payment(
+                user_id, start, end, funcionario_id
+            )
+        else:
+            totals = await _aggregate_sales(
+                user_id, start, end, caixa_id, funcionario_id
+            )
+
+        for payment_key, value in totals.items():
             if payment_key in methods:
-                # 1. Adiciona os dados detalhados à lista
-                methods[payment_key]['sales_list'].append(data)
-
-                # 2. Atualiza o valor total vendido
-                methods[payment_key]['total_value'] += prod.total_price
-
-                # 3. Atualiza a quantidade total de itens vendidos
-                methods[payment_key]['total_quantity'] += prod.quantity
-
-            # Nota: O 'else' original que criava uma nova chave não é mais necessário,
-            # pois PaymentMethods garante que as chaves já existem.
-            # Se for necessário tratar métodos de pagamento não mapeados, adicione o 'else' aqui.
-
-        # 🔹 Antes de salvar, convertemos os números de ponto flutuante para strings formatadas
-        # (Opcional, mas ajuda a manter o formato monetário na saída final)
-        final_result = {}
-        for key, value in methods.items():
-            final_result[key] = {
-                'total_value': f"R$ {value['total_value']:.2f}",
-                'total_quantity': value['total_quantity'],
-                'sales_list': value['sales_list'],
-            }
+                methods[payment_key] = value
 
-        await client.setex(
-            cache_key, 60, json.dumps(final_result, default=str)
+        sales_today = await _sales_of_the_day(
+            user_id, day, caixa_id, funcionario_id
         )
-        return final_result
+        return {
+            key: {**_format(value), 'sales_list': sales_today.get(key, [])}
+            for key, value in methods.items()
+        }
 
     except Exception as e:
         # É importante registrar o erro (e) em um log de produção
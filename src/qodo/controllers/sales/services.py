@@ -2,21 +2,61 @@ from datetime import datetime
 from typing import Optional
 
 from fastapi import HTTPException
-from tortoise.expressions import Q
+from tortoise.expressions import F
 from tortoise.transactions import atomic
 
 from qodo.controllers.car.cart_control import CartManagerDB
 
 # Certifique-se de que os imports estão corretos
 from qodo.controllers.sales.sales import Checkout
+from qodo.core.barcode_map import barcode_map
+from qodo.core.cache_tags import TAG_SALES, tagged_cache
+from qodo.core.catalog import stamp, stock_changed
+from qodo.core.sales_rollup import sales_rollup
+from qodo.core.stock_ledger import SALE, stock_ledger
 from qodo.model.product import Produto
 from qodo.model.sale import Sales
 from qodo.model.user import Usuario
 from qodo.utils.sales_code_generator import gerar_codigo_venda
 
 
+class VendaRecusada(Exception):
+    """Venda recusada: a transação é desfeita e `result` vai ao cliente."""
+
+    def __init__(self, result: dict):
+        super().__init__(result.get('error'))
+        self.result = result
+
+
+async def processar_venda_carrinho(user_id: int, *args, **kwargs) -> dict:
+    """
+    Processa a venda do carrinho (ver `_registrar_venda_carrinho`) e, só
+    depois do commit, invalida o cache de vendas e notifica a alteração
+    de estoque (PDVs, resumo e alertas).
+
+    Um item não encontrado ou sem estoque recusa a venda inteira: nada é
+    lançado e a resposta lista os códigos (`nao_encontrados`,
+    `sem_estoque`).
+    """
+    try:
+        result, produtos_alterados, version = (
+            await _registrar_venda_carrinho(user_id, *args, **kwargs)
+        )
+    except VendaRecusada as e:
+        return e.result
+    if result.get('success'):
+        await tagged_cache.bump(user_id, TAG_SALES)
+        await stock_changed(
+            user_id,
+            *produtos_alterados,
+            deltas=produtos_alterados,
+            version=version,
+        )
+    return result
+
+
 @atomic()
-async def processar_venda_carrinho(
+async def _registrar_venda_carrinho(
     user_id: int,  # Recebe o ID do usuário em vez do objeto completo
     cart_items: list,
     payment_method: str,
@@ -29,9 +69,12 @@ async def processar_venda_carrinho(
     sale_code: Optional[
         str
     ] = None,  # 🔹 NOVO: Receber sale_code como parâmetro
-) -> dict:
+) -> tuple:
     """
-    Processa todos os itens do carrinho em uma única transação
+    Processa todos os itens do carrinho em uma única transação.
+
+    Retorna o resultado, a variação de estoque por produto e a versão do
+    catálogo gravada nos produtos vendidos.
     """
 
     print('DEBUG: Iniciando processamento do carrinho...')
@@ -45,10 +88,15 @@ async def processar_venda_carrinho(
     lucro_geral = 0.0
     cost_total_geral = 0.0
     produto_id = None
+    # Variação de estoque por produto (resumo do estoque)
+    produtos_alterados = {}
+    # Itens que recusam a venda (código desconhecido / saldo insuficiente)
+    nao_encontrados = []
+    sem_estoque = []
 
     if not cart_items:
         print('DEBUG: Carrinho está vazio, retornando falha.')
-        return {'success': False, 'error': 'O carrinho está vazio.'}
+        return {'success': False, 'error': 'O carrinho está vazio.'}, {}, None
 
     try:
         print(f'DEBUG: Buscando usuário com ID {user_id}...')
@@ -95,9 +143,8 @@ async def processar_venda_carrinho(
             __saving_product_name.append({products_name})
 
             if not product_code:
-                print(
-                    f'DEBUG Item {i+1}: Pulando. product_code é None ou vazio.'
-                )
+                print(f'DEBUG Item {i+1}: product_code é None ou vazio.')
+                nao_encontrados.append(product_code)
                 continue
 
             # 2. Busca do Produto no DB
@@ -106,39 +153,41 @@ async def processar_venda_carrinho(
                 f"DEBUG Item {i+1}: Buscando produto com Code='{cleaned_code}' e user_id={current_user.id}"
             )
 
-            busca_produto = Q(usuario_id=current_user.id) & Q(
-                product_code=cleaned_code
-            )
-            produto = await Produto.filter(busca_produto).first()
+            # Resolução O(1) pelo mapa de códigos (product_code ou lot_bar_code)
+            record = await barcode_map.resolve(current_user.id, cleaned_code)
 
-            if not produto:
-                print(
-                    f'DEBUG Item {i+1}: Pulando. Produto NÃO ENCONTRADO no DB.'
-                )
+            if not record:
+                print(f'DEBUG Item {i+1}: Produto NÃO ENCONTRADO no DB.')
+                nao_encontrados.append(product_code)
                 continue
 
-            # 3. Verificar estoque
-            stock_available = produto.stock or 0
-            print(
-                f'DEBUG Item {i+1}: Produto Encontrado. Estoque: {stock_available}, Solicitado: {quantity}'
+            # 3/4. Baixa de estoque condicional: só atualiza se houver saldo
+            updated = await Produto.filter(
+                id=record.id,
+                usuario_id=current_user.id,
+                stock__gte=int(quantity),
+            ).update(
+                stock=F('stock') - int(quantity),
+                atualizado_em=datetime.now(),
             )
 
-            if stock_available < int(quantity):
-                print(f'DEBUG Item {i+1}: Pulando. Estoque insuficiente.')
+            if not updated:
+                print(f'DEBUG Item {i+1}: Estoque insuficiente.')
+                sem_estoque.append(product_code)
                 continue
 
-            # 4. Atualizar estoque
-            produto.stock -= int(quantity)
-            produto.atualizado_em = datetime.now()
-            await produto.save()
-            print(
-                f'DEBUG Item {i+1}: Estoque atualizado. Novo estoque: {produto.stock}'
+            # Preços lidos do banco na transação (o mapa só resolve o id)
+            produto = await Produto.get(id=record.id).only(
+                'id', 'name', 'product_code', 'sale_price', 'cost_price'
             )
 
             # 5. Calcular valores
             sale_price = float(produto.sale_price or 0.0)
             cost_price = float(produto.cost_price or 0.0)
             produto_id = produto.id
+            produtos_alterados[produto.id] = produtos_alterados.get(
+                produto.id, 0
+            ) - int(quantity)
 
             total_price = int(quantity) * sale_price
             lucro_total = (sale_price - cost_price) * int(quantity)
@@ -169,10 +218,26 @@ async def processar_venda_carrinho(
 
         print(f'DEBUG ERRO FATAL NO LOOP: {str(e)}')
         print(traceback.format_exc())
-        return {
-            'success': False,
-            'error': f'Erro interno ao processar itens do carrinho: processar_venda_carrinho {str(e)}',
-        }
+        # Exceção: desfaz as baixas de estoque já feitas no loop
+        raise VendaRecusada(
+            {
+                'success': False,
+                'error': f'Erro interno ao processar itens do carrinho: processar_venda_carrinho {str(e)}',
+            }
+        )
+
+    if nao_encontrados or sem_estoque:
+        raise VendaRecusada(
+            {
+                'success': False,
+                'error': (
+                    'Itens do carrinho não puderam ser vendidos; nada foi '
+                    'lançado.'
+                ),
+                'nao_encontrados': nao_encontrados,
+                'sem_estoque': sem_estoque,
+            }
+        )
 
     print(
         f'DEBUG: Loop de processamento finalizado. Itens processados: {len(itens_processados)}'
@@ -183,7 +248,7 @@ async def processar_venda_carrinho(
         return {
             'success': False,
             'error': f'Nenhum dos {len(cart_items)} itens pôde ser processado. processar_venda_carrinho',
-        }
+        }, {}, None
 
     # 🔹 7. Preparação dos dados para a Venda (Sales)
     print('DEBUG: Criando dados da Venda (Sales)...')
@@ -207,6 +272,15 @@ async def processar_venda_carrinho(
     # 🔹 8. Criar a venda no DB
     venda = await Sales.create(**venda_data)
     print(f'DEBUG: Venda (Sales) criada com ID: {venda.id}')
+    await sales_rollup.record_sale(venda)
+
+    # Histórico de estoque e versão do catálogo na mesma transação da
+    # venda; cache e eventos ficam para depois do commit
+    # (processar_venda_carrinho)
+    await stock_ledger.record(
+        current_user.id, produtos_alterados, SALE, reference=sale_code
+    )
+    version = await stamp(current_user.id, changed=produtos_alterados)
 
     # 🔹 9. Criar checkout instance
     checkout_instance = Checkout()
@@ -241,4 +315,4 @@ async def processar_venda_carrinho(
             'sale_code': sale_code,  # 🔹 CORREÇÃO: Retornar sale_code
             'venda_id': venda.id,
         },
-    }
+    }, produtos_alterados, version
@@ -0,0 +1,292 @@
+# src/core/abc_curve.py
+import asyncio
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from tortoise.functions import Count, Sum
+from tortoise.transactions import in_transaction
+
+from qodo.core.analytics_export import analytics_export, read_partitions
+from qodo.core.cache import client
+from qodo.core.process_pool import run_cpu
+from qodo.core.sales_rollup import TIMEZONE, today
+from qodo.logs.infos import LOGGER
+from qodo.model.abc_curve import CurvaABC
+from qodo.model.user import Usuario
+
+"""
+abc_curve: Classificação ABC (Pareto) dos produtos por receita.
+
+Uma vez por dia (ABC_HOUR, fora do horário de pico), para cada empresa e
+cada janela em ABC_WINDOWS:
+
+1. a cópia em Parquet (core/analytics_export.py) é atualizada;
+2. receita, lucro e itens por produto são somados e classificados com
+   numpy no pool de processos: ordena pela receita, acumula a
+   participação e marca A até ABC_LIMIT_A (80%), B até ABC_LIMIT_B (95%)
+   e C no restante;
+3. o resultado substitui as linhas da janela na tabela curva_abc.
+
+A rota lê a tabela pelo índice (empresa, janela, posição/classe).
+"""
+
+# Janelas (dias) calculadas
+ABC_WINDOWS = tuple(
+    int(days)
+    for days in os.getenv('ABC_WINDOWS', '30,90,365').split(',')
+    if days.strip()
+)
+
+# Limites da receita acumulada de cada classe
+ABC_LIMIT_A = float(os.getenv('ABC_LIMIT_A', '0.80'))
+ABC_LIMIT_B = float(os.getenv('ABC_LIMIT_B', '0.95'))
+
+# Horário local do cálculo diário
+ABC_HOUR = int(os.getenv('ABC_HOUR', '3'))
+
+ABC_LOCK_KEY = 'lock:abc_curve:{day}'
+
+CLASSES = ('A', 'B', 'C')
+
+SALES_COLUMNS = ['produto_id', 'quantity', 'total_price', 'lucro_total']
+
+
+def classify_products(
+    company_id: int,
+    start: date,
+    end: date,
+    limit_a: float = ABC_LIMIT_A,
+    limit_b: float = ABC_LIMIT_B,
+) -> List[Dict[str, Any]]:
+    """
+    Curva ABC dos produtos vendidos entre `start` e `end` (executado no
+    pool de processos). Retorna as linhas já ordenadas pela receita.
+    """
+    import numpy as np
+
+    frame = read_partitions(company_id, 'vendas', start, end, SALES_COLUMNS)
+    if not len(frame):
+        return []
+
+    grouped = frame.groupby('produto_id').agg(
+        receita=('total_price', 'sum'),
+        lucro=('lucro_total', 'sum'),
+        itens=('quantity', 'sum'),
+    )
+    product_ids = grouped.index.to_numpy(np.int64)
+    revenue = grouped['receita'].to_numpy(float)
+    profit = grouped['lucro'].to_numpy(float)
+    items = grouped['itens'].to_numpy(np.int64)
+
+    order = np.argsort(-revenue, kind='stable')
+    product_ids = product_ids[order]
+    revenue = revenue[order]
+    profit = profit[order]
+    items = items[order]
+
+    total = revenue.sum()
+    share = revenue / total if total > 0 else np.zeros_like(revenue)
+    cumulative = np.cumsum(share)
+    # Classe pela participação acumulada ANTES do produto: o produto que
+    # cruza os 80% ainda é A
+    before = cumulative - share
+    classes = np.where(
+        before < limit_a, 'A', np.where(before < limit_b, 'B', 'C')
+    )
+    margin = np.divide(
+        profit * 100,
+        revenue,
+        out=np.zeros_like(profit),
+        where=revenue > 0,
+    )
+
+    return [
+        {
+            'produto_id': int(product_ids[index]),
+            'posicao': index + 1,
+            'classe': str(classes[index]),
+            'receita': round(float(revenue[index]), 2),
+            'lucro': round(float(profit[index]), 2),
+            'margem': round(float(margin[index]), 2),
+            'itens': int(items[index]),
+            'participacao': round(float(share[index]), 6),
+            'acumulado': round(float(cumulative[index]), 6),
+        }
+        for index in range(len(product_ids))
+    ]
+
+
+class ABCCurve:
+    """Calcula e consulta a curva ABC das empresas."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def window(days: int) -> Tuple[date, date]:
+        end = today() - timedelta(days=1)  # dias completos
+        return end - timedelta(days=days - 1), end
+
+    async def compute(self, company_id: int, days: int) -> int:
+        """Recalcula uma janela da empresa (produtos classificados)."""
+        start, end = self.window(days)
+        rows = await run_cpu(classify_products, company_id, start, end)
+
+        async with in_transaction() as connection:
+            await CurvaABC.filter(
+                usuario_id=company_id, janela_dias=days
+            ).using_db(connection).delete()
+            await CurvaABC.bulk_create(
+                [
+                    CurvaABC(usuario_id=company_id, janela_dias=days, **row)
+                    for row in rows
+                ],
+                batch_size=1000,
+                using_db=connection,
+            )
+        return len(rows)
+
+    async def compute_company(self, company_id: int) -> None:
+        await analytics_export.export_company(company_id)
+        for days in ABC_WINDOWS:
+            await self.compute(company_id, days)
+
+    async def compute_all(self) -> None:
+        started = datetime.now()
+        failed = 0
+        companies = await Usuario.all().values_list('id', flat=True)
+        for company_id in companies:
+            try:
+                await self.compute_company(company_id)
+            except Exception as e:
+                failed += 1
+                LOGGER.error(
+                    f'Falha ao calcular a curva ABC da empresa '
+                    f'{company_id}: {e}'
+                )
+        LOGGER.info(
+            f'Curva ABC: {len(companies)} empresas, {failed} falhas, '
+            f'{(datetime.now() - started).total_seconds():.1f}s'
+        )
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+    async def summary(self, company_id: int, days: int) -> Dict[str, Any]:
+        """Quantidade de produtos, receita e lucro de cada classe."""
+        rows = (
+            await CurvaABC.filter(usuario_id=company_id, janela_dias=days)
+            .annotate(
+                produtos=Count('id'),
+                receita=Sum('receita'),
+                lucro=Sum('lucro'),
+            )
+            .group_by('classe')
+            .values('classe', 'produtos', 'receita', 'lucro')
+        )
+        classes = {
+            name: {'produtos': 0, 'receita': 0.0, 'lucro': 0.0}
+            for name in CLASSES
+        }
+        for row in rows:
+            classes[row['classe']] = {
+                'produtos': row['produtos'],
+                'receita': round(float(row['receita'] or 0), 2),
+                'lucro': round(float(row['lucro'] or 0), 2),
+            }
+        calculated = (
+            await CurvaABC.filter(usuario_id=company_id, janela_dias=days)
+            .order_by('posicao')
+            .first()
+            .values_list('calculado_em', flat=True)
+        )
+        return {'classes': classes, 'calculado_em': calculated}
+
+    async def page(
+        self,
+        company_id: int,
+        days: int,
+        classe: Optional[str] = None,
+        cursor: Optional[int] = None,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """Produtos da curva pela posição no ranking de receita."""
+        query = CurvaABC.filter(usuario_id=company_id, janela_dias=days)
+        if classe:
+            query = query.filter(classe=classe)
+        if cursor:
+            query = query.filter(posicao__gt=cursor)
+
+        rows = (
+            await query.order_by('posicao')
+            .limit(limit + 1)
+            .values(
+                'produto_id',
+                'posicao',
+                'classe',
+                'receita',
+                'lucro',
+                'margem',
+                'itens',
+                'participacao',
+                'acumulado',
+            )
+        )
+        has_more = len(rows) > limit
+        items = rows[:limit]
+        return {
+            'items': items,
+            'next_cursor': items[-1]['posicao'] if has_more else None,
+            'has_more': has_more,
+        }
+
+    # ------------------------------------------------------------------
+    # Job diário
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _seconds_until_next_run() -> float:
+        now = datetime.now(TIMEZONE).replace(tzinfo=None)
+        next_run = datetime.combine(now.date(), time(hour=ABC_HOUR))
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+    async def _compute_once(self) -> None:
+        acquired = await client.acquire_lock(
+            ABC_LOCK_KEY.format(day=today().isoformat()), 86400
+        )
+        if acquired:
+            await self.compute_all()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._seconds_until_next_run())
+            try:
+                await self._compute_once()
+            except Exception as e:
+                LOGGER.error(f'Falha no cálculo da curva ABC: {e}')
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+# Instância global
+abc_curve = ABCCurve()
+
+__all__ = [
+    'ABC_WINDOWS',
+    'ABCCurve',
+    'abc_curve',
+    'classify_products',
+]
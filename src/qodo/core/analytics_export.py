@@ -0,0 +1,407 @@
+# src/core/analytics_export.py
+import asyncio
+import json
+import os
+import shutil
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from qodo.core.cache import client
+from qodo.core.sales_rollup import TIMEZONE, sale_day, today
+from qodo.logs.infos import LOGGER
+from qodo.model.cashmovement import CashMovement
+from qodo.model.delivery import Delivery
+from qodo.model.sale import Sales
+from qodo.model.stock_movement import MovimentoEstoque
+from qodo.model.user import Usuario
+
+"""
+analytics_export: Cópia colunar (Parquet) dos dados de cada empresa.
+
+Layout (partição por dia, estilo Hive):
+
+    ANALYTICS_DIR/<empresa>/<conjunto>/dia=AAAA-MM-DD/part-<ids>.parquet
+
+- Exportação incremental: cada conjunto guarda o último id exportado
+  (`_watermark.json`); só as linhas novas são lidas do banco, em blocos
+  por id, e gravadas como um arquivo novo na partição do dia.
+- Reescrita diária: as partições dos últimos REWRITE_DAYS dias são
+  regravadas inteiras, o que reflete edições/cancelamentos de vendas e
+  junta os arquivos pequenos do dia em um só.
+
+Os relatórios (controllers/report_controller.py) leem só esses arquivos,
+com pandas/numpy, sem consultar o banco transacional.
+"""
+
+ANALYTICS_DIR = Path(os.getenv('ANALYTICS_DIR', 'data/analytics'))
+
+# Intervalo da exportação incremental (segundos)
+EXPORT_INTERVAL = int(os.getenv('ANALYTICS_EXPORT_INTERVAL', '900'))
+
+# Dias regravados por completo uma vez por dia
+REWRITE_DAYS = int(os.getenv('ANALYTICS_REWRITE_DAYS', '3'))
+
+EXPORT_LOCK_KEY = 'lock:analytics_export'
+REWRITE_LOCK_KEY = 'lock:analytics_export:rewrite:{day}'
+
+EXPORT_CHUNK = 50_000
+
+# Conjunto -> (modelo, campo de data, colunas)
+DATASETS: Dict[str, Tuple[Any, str, Tuple[str, ...]]] = {
+    'vendas': (
+        Sales,
+        'criado_em',
+        (
+            'id',
+            'criado_em',
+            'produto_id',
+            'caixa_id',
+            'funcionario_id',
+            'payment_method',
+            'sale_code',
+            'quantity',
+            'total_price',
+            'cost_price',
+            'lucro_total',
+        ),
+    ),
+    'caixa': (
+        CashMovement,
+        'criado_em',
+        (
+            'id',
+            'criado_em',
+            'caixa_id',
+            'funcionario_id',
+            'venda_id',
+            'tipo',
+            'valor',
+        ),
+    ),
+    'entregas': (
+        Delivery,
+        'created_at',
+        (
+            'id',
+            'created_at',
+            'customer_id',
+            'delivery_type',
+            'delivery_status',
+            'payment_status',
+            'total_distance_km',
+            'delivery_fee',
+            'total_price',
+        ),
+    ),
+    'estoque': (
+        MovimentoEstoque,
+        'criado_em',
+        ('id', 'criado_em', 'produto_id', 'quantidade', 'tipo', 'referencia'),
+    ),
+}
+
+# Tipos das colunas numéricas/datas: um período sem partições devolve um
+# DataFrame vazio com esses tipos (e não `object`), para que agregações
+# como nlargest/sum funcionem igual ao caso com dados.
+COLUMN_DTYPES: Dict[str, str] = {
+    'id': 'int64',
+    'produto_id': 'int64',
+    'caixa_id': 'float64',
+    'funcionario_id': 'float64',
+    'venda_id': 'float64',
+    'customer_id': 'float64',
+    'quantity': 'int64',
+    'quantidade': 'int64',
+    'total_price': 'float64',
+    'cost_price': 'float64',
+    'lucro_total': 'float64',
+    'valor': 'float64',
+    'total_distance_km': 'float64',
+    'delivery_fee': 'float64',
+    'criado_em': 'datetime64[ns]',
+    'created_at': 'datetime64[ns]',
+}
+
+
+def dataset_dir(company_id: int, dataset: str) -> Path:
+    return ANALYTICS_DIR / str(company_id) / dataset
+
+
+def partition_dir(company_id: int, dataset: str, day: date) -> Path:
+    return dataset_dir(company_id, dataset) / f'dia={day.isoformat()}'
+
+
+def partition_files(
+    company_id: int, dataset: str, start: date, end: date
+) -> List[str]:
+    """Arquivos Parquet das partições entre `start` e `end` (inclusive)."""
+    base = dataset_dir(company_id, dataset)
+    if not base.is_dir():
+        return []
+    files = []
+    for entry in sorted(base.glob('dia=*')):
+        try:
+            day = date.fromisoformat(entry.name[4:])
+        except ValueError:
+            continue
+        if start <= day <= end:
+            files.extend(str(path) for path in sorted(entry.glob('*.parquet')))
+    return files
+
+
+def read_partitions(
+    company_id: int,
+    dataset: str,
+    start: date,
+    end: date,
+    columns: List[str],
+):
+    """DataFrame com as colunas do conjunto entre `start` e `end`."""
+    import pandas as pd
+
+    files = partition_files(company_id, dataset, start, end)
+    if not files:
+        return pd.DataFrame(
+            {
+                column: pd.Series(
+                    dtype=COLUMN_DTYPES.get(column, 'object')
+                )
+                for column in columns
+            }
+        )
+    return pd.concat(
+        (pd.read_parquet(path, columns=columns) for path in files),
+        ignore_index=True,
+    )
+
+
+def _local(value: Optional[datetime]) -> Optional[datetime]:
+    """Data/hora local sem fuso (o que os relatórios esperam)."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(TIMEZONE).replace(tzinfo=None)
+    return value
+
+
+def _normalize(row: Dict[str, Any]) -> Dict[str, Any]:
+    for key, value in row.items():
+        if isinstance(value, datetime):
+            row[key] = _local(value)
+        elif hasattr(value, 'value'):  # enums (forma de pagamento)
+            row[key] = value.value
+    return row
+
+
+def write_partition(
+    target: Path, name: str, rows: List[Dict[str, Any]], replace: bool
+) -> None:
+    """Grava `rows` em `target/name` (executado fora do event loop)."""
+    import pandas as pd
+
+    frame = pd.DataFrame.from_records(rows)
+    if replace and target.exists():
+        staging = target.with_name(target.name + '.new')
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        frame.to_parquet(staging / name, index=False)
+        old = target.with_name(target.name + '.old')
+        os.replace(target, old)
+        os.replace(staging, target)
+        shutil.rmtree(old, ignore_errors=True)
+        return
+
+    target.mkdir(parents=True, exist_ok=True)
+    partial = target / f'.{name}.tmp'
+    frame.to_parquet(partial, index=False)
+    os.replace(partial, target / name)
+
+
+class AnalyticsExport:
+    """Exporta os conjuntos de cada empresa para Parquet."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _watermark_path(company_id: int, dataset: str) -> Path:
+        return dataset_dir(company_id, dataset) / '_watermark.json'
+
+    def _read_watermark(self, company_id: int, dataset: str) -> int:
+        try:
+            with open(self._watermark_path(company_id, dataset)) as source:
+                return int(json.load(source)['last_id'])
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def _write_watermark(
+        self, company_id: int, dataset: str, last_id: int
+    ) -> None:
+        path = self._watermark_path(company_id, dataset)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix('.tmp')
+        with open(partial, 'w') as target:
+            json.dump(
+                {'last_id': last_id, 'at': datetime.now().isoformat()}, target
+            )
+        os.replace(partial, path)
+
+    @staticmethod
+    def _by_day(
+        rows: List[Dict[str, Any]], date_field: str
+    ) -> Dict[date, List[Dict[str, Any]]]:
+        days: Dict[date, List[Dict[str, Any]]] = {}
+        for row in rows:
+            day = sale_day(row[date_field])
+            days.setdefault(day, []).append(_normalize(row))
+        return days
+
+    async def export_dataset(self, company_id: int, dataset: str) -> int:
+        """Exporta as linhas novas do conjunto. Retorna quantas foram."""
+        model, date_field, columns = DATASETS[dataset]
+        last_id = await asyncio.to_thread(
+            self._read_watermark, company_id, dataset
+        )
+        total = 0
+
+        while True:
+            rows = (
+                await model.filter(usuario_id=company_id, id__gt=last_id)
+                .order_by('id')
+                .limit(EXPORT_CHUNK)
+                .values(*columns)
+            )
+            if not rows:
+                break
+            first_id, last_id = rows[0]['id'], rows[-1]['id']
+
+            for day, day_rows in self._by_day(rows, date_field).items():
+                await asyncio.to_thread(
+                    write_partition,
+                    partition_dir(company_id, dataset, day),
+                    f'part-{first_id}-{last_id}.parquet',
+                    day_rows,
+                    False,
+                )
+            await asyncio.to_thread(
+                self._write_watermark, company_id, dataset, last_id
+            )
+            total += len(rows)
+
+        return total
+
+    async def rewrite_days(
+        self, company_id: int, dataset: str, since: date
+    ) -> None:
+        """
+        Regrava as partições a partir de `since` com o estado atual do
+        banco (um arquivo por dia). Linhas acima da marca d'água ficam
+        para a exportação incremental.
+        """
+        model, date_field, columns = DATASETS[dataset]
+        last_id = await asyncio.to_thread(
+            self._read_watermark, company_id, dataset
+        )
+        start = datetime.combine(since, datetime.min.time(), tzinfo=TIMEZONE)
+
+        rows = (
+            await model.filter(
+                usuario_id=company_id,
+                id__lte=last_id,
+                **{f'{date_field}__gte': start},
+            )
+            .order_by('id')
+            .values(*columns)
+        )
+        days = self._by_day(rows, date_field)
+
+        day = since
+        while day <= today():
+            target = partition_dir(company_id, dataset, day)
+            day_rows = days.get(day)
+            if day_rows:
+                await asyncio.to_thread(
+                    write_partition,
+                    target,
+                    f'part-{day_rows[0]["id"]}-{day_rows[-1]["id"]}.parquet',
+                    day_rows,
+                    True,
+                )
+            elif target.exists():
+                # Todas as linhas do dia foram apagadas
+                await asyncio.to_thread(shutil.rmtree, target, True)
+            day += timedelta(days=1)
+
+    async def export_company(self, company_id: int) -> Dict[str, int]:
+        exported = {}
+        for dataset in DATASETS:
+            exported[dataset] = await self.export_dataset(company_id, dataset)
+        return exported
+
+    async def export_all(self) -> None:
+        """Exportação incremental de todas as empresas."""
+        for company_id in await Usuario.all().values_list('id', flat=True):
+            try:
+                await self.export_company(company_id)
+            except Exception as e:
+                LOGGER.error(
+                    f'Falha ao exportar dados analíticos da empresa '
+                    f'{company_id}: {e}'
+                )
+
+    async def rewrite_all(self) -> None:
+        """Regrava os últimos REWRITE_DAYS dias de todas as empresas."""
+        since = today() - timedelta(days=REWRITE_DAYS)
+        for company_id in await Usuario.all().values_list('id', flat=True):
+            for dataset in DATASETS:
+                try:
+                    await self.rewrite_days(company_id, dataset, since)
+                except Exception as e:
+                    LOGGER.error(
+                        f'Falha ao regravar {dataset} da empresa '
+                        f'{company_id}: {e}'
+                    )
+
+    async def _run(self) -> None:
+        rewritten: Optional[date] = None
+        while True:
+            try:
+                if await client.acquire_lock(
+                    EXPORT_LOCK_KEY, EXPORT_INTERVAL
+                ):
+                    await self.export_all()
+                day = today()
+                if rewritten != day:
+                    key = REWRITE_LOCK_KEY.format(day=day.isoformat())
+                    if await client.acquire_lock(key, 86400):
+                        await self.rewrite_all()
+                    rewritten = day
+            except Exception as e:
+                LOGGER.error(f'Falha na exportação analítica: {e}')
+            await asyncio.sleep(EXPORT_INTERVAL)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+# Instância global
+analytics_export = AnalyticsExport()
+
+__all__ = [
+    'ANALYTICS_DIR',
+    'COLUMN_DTYPES',
+    'DATASETS',
+    'AnalyticsExport',
+    'analytics_export',
+    'partition_files',
+    'read_partitions',
+]
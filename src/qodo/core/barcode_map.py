@@ -0,0 +1,303 @@
+# src/core/barcode_map.py
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Union
+
+from tortoise.expressions import Q
+
+from qodo.logs.infos import LOGGER
+from qodo.model.catalog import CatalogVersion, ProdutoRemovido
+from qodo.model.product import Produto
+
+RECORD_FIELDS = (
+    'id',
+    'name',
+    'product_code',
+    'lot_bar_code',
+)
+
+# Acima disso a recarga completa sai mais barata que aplicar a diferença
+MAX_DELTA_ROWS = 5000
+
+
+def _code_key(code: Any) -> str:
+    """Normaliza o código lido pelo scanner (mesma regra do checkout)."""
+    return str(code).strip().upper() if code else ''
+
+
+@dataclass(frozen=True, slots=True)
+class ProductRecord:
+    """
+    Registro compacto usado na leitura de código de barras.
+
+    Só resolve código -> id: preços e estoque devem ser lidos do banco (o
+    mapa pode estar até `check_interval` segundos atrasado).
+    """
+
+    id: int
+    name: str
+    product_code: Optional[str]
+    lot_bar_code: Optional[str]
+    version: int
+
+
+@dataclass
+class _TenantMap:
+    version: int
+    by_code: Dict[str, ProductRecord] = field(default_factory=dict)
+    by_id: Dict[int, ProductRecord] = field(default_factory=dict)
+    checked_at: float = field(default_factory=time.monotonic)
+
+    def add(self, record: ProductRecord) -> None:
+        self.discard(record.id)
+        self.by_id[record.id] = record
+        for code in (record.product_code, record.lot_bar_code):
+            key = _code_key(code)
+            if key:
+                self.by_code[key] = record
+
+    def discard(self, product_id: int) -> None:
+        old = self.by_id.pop(product_id, None)
+        if old is None:
+            return
+        for code in (old.product_code, old.lot_bar_code):
+            key = _code_key(code)
+            if key and self.by_code.get(key) is old:
+                del self.by_code[key]
+
+
+class BarcodeMap:
+    """
+    Resolve product_code / lot_bar_code → id do produto em O(1), por empresa.
+
+    - Pré-carregado na abertura do caixa (ou na primeira leitura).
+    - A versão vem do banco (CatalogVersion), a mesma em todos os workers:
+      quando ela muda, os produtos e exclusões com versão maior que a do
+      mapa são aplicados (índice usuario_id, catalog_version). A consulta
+      é feita no máximo a cada `check_interval` segundos, mantendo o
+      caminho da leitura livre de I/O.
+    - Código fora do mapa (produto criado há menos de `check_interval`)
+      é buscado no banco, por índice, e entra no mapa.
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        self.check_interval = check_interval
+        self._tenants: Dict[int, _TenantMap] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    async def _remote_version(self, user_id: int) -> Optional[int]:
+        try:
+            value = (
+                await CatalogVersion.filter(usuario_id=user_id)
+                .first()
+                .values_list('version', flat=True)
+            )
+            return int(value) if value else 0
+        except Exception as e:
+            LOGGER.warning(f'Versão do catálogo indisponível: {e}')
+            return None
+
+    async def _build(self, user_id: int, version: int) -> _TenantMap:
+        started = time.perf_counter()
+        rows = await Produto.filter(usuario_id=user_id, active=True).values(
+            *RECORD_FIELDS
+        )
+
+        tenant = _TenantMap(version=version)
+        for row in rows:
+            tenant.add(self._record(row, version))
+
+        LOGGER.info(
+            f'Mapa de códigos carregado para empresa {user_id}: '
+            f'{len(rows)} produtos em {(time.perf_counter() - started) * 1000:.1f}ms'
+        )
+        return tenant
+
+    @staticmethod
+    def _record(
+        product: Union[Produto, Dict[str, Any]], version: int
+    ) -> ProductRecord:
+        get = (
+            product.get
+            if isinstance(product, dict)
+            else lambda name: getattr(product, name, None)
+        )
+        return ProductRecord(
+            id=get('id'),
+            name=get('name'),
+            product_code=get('product_code'),
+            lot_bar_code=get('lot_bar_code'),
+            version=version,
+        )
+
+    async def get(self, user_id: int) -> _TenantMap:
+        """Retorna o mapa da empresa, recarregando se a versão mudou."""
+        tenant = self._tenants.get(user_id)
+        now = time.monotonic()
+        if tenant and now - tenant.checked_at < self.check_interval:
+            return tenant
+
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            tenant = self._tenants.get(user_id)
+            if tenant and time.monotonic() - tenant.checked_at < self.check_interval:
+                return tenant
+
+            remote = await self._remote_version(user_id)
+            if tenant and (remote is None or remote == tenant.version):
+                # Banco sem resposta: segue com o mapa local
+                tenant.checked_at = time.monotonic()
+                return tenant
+
+            if tenant is None or not await self._catch_up(
+                user_id, tenant, remote
+            ):
+                tenant = await self._build(user_id, remote or 0)
+                self._tenants[user_id] = tenant
+            return tenant
+
+    async def _catch_up(
+        self, user_id: int, tenant: _TenantMap, remote: int
+    ) -> bool:
+        """
+        Aplica as alterações entre a versão do mapa e `remote`. False se
+        forem muitas (o chamador recarrega tudo).
+        """
+        if remote < tenant.version:
+            return False
+        rows = (
+            await Produto.filter(
+                usuario_id=user_id,
+                catalog_version__gt=tenant.version,
+                catalog_version__lte=remote,
+            )
+            .limit(MAX_DELTA_ROWS + 1)
+            .values(*RECORD_FIELDS, 'active')
+        )
+        if len(rows) > MAX_DELTA_ROWS:
+            return False
+        removed = await ProdutoRemovido.filter(
+            usuario_id=user_id,
+            version__gt=tenant.version,
+            version__lte=remote,
+        ).values_list('produto_id', flat=True)
+
+        for product_id in removed:
+            tenant.discard(product_id)
+        for row in rows:
+            if row.pop('active'):
+                tenant.add(self._record(row, remote))
+            else:
+                tenant.discard(row['id'])
+        tenant.version = remote
+        tenant.checked_at = time.monotonic()
+        return True
+
+    async def preload(self, user_id: int) -> None:
+        """Carrega o mapa antecipadamente (ex: na abertura do caixa)."""
+        await self.get(user_id)
+
+    async def _lookup(
+        self, user_id: int, code: str, key: str
+    ) -> Optional[ProductRecord]:
+        """Busca no banco o código que não está no mapa (uma consulta)."""
+        codes = list({code, key, key.replace(' ', '')})
+        row = (
+            await Produto.filter(usuario_id=user_id, active=True)
+            .filter(Q(product_code__in=codes) | Q(lot_bar_code__in=codes))
+            .order_by('id')
+            .first()
+            .values(*RECORD_FIELDS)
+        )
+        if not row:
+            return None
+
+        tenant = self._tenants.get(user_id)
+        record = self._record(row, tenant.version if tenant else 0)
+        if tenant is not None:
+            tenant.add(record)
+        return record
+
+    async def resolve(self, user_id: int, code: Any) -> Optional[ProductRecord]:
+        """Busca por product_code ou lot_bar_code (mapa, depois o banco)."""
+        key = _code_key(code)
+        if not key:
+            return None
+        tenant = await self.get(user_id)
+        record = tenant.by_code.get(key) or tenant.by_code.get(
+            key.replace(' ', '')
+        )
+        if record is None:
+            record = await self._lookup(user_id, str(code).strip(), key)
+        return record
+
+    async def get_by_id(
+        self, user_id: int, product_id: int
+    ) -> Optional[ProductRecord]:
+        tenant = await self.get(user_id)
+        return tenant.by_id.get(product_id)
+
+    async def upsert(
+        self,
+        user_id: int,
+        product: Union[Produto, Dict[str, Any]],
+        version: Optional[int] = None,
+    ) -> None:
+        """Registra a alteração de um produto (`version`: a do catálogo)."""
+        await self._apply(user_id, version, product=product)
+
+    async def remove(
+        self, user_id: int, product_id: int, version: Optional[int] = None
+    ) -> None:
+        await self._apply(user_id, version, product_id=product_id)
+
+    async def _apply(
+        self,
+        user_id: int,
+        version: Optional[int],
+        product: Union[Produto, Dict[str, Any], None] = None,
+        product_id: Optional[int] = None,
+    ) -> None:
+        tenant = self._tenants.get(user_id)
+        if tenant is None:
+            return
+
+        # Próxima versão: o mapa avança; senão a diferença vem na próxima
+        # verificação (reaplicar o produto não tem efeito)
+        if version is not None and version == tenant.version + 1:
+            tenant.version = version
+
+        if product is None:
+            tenant.discard(product_id)
+            return
+
+        active = (
+            product.get('active', True)
+            if isinstance(product, dict)
+            else getattr(product, 'active', True)
+        )
+        record = self._record(product, tenant.version)
+        if active:
+            tenant.add(record)
+        else:
+            tenant.discard(record.id)
+
+    async def reset(self, user_id: int) -> None:
+        """
+        Descarta o mapa deste worker (alterações em massa); os demais
+        recarregam ao ver a nova versão do catálogo.
+        """
+        self.invalidate(user_id)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        if user_id is None:
+            self._tenants.clear()
+        else:
+            self._tenants.pop(user_id, None)
+
+
+# Instância global
+barcode_map = BarcodeMap()
+
+__all__ = ['BarcodeMap', 'ProductRecord', 'barcode_map']
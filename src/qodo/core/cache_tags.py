@@ -0,0 +1,90 @@
+# src/core/cache_tags.py
+from typing import Iterable, Optional
+
+from qodo.core.cache import client
+from qodo.logs.infos import LOGGER
+
+"""
+cache_tags: Invalidação de cache por tags com contadores de geração.
+
+Cada empresa possui um contador por tag (products, sales, cash) no Redis.
+A chave final de cache embute as gerações atuais das tags de que depende:
+
+    payments:7  ->  payments:7|g:products=3,sales=12
+
+Quando algo é escrito, basta incrementar a tag (`bump`): as chaves antigas
+ficam inalcançáveis na hora e expiram sozinhas pelo TTL. Assim podemos usar
+TTLs longos sem servir dados velhos.
+"""
+
+TAG_PRODUCTS = 'products'
+TAG_SALES = 'sales'
+TAG_CASH = 'cash'
+
+# Escopo das buscas que cruzam empresas (marketplace, deep_search)
+GLOBAL_SCOPE = 0
+
+GENERATION_KEY = 'cache:gen:{scope}:{tag}'
+
+
+class TaggedCache:
+    """Monta chaves versionadas por tag e invalida tags por empresa."""
+
+    @staticmethod
+    def _generation_keys(scope: int, tags: Iterable[str]) -> list[str]:
+        return [GENERATION_KEY.format(scope=scope, tag=tag) for tag in tags]
+
+    async def key(
+        self, scope: int, base: str, *tags: str
+    ) -> Optional[str]:
+        """
+        Retorna `base` acrescida das gerações atuais das tags.
+
+        Se o Redis não responder, devolve uma chave sem geração conhecida;
+        a leitura/escrita seguinte também falhará e o dado vem do banco.
+
+        Retorna None quando o cache não é comum a todos os workers (memória
+        com vários workers): um `bump` em um worker não invalidaria os
+        demais, então quem chama deve ir direto ao banco.
+        """
+        if not client.shared:
+            return None
+
+        tags = tuple(sorted(set(tags)))
+        if not tags:
+            return base
+
+        try:
+            values = await client.mget(self._generation_keys(scope, tags))
+        except Exception as e:
+            LOGGER.warning(f'Falha ao ler gerações de cache {tags}: {e}')
+            return f'{base}|g:?'
+
+        generations = ','.join(
+            f'{tag}={value or 0}' for tag, value in zip(tags, values)
+        )
+        return f'{base}|g:{generations}'
+
+    async def bump(self, scope: int, *tags: str) -> None:
+        """Invalida todas as chaves da empresa que dependem das tags."""
+        if not tags:
+            return
+
+        try:
+            for key in self._generation_keys(scope, set(tags)):
+                await client.incr(key)
+        except Exception as e:
+            LOGGER.warning(f'Falha ao invalidar tags de cache {tags}: {e}')
+
+
+# Instância global
+tagged_cache = TaggedCache()
+
+__all__ = [
+    'GLOBAL_SCOPE',
+    'TAG_CASH',
+    'TAG_PRODUCTS',
+    'TAG_SALES',
+    'TaggedCache',
+    'tagged_cache',
+]
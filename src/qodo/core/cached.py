@@ -0,0 +1,273 @@
+# src/core/cached.py
+import asyncio
+import inspect
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+import orjson
+
+from qodo.core.cache import client
+from qodo.core.cache_tags import tagged_cache
+from qodo.logs.infos import LOGGER
+
+"""
+cached: Decorador de cache assíncrono com proteção contra "stampede".
+
+Substitui o padrão repetido get → json.loads → calcula → json.dumps → setex:
+
+    @cached('payments:{user_id}', ttl=600, tags=(TAG_SALES,))
+    async def separating_sales_by_payments(user_id: int): ...
+
+- Coalescência por chave dentro do worker (uma única execução em voo).
+- Lock no Redis entre workers: quem não pega o lock espera o valor.
+- Renovação antecipada probabilística (XFetch): a chave é recalculada um
+  pouco antes de expirar, proporcional ao custo do cálculo.
+- Serialização com orjson.
+- Contadores de hit/miss/latência por função (`cache_stats`).
+- Fail-open: se o Redis cair, a função é executada normalmente.
+- Sem cache comum aos workers (memória com WEB_CONCURRENCY > 1), a função
+  é sempre executada: nada é servido de um cache que outro worker não
+  consegue invalidar.
+"""
+
+LOCK_KEY = 'lock:{key}'
+
+
+@dataclass
+class _Counters:
+    hits: int = 0
+    misses: int = 0
+    early_refreshes: int = 0
+    errors: int = 0
+    latency_ms: float = 0.0
+
+    @property
+    def calls(self) -> int:
+        return self.hits + self.misses + self.early_refreshes
+
+    def as_dict(self) -> Dict[str, Any]:
+        calls = self.calls
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'early_refreshes': self.early_refreshes,
+            'errors': self.errors,
+            'hit_ratio': round(self.hits / calls, 4) if calls else 0.0,
+            'avg_latency_ms': round(self.latency_ms / calls, 3)
+            if calls
+            else 0.0,
+        }
+
+
+class CacheStats:
+    """Contadores em memória (por worker) de cada função cacheada."""
+
+    def __init__(self):
+        self._counters: Dict[str, _Counters] = {}
+
+    def _get(self, name: str) -> _Counters:
+        return self._counters.setdefault(name, _Counters())
+
+    def record(self, name: str, event: str, started: float) -> None:
+        counters = self._get(name)
+        setattr(counters, event, getattr(counters, event) + 1)
+        counters.latency_ms += (time.perf_counter() - started) * 1000
+
+    def error(self, name: str) -> None:
+        self._get(name).errors += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: counters.as_dict()
+            for name, counters in sorted(self._counters.items())
+        }
+
+    def reset(self) -> None:
+        self._counters.clear()
+
+
+cache_stats = CacheStats()
+
+
+def _resolve(arguments: Dict[str, Any], path: str) -> Any:
+    """Resolve 'user_id' ou 'self.user_id' a partir dos argumentos."""
+    name, *attrs = path.split('.')
+    value = arguments.get(name)
+    for attr in attrs:
+        value = getattr(value, attr, None)
+    return value
+
+
+def _dumps(value: Any, delta: float, ttl: int) -> bytes:
+    return orjson.dumps(
+        {'v': value, 'd': delta, 'e': time.time() + ttl},
+        default=str,
+        option=orjson.OPT_NON_STR_KEYS,
+    )
+
+
+def _should_refresh(entry: Dict[str, Any], beta: float) -> bool:
+    """XFetch: quanto mais caro o cálculo, mais cedo renova."""
+    jitter = -entry.get('d', 0.0) * beta * math.log(random.random() or 1e-12)
+    return time.time() + jitter >= entry.get('e', 0.0)
+
+
+async def _read(cache_key: str) -> Optional[Dict[str, Any]]:
+    raw = await client.get(cache_key)
+    return orjson.loads(raw) if raw else None
+
+
+def cached(
+    key: str,
+    ttl: int,
+    tags: Sequence[str] = (),
+    scope: Union[str, int] = 'user_id',
+    beta: float = 1.0,
+    lock_timeout: float = 10.0,
+) -> Callable:
+    """
+    Decorador de cache para funções assíncronas.
+
+    Args:
+        key: Template da chave, formatado com os argumentos da função
+            (ex: 'payments:{user_id}', 'product:{self.user_id}:{name}').
+        ttl: Tempo de vida em segundos.
+        tags: Tags de invalidação (ver core/cache_tags.py).
+        scope: Argumento com o id da empresa ('user_id', 'self.user_id')
+            ou um escopo fixo (ex: GLOBAL_SCOPE).
+        beta: Agressividade da renovação antecipada (0 desativa).
+        lock_timeout: Tempo máximo de espera pelo cálculo de outro worker.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        signature = inspect.signature(function)
+        name = function.__qualname__
+        in_flight: Dict[str, asyncio.Future] = {}
+
+        async def compute(
+            args: tuple,
+            kwargs: dict,
+            cache_key: str,
+            stale: Optional[Dict[str, Any]],
+        ) -> Any:
+            lock_key = LOCK_KEY.format(key=cache_key)
+            token = uuid.uuid4().hex
+            try:
+                locked = await client.set(
+                    lock_key, token, nx=True, px=int(lock_timeout * 1000)
+                )
+            except Exception as e:
+                LOGGER.warning(f'Cache indisponível ({name}): {e}')
+                cache_stats.error(name)
+                return await function(*args, **kwargs)
+
+            if not locked:
+                # Outro worker está renovando: usa o valor atual se houver
+                if stale is not None:
+                    return stale['v']
+                value = await _wait_for_value(cache_key)
+                if value is not None:
+                    return value['v']
+
+            try:
+                started = time.perf_counter()
+                value = await function(*args, **kwargs)
+                delta = time.perf_counter() - started
+                try:
+                    await client.set(
+                        cache_key, _dumps(value, delta, ttl), ex=ttl
+                    )
+                except Exception as e:
+                    LOGGER.warning(f'Falha ao gravar cache ({name}): {e}')
+                    cache_stats.error(name)
+                return value
+            finally:
+                if locked:
+                    # Libera apenas se ainda for o dono do lock
+                    try:
+                        await client.delete_if_equals(lock_key, token)
+                    except Exception:
+                        pass
+
+        async def _wait_for_value(cache_key: str) -> Optional[Dict[str, Any]]:
+            deadline = time.monotonic() + lock_timeout
+            delay = 0.05
+            while time.monotonic() < deadline:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.5)
+                try:
+                    entry = await _read(cache_key)
+                except Exception:
+                    return None
+                if entry is not None:
+                    return entry
+            LOGGER.warning(f'Timeout aguardando cache de outro worker ({name})')
+            return None
+
+        @wraps(function)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+
+            try:
+                base = key.format(**arguments)
+                tenant = (
+                    _resolve(arguments, scope)
+                    if isinstance(scope, str)
+                    else scope
+                )
+                cache_key = await tagged_cache.key(tenant, base, *tags)
+                entry = await _read(cache_key) if cache_key else None
+            except Exception as e:
+                # Fail-open: sem cache, executa direto
+                LOGGER.warning(f'Cache indisponível ({name}): {e}')
+                cache_stats.error(name)
+                cache_stats.record(name, 'misses', started)
+                return await function(*args, **kwargs)
+
+            if cache_key is None:
+                # Cache só deste worker: executa direto no banco
+                cache_stats.record(name, 'misses', started)
+                return await function(*args, **kwargs)
+
+            if entry is not None and not _should_refresh(entry, beta):
+                cache_stats.record(name, 'hits', started)
+                return entry['v']
+
+            task = in_flight.get(cache_key)
+            if task is None:
+                task = asyncio.ensure_future(
+                    compute(args, kwargs, cache_key, entry)
+                )
+                in_flight[cache_key] = task
+                task.add_done_callback(
+                    lambda done: in_flight.pop(cache_key)
+                    if in_flight.get(cache_key) is done
+                    else None
+                )
+            elif entry is not None:
+                # Renovação já em andamento neste worker
+                cache_stats.record(name, 'hits', started)
+                return entry['v']
+
+            value = await asyncio.shield(task)
+            cache_stats.record(
+                name,
+                'early_refreshes' if entry is not None else 'misses',
+                started,
+            )
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = ['CacheStats', 'cache_stats', 'cached']
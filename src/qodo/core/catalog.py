@@ -0,0 +1,292 @@
+# src/core/catalog.py
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F
+from tortoise.transactions import in_transaction
+
+from qodo.core.barcode_map import barcode_map
+from qodo.core.cache_tags import GLOBAL_SCOPE, TAG_PRODUCTS, tagged_cache
+from qodo.core.events import event_bus
+from qodo.core.marketplace_index import marketplace_index
+from qodo.core.search_index import product_index
+from qodo.core.stock_alerts import stock_alerts
+from qodo.core.stock_summary import stock_summary
+from qodo.logs.infos import LOGGER
+from qodo.model.catalog import CatalogVersion, ProdutoRemovido
+from qodo.model.product import Produto
+
+"""
+catalog: Ponto único de notificação de alterações no catálogo de produtos.
+
+Toda rota/controlador que cria, altera ou remove um Produto grava a nova
+versão do catálogo (`stamp`) na mesma transação da escrita e, depois do
+commit, chama o hook correspondente com essa versão. Os hooks repassam a
+alteração para as estruturas em memória (índice de busca, mapa de códigos
+de barras e índice do marketplace), publicam o evento para os caixas
+conectados (core/events.py), mantêm o resumo do estoque
+(core/stock_summary.py) e os alertas de reposição/validade
+(core/stock_alerts.py) e invalidam o cache.
+"""
+
+
+# Campos enviados aos caixas em cada evento de produto
+EVENT_FIELDS = (
+    'id',
+    'name',
+    'product_code',
+    'lot_bar_code',
+    'sale_price',
+    'stock',
+    'active',
+)
+
+
+async def _next_version(user_id: int, connection) -> int:
+    """Incrementa o contador da empresa (a linha fica travada até o commit)."""
+    updated = (
+        await CatalogVersion.filter(usuario_id=user_id)
+        .using_db(connection)
+        .update(version=F('version') + 1)
+    )
+    if not updated:
+        try:
+            # Savepoint: a violação de unicidade não aborta a escrita
+            async with in_transaction() as savepoint:
+                await CatalogVersion.create(
+                    usuario_id=user_id, version=1, using_db=savepoint
+                )
+            return 1
+        except IntegrityError:
+            # Outro request criou o contador ao mesmo tempo
+            await CatalogVersion.filter(usuario_id=user_id).using_db(
+                connection
+            ).update(version=F('version') + 1)
+
+    return (
+        await CatalogVersion.filter(usuario_id=user_id)
+        .using_db(connection)
+        .first()
+        .values_list('version', flat=True)
+    )
+
+
+async def _write_version(
+    user_id: int,
+    changed: List[int],
+    removed: List[int],
+    connection,
+    version: Optional[int] = None,
+) -> int:
+    if version is None:
+        version = await _next_version(user_id, connection)
+    if changed:
+        await Produto.filter(usuario_id=user_id, id__in=changed).using_db(
+            connection
+        ).update(catalog_version=version)
+    if removed:
+        await ProdutoRemovido.bulk_create(
+            [
+                ProdutoRemovido(
+                    usuario_id=user_id, produto_id=product_id, version=version
+                )
+                for product_id in removed
+            ],
+            using_db=connection,
+        )
+    return version
+
+
+async def lock_version(user_id: int, using_db) -> int:
+    """
+    Avança a versão no início da transação, antes de ler os produtos.
+
+    A linha do contador fica travada até o commit: escritores da mesma
+    empresa (ex: duas importações com os mesmos códigos) passam a rodar
+    um depois do outro. A versão devolvida vai para `stamp(...,
+    version=version)` no fim da transação.
+    """
+    return await _next_version(user_id, using_db)
+
+
+async def stamp(
+    user_id: int,
+    changed: Iterable[int] = (),
+    removed: Iterable[int] = (),
+    using_db=None,
+    version: Optional[int] = None,
+) -> Optional[int]:
+    """
+    Avança a versão do catálogo e grava-a nos produtos alterados e nos
+    tombstones dos removidos.
+
+    Chamar dentro da transação que altera os produtos (a versão é
+    gravada junto com a alteração, ou nada é) e repassar a versão para
+    o hook correspondente depois do commit:
+
+        async with in_transaction() as connection:
+            ...
+            version = await stamp(user_id, ids, using_db=connection)
+        await stock_changed(user_id, *ids, deltas=deltas, version=version)
+
+    `version` é a versão já obtida com `lock_version` na mesma transação.
+    """
+    changed = sorted({product_id for product_id in changed if product_id})
+    removed = sorted({product_id for product_id in removed if product_id})
+    if not changed and not removed:
+        return None
+
+    if using_db is None:
+        # Transação própria (ou savepoint da transação em andamento)
+        async with in_transaction() as connection:
+            return await _write_version(
+                user_id, changed, removed, connection, version
+            )
+    return await _write_version(user_id, changed, removed, using_db, version)
+
+
+async def _stamp(
+    user_id: int,
+    changed: Iterable[int] = (),
+    removed: Iterable[int] = (),
+) -> Optional[int]:
+    """Versão para hooks chamados sem `version` (fora de uma transação)."""
+    try:
+        return await stamp(user_id, changed, removed)
+    except Exception as e:
+        LOGGER.error(
+            f'Falha ao avançar versão do catálogo da empresa {user_id}: {e}'
+        )
+        return None
+
+
+def _event_row(product: Union[Produto, Dict[str, Any]]) -> Dict[str, Any]:
+    if isinstance(product, dict):
+        return {name: product.get(name) for name in EVENT_FIELDS}
+    return {name: getattr(product, name, None) for name in EVENT_FIELDS}
+
+
+async def _publish(
+    user_id: int,
+    event_type: str,
+    version: Optional[int],
+    products: List[Dict[str, Any]] = (),
+    removed: Iterable[int] = (),
+) -> None:
+    try:
+        await event_bus.publish(
+            user_id,
+            {
+                'type': event_type,
+                'version': version,
+                'products': list(products),
+                'removed': list(removed),
+            },
+        )
+    except Exception as e:
+        LOGGER.warning(f'Falha ao publicar evento {event_type}: {e}')
+
+
+async def _invalidate_products(user_id: int) -> None:
+    # A busca do marketplace cruza empresas: invalida também o escopo global
+    await tagged_cache.bump(user_id, TAG_PRODUCTS)
+    await tagged_cache.bump(GLOBAL_SCOPE, TAG_PRODUCTS)
+
+
+async def product_changed(
+    user_id: int,
+    product: Union[Produto, Dict[str, Any]],
+    version: Optional[int] = None,
+) -> None:
+    """Produto criado ou alterado (nome, códigos, preços, status)."""
+    product_id = (
+        product.get('id') if isinstance(product, dict) else product.id
+    )
+    if version is None:
+        version = await _stamp(user_id, changed=(product_id,))
+    product_index.upsert(user_id, product)
+    marketplace_index.upsert(user_id, product)
+    await barcode_map.upsert(user_id, product, version)
+    await stock_summary.mark_stale(user_id)
+    await stock_alerts.refresh(user_id, product_id)
+    await _invalidate_products(user_id)
+    await _publish(user_id, 'product.updated', version, [_event_row(product)])
+
+
+async def product_removed(
+    user_id: int, product_id: int, version: Optional[int] = None
+) -> None:
+    """Produto removido ou arquivado."""
+    if version is None:
+        version = await _stamp(user_id, removed=(product_id,))
+    product_index.remove(user_id, product_id)
+    marketplace_index.remove(user_id, product_id)
+    await barcode_map.remove(user_id, product_id, version)
+    await stock_summary.mark_stale(user_id)
+    await stock_alerts.refresh(user_id, product_id)
+    await _invalidate_products(user_id)
+    await _publish(user_id, 'product.removed', version, removed=(product_id,))
+
+
+async def products_bulk_changed(
+    user_id: int,
+    product_ids: Iterable[int],
+    version: Optional[int] = None,
+) -> None:
+    """
+    Lote de produtos criados/alterados (importação em massa).
+
+    Uma única versão do catálogo para o lote; índices e mapa de códigos
+    são descartados e recarregados sob demanda, em vez de atualizados
+    produto a produto. Os caixas recebem um `resync` para buscar o delta.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return
+
+    if version is None:
+        version = await _stamp(user_id, changed=product_ids)
+    product_index.invalidate(user_id)
+    marketplace_index.invalidate()
+    await barcode_map.reset(user_id)
+    await stock_summary.mark_stale(user_id)
+    await stock_alerts.refresh(user_id, *product_ids)
+    await _invalidate_products(user_id)
+    await _publish(user_id, 'resync', version)
+
+
+async def stock_changed(
+    user_id: int,
+    *product_ids: int,
+    deltas: Optional[Mapping[int, int]] = None,
+    version: Optional[int] = None,
+) -> None:
+    """
+    Somente o estoque mudou (venda, entrada, carrinho, cancelamento).
+
+    `deltas` ({produto_id: variação}) permite atualizar o resumo do
+    estoque por diferença; sem ele o resumo é recalculado na leitura.
+
+    Chamar depois do commit: o evento lê o estoque do banco e vai direto
+    para os caixas, e o resumo não volta atrás se a transação falhar.
+    """
+    if version is None:
+        version = await _stamp(user_id, changed=product_ids)
+    if deltas:
+        await stock_summary.apply_deltas(user_id, deltas)
+    else:
+        await stock_summary.mark_stale(user_id)
+    await stock_alerts.refresh(user_id, *product_ids)
+    # Nada em cache no escopo global depende do estoque: só a empresa
+    await tagged_cache.bump(user_id, TAG_PRODUCTS)
+
+    if not product_ids or not event_bus.wants(user_id):
+        return
+    try:
+        rows = await Produto.filter(
+            usuario_id=user_id, id__in=list(product_ids)
+        ).values(*EVENT_FIELDS)
+    except Exception as e:
+        LOGGER.warning(f'Falha ao montar evento de estoque: {e}')
+        return
+    await _publish(user_id, 'stock.changed', version, rows)
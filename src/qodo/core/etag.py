@@ -0,0 +1,172 @@
+# src/core/etag.py
+import hashlib
+import uuid
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request, Response
+
+from qodo.core.cache import client
+from qodo.core.cache_tags import GLOBAL_SCOPE, TAG_PRODUCTS, tagged_cache
+from qodo.logs.infos import LOGGER
+from qodo.model.catalog import CatalogVersion
+
+"""
+etag: Requisições condicionais (ETag / If-None-Match) para rotas de leitura.
+
+Os PDVs e o painel consultam as mesmas listas a cada poucos segundos.
+Enquanto nenhuma escrita invalidar os dados da rota, o ETag não muda e a
+resposta é um 304 vazio, sem montar nem serializar o payload.
+
+- Rotas só de produtos: o ETag vem da versão do catálogo no banco
+  (CatalogVersion), a mesma em todos os workers.
+- Demais tags: o ETag vem das gerações de cache da empresa (cache_tags),
+  e só quando o cache é compartilhado (Redis ou worker único). Com as
+  gerações em memória de vários workers, cada um responderia um ETag
+  diferente para o mesmo dado, e a rota responde sem ETag.
+
+    not_modified = await check_etag(
+        request, response, user_id, 'products:list:...', TAG_PRODUCTS
+    )
+    if not_modified:
+        return not_modified
+"""
+
+# O cliente sempre revalida; o navegador pode guardar a resposta
+CACHE_CONTROL = 'private, no-cache'
+
+# Conteúdo endereçado pelo hash: a URL nunca muda de conteúdo
+CACHE_IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def _digest(value: bytes) -> str:
+    return hashlib.blake2b(value, digest_size=12).hexdigest()
+
+
+# Gerações em memória recomeçam do zero a cada inicialização
+_BOOT_ID = uuid.uuid4().hex
+
+
+async def _catalog_key(scope: int, base: str) -> Optional[str]:
+    try:
+        version = (
+            await CatalogVersion.filter(usuario_id=scope)
+            .first()
+            .values_list('version', flat=True)
+        )
+    except Exception as e:
+        LOGGER.warning(f'Falha ao ler versão do catálogo para ETag: {e}')
+        return None
+    return f'{base}|catalog:{version or 0}'
+
+
+async def tag_etag(scope: int, base: str, *tags: str) -> Optional[str]:
+    """
+    ETag a partir da versão do catálogo ou das gerações das tags.
+
+    Retorna None quando não há uma versão comum a todos os workers
+    (cache em memória com vários workers, ou fora do ar): nesse caso a
+    rota responde normalmente, sem ETag.
+    """
+    if set(tags) == {TAG_PRODUCTS} and scope != GLOBAL_SCOPE:
+        key = await _catalog_key(scope, base)
+    elif not client.shared:
+        return None
+    else:
+        key = await tagged_cache.key(scope, base, *tags)
+        if key.endswith('|g:?'):
+            return None
+        if client.backend == 'memory':
+            key = f'{key}|boot:{_BOOT_ID}'
+
+    if key is None:
+        return None
+    return f'W/"{_digest(key.encode())}"'
+
+
+def content_etag(payload: Any) -> str:
+    """ETag forte a partir do conteúdo serializado da resposta."""
+    body = orjson.dumps(
+        payload, default=str, option=orjson.OPT_SORT_KEYS
+    )
+    return f'"{_digest(body)}"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+
+    # Comparação fraca (RFC 9110): ignora o prefixo W/
+    wanted = etag.removeprefix('W/')
+    return any(
+        candidate.strip().removeprefix('W/') == wanted
+        for candidate in header.split(',')
+    )
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(
+        status_code=304,
+        headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL},
+    )
+
+
+async def check_etag(
+    request: Request,
+    response: Response,
+    scope: int,
+    base: str,
+    *tags: str,
+) -> Optional[Response]:
+    """
+    Devolve um 304 se o cliente já tem a versão atual; senão anota o ETag
+    na resposta e retorna None para a rota seguir normalmente.
+    """
+    etag = await tag_etag(scope, base, *tags)
+    if etag is None:
+        return None
+    if _matches(request, etag):
+        return _not_modified(etag)
+
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return None
+
+
+def check_content(
+    request: Request, response: Response, payload: Any
+) -> Optional[Response]:
+    """
+    Variante por hash do conteúdo, para respostas sem tag que as
+    invalide. Não economiza a consulta, mas evita reenviar o payload.
+    """
+    etag = content_etag(payload)
+    if _matches(request, etag):
+        return _not_modified(etag)
+
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return None
+
+
+def check_immutable(request: Request, etag: str) -> Optional[Response]:
+    """304 para arquivos endereçados por conteúdo (ETag fixo por URL)."""
+    if _matches(request, etag):
+        return Response(
+            status_code=304,
+            headers={'ETag': etag, 'Cache-Control': CACHE_IMMUTABLE},
+        )
+    return None
+
+
+__all__ = [
+    'CACHE_IMMUTABLE',
+    'check_content',
+    'check_etag',
+    'check_immutable',
+    'content_etag',
+    'tag_etag',
+]
@@ -0,0 +1,172 @@
+# src/core/events.py
+import asyncio
+import os
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import orjson
+import redis.asyncio as redis
+
+from qodo.core.cache import REDIS_ERRORS, REDIS_TIMEOUT, client
+from qodo.logs.infos import LOGGER
+
+"""
+events: Barramento de eventos do catálogo por empresa (push para os PDVs).
+
+Os hooks de core/catalog.py publicam aqui cada alteração de produto ou
+estoque. Cada conexão WebSocket/SSE aberta é uma fila pequena em memória;
+conexões ociosas custam apenas essa fila e uma corrotina parada.
+
+Com o Redis configurado os eventos também são publicados no canal
+`catalog:events:{empresa}`, e um único listener por worker repassa aos
+clientes locais os eventos gerados nos outros workers. Sem Redis (ou com
+ele fora do ar) a entrega continua dentro do próprio worker.
+"""
+
+CHANNEL = 'catalog:events:{user_id}'
+CHANNEL_PATTERN = 'catalog:events:*'
+
+# Eventos pendentes por conexão antes de pedir ressincronização
+QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE', '100'))
+
+# Intervalo do keep-alive enviado às conexões ociosas (segundos)
+HEARTBEAT_INTERVAL = 25.0
+
+LISTENER_MAX_DELAY = 30.0
+
+
+class EventBus:
+    """Fan-out de eventos do catálogo para as conexões de cada empresa."""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.origin = uuid.uuid4().hex
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def _redis(self):
+        primary = getattr(client, 'primary', None)
+        return getattr(primary, 'redis', None)
+
+    def connections(self, user_id: Optional[int] = None) -> int:
+        if user_id is not None:
+            return len(self._subscribers.get(user_id, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def wants(self, user_id: int) -> bool:
+        """Se há ouvintes da empresa aqui ou, com Redis, em outro worker."""
+        return bool(self._subscribers.get(user_id)) or self._redis is not None
+
+    def _deliver(self, user_id: int, event: Dict[str, Any]) -> None:
+        for queue in self._subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Cliente lento: descarta o atraso e pede delta-sync
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({'type': 'resync'})
+
+    async def publish(self, user_id: int, event: Dict[str, Any]) -> None:
+        """Entrega o evento aos clientes locais e aos demais workers."""
+        self._deliver(user_id, event)
+
+        primary = self._redis
+        if primary is None or client.backend != 'redis':
+            return
+        try:
+            await primary.publish(
+                CHANNEL.format(user_id=user_id),
+                orjson.dumps(
+                    {'origin': self.origin, 'event': event}, default=str
+                ),
+            )
+        except REDIS_ERRORS as e:
+            LOGGER.warning(f'Falha ao publicar evento do catálogo: {e}')
+
+    async def _listen(self) -> None:
+        if self._redis is None:
+            return
+
+        # Conexão própria sem socket_timeout: o listener fica bloqueado
+        # esperando mensagens, o que estouraria o timeout curto do cache
+        listener = redis.Redis.from_url(
+            client.primary.url,
+            decode_responses=True,
+            socket_connect_timeout=REDIS_TIMEOUT,
+        )
+        delay = 1.0
+        while True:
+            pubsub = listener.pubsub()
+            try:
+                await pubsub.psubscribe(CHANNEL_PATTERN)
+                delay = 1.0
+                async for message in pubsub.listen():
+                    if message.get('type') != 'pmessage':
+                        continue
+                    payload = orjson.loads(message['data'])
+                    if payload.get('origin') == self.origin:
+                        continue
+                    user_id = int(message['channel'].rsplit(':', 1)[1])
+                    self._deliver(user_id, payload['event'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.warning(
+                    f'Listener de eventos do catálogo caiu ({e}); '
+                    f'reconectando em {delay:.0f}s'
+                )
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LISTENER_MAX_DELAY)
+
+    def _ensure_listener(self) -> None:
+        if self._redis is None:
+            return
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        """Fila de eventos da empresa enquanto a conexão estiver aberta."""
+        self._ensure_listener()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+
+
+async def next_event(queue: asyncio.Queue) -> Dict[str, Any]:
+    """Próximo evento da fila ou um keep-alive se nada chegar a tempo."""
+    try:
+        return await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+    except asyncio.TimeoutError:
+        return {'type': 'ping'}
+
+
+# Instância global
+event_bus = EventBus()
+
+__all__ = ['EventBus', 'event_bus', 'next_event']
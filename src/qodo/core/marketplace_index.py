@@ -0,0 +1,204 @@
+# src/core/marketplace_index.py
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from qodo.core.search_index import _TenantIndex
+from qodo.logs.infos import LOGGER
+from qodo.model.product import Produto
+from qodo.model.user import Usuario
+from qodo.utils.text_normalize import normalize_text
+
+# Campos carregados do catálogo de todas as empresas
+MARKETPLACE_FIELDS: Tuple[str, ...] = (
+    'id',
+    'usuario_id',
+    'name',
+    'product_code',
+    'lot_bar_code',
+    'group',
+    'fabricator',
+    'supplier',
+    'cost_price',
+    'price_uni',
+    'sale_price',
+    'stock',
+)
+
+# Quantidade máxima de resultados ranqueados de uma busca (todas as páginas)
+MAX_RESULTS = 500
+
+IMAGE_URL = 'https://api.nahtec.com.br/produto/{product_id}/imagem'
+
+
+class MarketplaceIndex:
+    """
+    Índice em memória do catálogo de todas as empresas (marketplace).
+
+    - Construído sob demanda e reconstruído a cada `max_age` segundos em
+      segundo plano (as buscas continuam usando o índice anterior).
+    - Produtos alterados neste worker entram na hora via core/catalog.py.
+    - Além do índice geral, mantém um índice por empresa para a busca
+      filtrada por `target_company`.
+    """
+
+    def __init__(self, max_age: int = 300):
+        self.max_age = max_age
+        self._all: Optional[_TenantIndex] = None
+        self._by_company: Dict[str, _TenantIndex] = {}
+        self._companies: Dict[int, str] = {}
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _doc(row: Dict[str, Any], company: str) -> Dict[str, Any]:
+        stock = row.get('stock') or 0
+        return {
+            'id': row['id'],
+            'company_id': row.get('usuario_id'),
+            'company': company or 'N/A',
+            'name': row.get('name'),
+            'product_code': row.get('product_code'),
+            'lot_bar_code': row.get('lot_bar_code'),
+            'group': row.get('group'),
+            'fabricator': row.get('fabricator') or 'Não informado.',
+            'supplier': row.get('supplier') or 'Não informado.',
+            'cost_price': row.get('cost_price'),
+            'price_uni': row.get('price_uni'),
+            'sale_price': row.get('sale_price'),
+            'stock': stock,
+            'available': stock > 0,
+            'image_url': IMAGE_URL.format(product_id=row['id']),
+        }
+
+    async def _build(self) -> None:
+        started = time.perf_counter()
+        companies = {
+            row['id']: row['company_name'] or ''
+            for row in await Usuario.all().values('id', 'company_name')
+        }
+        rows = await Produto.filter(active=True).values(*MARKETPLACE_FIELDS)
+
+        index = _TenantIndex()
+        by_company: Dict[str, _TenantIndex] = {}
+        for row in rows:
+            company = companies.get(row['usuario_id'], '')
+            doc = self._doc(row, company)
+            index.add(doc)
+            by_company.setdefault(normalize_text(company), _TenantIndex()).add(
+                doc
+            )
+
+        self._all, self._by_company, self._companies = (
+            index,
+            by_company,
+            companies,
+        )
+        self._built_at = time.monotonic()
+        LOGGER.info(
+            f'Índice do marketplace construído: {len(rows)} produtos de '
+            f'{len(by_company)} empresas em '
+            f'{(time.perf_counter() - started) * 1000:.1f}ms'
+        )
+
+    async def _refresh(self) -> None:
+        try:
+            async with self._lock:
+                await self._build()
+        except Exception as e:
+            LOGGER.error(f'Falha ao atualizar índice do marketplace: {e}')
+
+    async def ensure_fresh(self) -> None:
+        """Constrói o índice na primeira chamada e agenda as atualizações."""
+        if self._all is None:
+            async with self._lock:
+                if self._all is None:
+                    await self._build()
+            return
+
+        stale = time.monotonic() - self._built_at >= self.max_age
+        if stale and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def search(
+        self,
+        query: str,
+        company: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20,
+        only_available: bool = False,
+    ) -> Dict[str, Any]:
+        """Busca ranqueada e paginada entre todas as empresas (ou em uma)."""
+        await self.ensure_fresh()
+
+        if company:
+            index = self._by_company.get(normalize_text(company))
+        else:
+            index = self._all
+
+        results: List[Dict[str, Any]] = (
+            index.search(query, limit=MAX_RESULTS, fuzzy=False)
+            if index
+            else []
+        )
+        if only_available:
+            results = [item for item in results if item['available']]
+
+        start = (page - 1) * page_size
+        return {
+            'items': results[start : start + page_size],
+            'page': page,
+            'page_size': page_size,
+            'total': len(results),
+        }
+
+    def upsert(
+        self, user_id: int, product: Union[Produto, Dict[str, Any]]
+    ) -> None:
+        """Atualiza um produto (ignorado se o índice ainda não existe)."""
+        if self._all is None or user_id not in self._companies:
+            return
+
+        if isinstance(product, dict):
+            row = {name: product.get(name) for name in MARKETPLACE_FIELDS}
+            active = product.get('active', True)
+        else:
+            row = {
+                name: getattr(product, name, None)
+                for name in MARKETPLACE_FIELDS
+            }
+            active = getattr(product, 'active', True)
+        if row['id'] is None:
+            return
+
+        self.remove(user_id, row['id'])
+        if not active:
+            return
+
+        row['usuario_id'] = user_id
+        company = self._companies[user_id]
+        doc = self._doc(row, company)
+        self._all.add(doc)
+        self._by_company.setdefault(
+            normalize_text(company), _TenantIndex()
+        ).add(doc)
+
+    def remove(self, user_id: int, product_id: int) -> None:
+        if self._all is None:
+            return
+        self._all.discard(product_id)
+        company_index = self._by_company.get(
+            normalize_text(self._companies.get(user_id, ''))
+        )
+        if company_index is not None:
+            company_index.discard(product_id)
+
+    def invalidate(self) -> None:
+        self._built_at = 0.0
+
+
+# Instância global
+marketplace_index = MarketplaceIndex()
+
+__all__ = ['MarketplaceIndex', 'marketplace_index']
@@ -0,0 +1,46 @@
+# src/core/process_pool.py
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+"""
+process_pool: Processos para trabalho CPU-bound (PDF, imagens).
+
+O event loop só aguarda o resultado; a função executada precisa ser de
+nível de módulo (é serializada para o processo filho).
+"""
+
+# Processos dedicados (padrão: até 2)
+CPU_WORKERS = int(os.getenv('CPU_WORKERS', str(min(2, os.cpu_count() or 1))))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: o processo da API tem threads (fork não é seguro)
+        _pool = ProcessPoolExecutor(
+            max_workers=CPU_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _pool
+
+
+async def run_cpu(func: Callable[..., Any], *args: Any) -> Any:
+    """Executa `func(*args)` em um processo do pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), func, *args)
+
+
+def shutdown_process_pool() -> None:
+    """Encerra os processos (fim da aplicação)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+__all__ = ['CPU_WORKERS', 'run_cpu', 'shutdown_process_pool']
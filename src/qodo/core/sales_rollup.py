@@ -0,0 +1,449 @@
+# src/core/sales_rollup.py
+import asyncio
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F
+from tortoise.functions import Sum
+from tortoise.transactions import in_transaction
+
+from qodo.core.cache import client
+from qodo.logs.infos import LOGGER
+from qodo.model.sale import Sales
+from qodo.model.sales_rollup import DailySalesRollup, SalesRollupState
+from qodo.model.user import Usuario
+
+"""
+sales_rollup: Resumo diário de vendas mantido de forma incremental.
+
+- `record_sale` / `remove_sale`: chamados na transação da venda, da
+  edição e do cancelamento; somam (ou subtraem) a venda na linha
+  (empresa, dia, funcionário, forma de pagamento).
+- `rebuild`: reconstrói o resumo a partir da tabela de vendas. Roda uma
+  vez por empresa (backfill, na inicialização ou na primeira leitura) e
+  diariamente para os últimos dias, corrigindo qualquer deriva. Leitura
+  das vendas e troca das linhas acontecem com a linha de estado da
+  empresa travada; as escritas incrementais esperam por ela.
+- `totals` / `by_payment`: leituras dos painéis, proporcionais ao número
+  de dias consultados e não ao histórico de vendas.
+"""
+
+TIMEZONE = ZoneInfo('America/Sao_Paulo')
+
+METRICS = (
+    'vendas',
+    'vendas_distintas',
+    'receita',
+    'custo',
+    'lucro',
+    'itens',
+)
+
+# Dias recalculados pela conciliação diária
+RECONCILE_DAYS = int(os.getenv('SALES_ROLLUP_RECONCILE_DAYS', '2'))
+
+# Horário local da conciliação diária
+RECONCILE_HOUR = int(os.getenv('SALES_ROLLUP_HOUR', '4'))
+
+RECONCILE_LOCK_KEY = 'lock:sales_rollup:reconcile:{day}'
+
+REBUILD_CHUNK = 5000
+
+SALE_FIELDS = (
+    'id',
+    'criado_em',
+    'funcionario_id',
+    'payment_method',
+    'sale_code',
+    'total_price',
+    'cost_price',
+    'lucro_total',
+    'quantity',
+)
+
+Key = Tuple[date, int, str]
+
+
+def today() -> date:
+    return datetime.now(TIMEZONE).date()
+
+
+def sale_day(value: Optional[datetime]) -> date:
+    """Dia local (America/Sao_Paulo) de uma venda."""
+    if value is None:
+        return today()
+    if value.tzinfo is not None:
+        value = value.astimezone(TIMEZONE)
+    return value.date()
+
+
+def day_bounds(day: date) -> Tuple[datetime, datetime]:
+    return (
+        datetime.combine(day, time.min, tzinfo=TIMEZONE),
+        datetime.combine(day, time.max, tzinfo=TIMEZONE),
+    )
+
+
+def _metrics(row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    row = row or {}
+    return {
+        'vendas': int(row.get('vendas') or 0),
+        'vendas_distintas': int(row.get('vendas_distintas') or 0),
+        'receita': round(float(row.get('receita') or 0), 2),
+        'custo': round(float(row.get('custo') or 0), 2),
+        'lucro': round(float(row.get('lucro') or 0), 2),
+        'itens': int(row.get('itens') or 0),
+    }
+
+
+def _payment(value: Any) -> str:
+    return str(getattr(value, 'value', value) or '').upper()
+
+
+class SalesRollup:
+    """Mantém e consulta o resumo diário de vendas."""
+
+    def __init__(self):
+        self._ready: Set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Escrita incremental
+    # ------------------------------------------------------------------
+    async def _is_distinct(self, sale: Sales, day: date) -> bool:
+        """A venda é a única linha do seu código no grupo?"""
+        if not sale.sale_code:
+            return True
+        start, end = day_bounds(day)
+        query = Sales.filter(
+            usuario_id=sale.usuario_id,
+            sale_code=sale.sale_code,
+            payment_method=sale.payment_method,
+            criado_em__gte=start,
+            criado_em__lte=end,
+        ).exclude(id=sale.id)
+        if sale.funcionario_id:
+            query = query.filter(funcionario_id=sale.funcionario_id)
+        else:
+            query = query.filter(funcionario_id__isnull=True)
+        return not await query.exists()
+
+    async def _lock(self, user_id: int, connection=None):
+        """Trava a linha de estado da empresa até o fim da transação."""
+        return (
+            await SalesRollupState.filter(usuario_id=user_id)
+            .using_db(connection)
+            .select_for_update()
+            .first()
+        )
+
+    async def _create_state(self, user_id: int) -> None:
+        """Cria a linha de estado da empresa (idempotente)."""
+        if await SalesRollupState.filter(usuario_id=user_id).exists():
+            return
+        try:
+            async with in_transaction():
+                await SalesRollupState.create(usuario_id=user_id)
+        except IntegrityError:
+            pass  # criada por outro request ao mesmo tempo
+
+    async def _apply(self, sale: Sales, sign: int) -> None:
+        # Espera uma reconstrução em andamento da empresa
+        await self._lock(sale.usuario_id)
+
+        day = sale_day(sale.criado_em)
+        key = {
+            'usuario_id': sale.usuario_id,
+            'dia': day,
+            'funcionario_id': sale.funcionario_id or 0,
+            'payment_method': _payment(sale.payment_method),
+        }
+        values = {
+            'vendas': sign,
+            'vendas_distintas': (
+                sign if await self._is_distinct(sale, day) else 0
+            ),
+            'receita': sign * float(sale.total_price or 0),
+            'custo': sign * float(sale.cost_price or 0),
+            'lucro': sign * float(sale.lucro_total or 0),
+            'itens': sign * int(sale.quantity or 0),
+        }
+        increments = {name: F(name) + value for name, value in values.items()}
+
+        if await DailySalesRollup.filter(**key).update(**increments):
+            return
+        try:
+            # Savepoint: uma violação de unicidade não aborta a venda
+            async with in_transaction():
+                await DailySalesRollup.create(**key, **values)
+        except IntegrityError:
+            # Outra venda criou a linha ao mesmo tempo
+            await DailySalesRollup.filter(**key).update(**increments)
+
+    async def record_sale(self, sale: Sales) -> None:
+        """Soma a venda no resumo (mesma transação da venda)."""
+        await self._apply(sale, 1)
+
+    async def remove_sale(self, sale: Sales) -> None:
+        """
+        Subtrai a venda do resumo; chamar antes de apagar ou alterar a
+        venda (com os valores antigos).
+        """
+        await self._apply(sale, -1)
+
+    # ------------------------------------------------------------------
+    # Reconstrução (backfill / conciliação)
+    # ------------------------------------------------------------------
+    async def rebuild(
+        self,
+        user_id: int,
+        since: Optional[date] = None,
+        missing_only: bool = False,
+    ) -> int:
+        """
+        Recalcula o resumo da empresa a partir das vendas (todas, ou a
+        partir de `since`). Retorna o número de linhas gravadas.
+
+        Com `missing_only`, não faz nada se o histórico já foi
+        reconstruído (por outro worker, enquanto esperava a trava).
+        """
+        await self._create_state(user_id)
+
+        async with in_transaction() as connection:
+            state = await self._lock(user_id, connection)
+            if missing_only and state.completo:
+                self._ready.add(user_id)
+                return 0
+
+            groups = await self._scan(user_id, since, connection)
+
+            existing = DailySalesRollup.filter(usuario_id=user_id)
+            if since is not None:
+                existing = existing.filter(dia__gte=since)
+            await existing.using_db(connection).delete()
+
+            await DailySalesRollup.bulk_create(
+                [
+                    DailySalesRollup(
+                        usuario_id=user_id,
+                        dia=day,
+                        funcionario_id=employee_id,
+                        payment_method=method,
+                        **values,
+                    )
+                    for (day, employee_id, method), values in groups.items()
+                ],
+                batch_size=1000,
+                using_db=connection,
+            )
+
+            if since is None:
+                state.completo = True
+                await state.save(using_db=connection)
+
+        if since is None:
+            self._ready.add(user_id)
+        return len(groups)
+
+    async def _scan(
+        self, user_id: int, since: Optional[date], connection
+    ) -> Dict[Key, Dict[str, Any]]:
+        """Totais por (dia, funcionário, forma de pagamento), em blocos."""
+        groups: Dict[Key, Dict[str, Any]] = {}
+        codes: Dict[Key, Set[str]] = {}
+
+        base = Sales.filter(usuario_id=user_id)
+        if since is not None:
+            base = base.filter(criado_em__gte=day_bounds(since)[0])
+
+        last_id = 0
+        while True:
+            rows = (
+                await base.filter(id__gt=last_id)
+                .using_db(connection)
+                .order_by('id')
+                .limit(REBUILD_CHUNK)
+                .values(*SALE_FIELDS)
+            )
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+
+            for row in rows:
+                key = (
+                    sale_day(row['criado_em']),
+                    row['funcionario_id'] or 0,
+                    _payment(row['payment_method']),
+                )
+                group = groups.setdefault(key, dict.fromkeys(METRICS, 0))
+                group['vendas'] += 1
+                group['receita'] += float(row['total_price'] or 0)
+                group['custo'] += float(row['cost_price'] or 0)
+                group['lucro'] += float(row['lucro_total'] or 0)
+                group['itens'] += int(row['quantity'] or 0)
+
+                code = row['sale_code']
+                seen = codes.setdefault(key, set())
+                if not code:
+                    group['vendas_distintas'] += 1
+                elif code not in seen:
+                    seen.add(code)
+                    group['vendas_distintas'] += 1
+        return groups
+
+    async def ensure(self, user_id: int) -> None:
+        """Reconstrói o resumo da empresa na primeira leitura, se preciso."""
+        if user_id in self._ready:
+            return
+        if await SalesRollupState.filter(
+            usuario_id=user_id, completo=True
+        ).exists():
+            self._ready.add(user_id)
+            return
+        await self.rebuild(user_id, missing_only=True)
+
+    # ------------------------------------------------------------------
+    # Leituras
+    # ------------------------------------------------------------------
+    def _query(
+        self,
+        user_id: int,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ):
+        query = DailySalesRollup.filter(usuario_id=user_id)
+        if start is not None:
+            query = query.filter(dia__gte=start)
+        if end is not None:
+            query = query.filter(dia__lte=end)
+        return query
+
+    async def totals(
+        self,
+        user_id: int,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """Totais do período (sem datas: todo o histórico)."""
+        await self.ensure(user_id)
+        row = (
+            await self._query(user_id, start, end)
+            .annotate(**{name: Sum(name) for name in METRICS})
+            .first()
+            .values(*METRICS)
+        )
+        return _metrics(row)
+
+    async def by_payment(
+        self,
+        user_id: int,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        funcionario_id: Optional[int] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Totais do período por forma de pagamento."""
+        await self.ensure(user_id)
+        query = self._query(user_id, start, end)
+        if funcionario_id is not None:
+            query = query.filter(funcionario_id=funcionario_id)
+        rows = (
+            await query
+            .annotate(**{name: Sum(name) for name in METRICS})
+            .group_by('payment_method')
+            .values('payment_method', *METRICS)
+        )
+        return {row['payment_method']: _metrics(row) for row in rows}
+
+    # ------------------------------------------------------------------
+    # Job diário
+    # ------------------------------------------------------------------
+    async def backfill(self) -> None:
+        """Reconstrói as empresas que ainda não têm resumo."""
+        done = await SalesRollupState.filter(completo=True).values_list(
+            'usuario_id', flat=True
+        )
+        pending = await (
+            Usuario.exclude(id__in=list(done)).values_list('id', flat=True)
+            if done
+            else Usuario.all().values_list('id', flat=True)
+        )
+        for user_id in pending:
+            try:
+                await self.rebuild(user_id, missing_only=True)
+            except Exception as e:
+                LOGGER.error(
+                    f'Falha no backfill do resumo de vendas da empresa '
+                    f'{user_id}: {e}'
+                )
+
+    async def reconcile(self) -> None:
+        """Recalcula os últimos RECONCILE_DAYS dias de todas as empresas."""
+        since = today() - timedelta(days=RECONCILE_DAYS)
+        for user_id in await SalesRollupState.filter(
+            completo=True
+        ).values_list('usuario_id', flat=True):
+            try:
+                await self.rebuild(user_id, since=since)
+            except Exception as e:
+                LOGGER.error(
+                    f'Falha ao conciliar o resumo de vendas da empresa '
+                    f'{user_id}: {e}'
+                )
+
+    @staticmethod
+    def _seconds_until_next_run() -> float:
+        now = datetime.now(TIMEZONE).replace(tzinfo=None)
+        next_run = datetime.combine(now.date(), time(hour=RECONCILE_HOUR))
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+    async def _reconcile_once(self) -> None:
+        acquired = await client.acquire_lock(
+            RECONCILE_LOCK_KEY.format(day=today().isoformat()), 86400
+        )
+        if acquired:
+            await self.reconcile()
+
+    async def _run(self) -> None:
+        try:
+            await self.backfill()
+        except Exception as e:
+            LOGGER.error(f'Falha no backfill do resumo de vendas: {e}')
+        while True:
+            await asyncio.sleep(self._seconds_until_next_run())
+            try:
+                await self._reconcile_once()
+            except Exception as e:
+                LOGGER.error(
+                    f'Falha na conciliação do resumo de vendas: {e}'
+                )
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+# Instância global
+sales_rollup = SalesRollup()
+
+__all__ = [
+    'METRICS',
+    'SalesRollup',
+    'day_bounds',
+    'sale_day',
+    'sales_rollup',
+    'today',
+]
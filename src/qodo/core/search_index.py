@@ -0,0 +1,285 @@
+# src/core/search_index.py
+import asyncio
+import bisect
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from qodo.logs.infos import LOGGER
+from qodo.model.product import Produto
+from qodo.utils.text_normalize import (
+    compact_code,
+    normalize_text,
+    tokenize,
+    trigrams,
+)
+
+# Campos mínimos carregados do banco para montar o índice
+INDEX_FIELDS: Tuple[str, ...] = (
+    'id',
+    'name',
+    'product_code',
+    'lot_bar_code',
+    'group',
+    'sale_price',
+    'active',
+)
+
+# Limite de palavras expandidas por prefixo (evita explosão com 1 letra)
+MAX_PREFIX_EXPANSION = 300
+
+# Similaridade mínima de trigramas para considerar um resultado "fuzzy"
+FUZZY_THRESHOLD = 0.45
+
+# Pesos do ranking
+SCORE_EXACT_CODE = 100.0
+SCORE_NAME_PREFIX = 40.0
+SCORE_ALL_TOKENS = 30.0
+SCORE_SUBSTRING = 20.0
+SCORE_FUZZY = 15.0
+
+
+@dataclass
+class _TenantIndex:
+    """Índice invertido de uma única empresa (tenant)."""
+
+    docs: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    haystacks: Dict[int, str] = field(default_factory=dict)
+    tokens: Dict[str, Set[int]] = field(default_factory=lambda: defaultdict(set))
+    grams: Dict[str, Set[int]] = field(default_factory=lambda: defaultdict(set))
+    codes: Dict[str, Set[int]] = field(default_factory=lambda: defaultdict(set))
+    terms: Dict[int, Tuple[Set[str], Set[str], Set[str]]] = field(
+        default_factory=dict
+    )
+    built_at: float = field(default_factory=time.monotonic)
+    _sorted_tokens: List[str] = field(default_factory=list)
+    _dirty: bool = True
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        """Indexa (ou reindexa) um produto."""
+        product_id = doc['id']
+        self.discard(product_id)
+
+        codes = {
+            code
+            for code in (
+                compact_code(doc.get('product_code')),
+                compact_code(doc.get('lot_bar_code')),
+            )
+            if code
+        }
+        words = set(tokenize(doc.get('name')))
+        words.update(tokenize(doc.get('group')))
+        words.update(codes)
+        grams = trigrams(doc.get('name')) | trigrams(doc.get('group'))
+        for code in codes:
+            grams |= trigrams(code)
+
+        for word in words:
+            self.tokens[word].add(product_id)
+        for gram in grams:
+            self.grams[gram].add(product_id)
+        for code in codes:
+            self.codes[code].add(product_id)
+
+        self.docs[product_id] = doc
+        self.haystacks[product_id] = ' '.join(
+            part
+            for part in (
+                normalize_text(doc.get('name')),
+                normalize_text(doc.get('group')),
+                *codes,
+            )
+            if part
+        )
+        self.terms[product_id] = (words, grams, codes)
+        self._dirty = True
+
+    def discard(self, product_id: int) -> None:
+        """Remove um produto de todas as listas invertidas."""
+        terms = self.terms.pop(product_id, None)
+        if terms is None:
+            return
+
+        words, grams, codes = terms
+        for index, keys in (
+            (self.tokens, words),
+            (self.grams, grams),
+            (self.codes, codes),
+        ):
+            for key in keys:
+                postings = index.get(key)
+                if postings is None:
+                    continue
+                postings.discard(product_id)
+                if not postings:
+                    del index[key]
+
+        self.docs.pop(product_id, None)
+        self.haystacks.pop(product_id, None)
+        self._dirty = True
+
+    def _prefix_matches(self, prefix: str) -> Set[int]:
+        """Retorna os produtos com alguma palavra iniciando por `prefix`."""
+        if self._dirty:
+            self._sorted_tokens = sorted(self.tokens)
+            self._dirty = False
+
+        found: Set[int] = set()
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        for word in self._sorted_tokens[start : start + MAX_PREFIX_EXPANSION]:
+            if not word.startswith(prefix):
+                break
+            found |= self.tokens[word]
+        return found
+
+    def search(
+        self, query: str, limit: int = 20, fuzzy: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Busca ranqueada: código exato > prefixo > substring > fuzzy."""
+        normalized = normalize_text(query)
+        if not normalized:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+
+        # 1. Código de produto / código de barras exato
+        for product_id in self.codes.get(compact_code(normalized), ()):
+            scores[product_id] += SCORE_EXACT_CODE
+
+        # 2. Prefixo por palavra (todas as palavras da consulta)
+        query_tokens = tokenize(normalized)
+        prefix_sets = [self._prefix_matches(token) for token in query_tokens]
+        if prefix_sets:
+            matched_all = set.intersection(*prefix_sets)
+            for product_id in matched_all:
+                scores[product_id] += SCORE_ALL_TOKENS
+                if self.haystacks[product_id].startswith(normalized):
+                    scores[product_id] += SCORE_NAME_PREFIX
+
+        # 3. Substring e similaridade por trigramas
+        query_grams = trigrams(normalized)
+        if query_grams:
+            shared: Dict[int, int] = defaultdict(int)
+            for gram in query_grams:
+                for product_id in self.grams.get(gram, ()):
+                    shared[product_id] += 1
+
+            total = len(query_grams)
+            for product_id, count in shared.items():
+                similarity = count / total
+                if similarity == 1 and normalized in self.haystacks[product_id]:
+                    scores[product_id] += SCORE_SUBSTRING
+                elif fuzzy and similarity >= FUZZY_THRESHOLD:
+                    scores[product_id] += SCORE_FUZZY * similarity
+
+        ranked = sorted(
+            scores.items(),
+            key=lambda item: (-item[1], self.docs[item[0]].get('name') or ''),
+        )
+        return [
+            {**self.docs[product_id], 'score': round(score, 2)}
+            for product_id, score in ranked[:limit]
+        ]
+
+
+class ProductSearchIndex:
+    """
+    Índice de busca de produtos em memória, separado por empresa (tenant).
+
+    - Construído sob demanda na primeira busca da empresa.
+    - Atualizado de forma incremental nas rotas de criação/edição/remoção.
+    - Reconstruído após `max_age` segundos para absorver alterações feitas
+      por outros workers.
+    """
+
+    def __init__(self, max_age: int = 600):
+        self.max_age = max_age
+        self._tenants: Dict[int, _TenantIndex] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    def _is_fresh(self, user_id: int) -> bool:
+        index = self._tenants.get(user_id)
+        return (
+            index is not None
+            and time.monotonic() - index.built_at < self.max_age
+        )
+
+    async def _build(self, user_id: int) -> _TenantIndex:
+        """Carrega os produtos da empresa (apenas campos indexados)."""
+        started = time.perf_counter()
+        rows = await Produto.filter(usuario_id=user_id).values(*INDEX_FIELDS)
+
+        index = _TenantIndex()
+        for row in rows:
+            index.add(row)
+
+        LOGGER.info(
+            f'Índice de busca construído para empresa {user_id}: '
+            f'{len(rows)} produtos em {(time.perf_counter() - started) * 1000:.1f}ms'
+        )
+        return index
+
+    async def get(self, user_id: int) -> _TenantIndex:
+        """Retorna o índice da empresa, construindo-o se necessário."""
+        if self._is_fresh(user_id):
+            return self._tenants[user_id]
+
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            # Outro request pode ter construído enquanto aguardávamos
+            if not self._is_fresh(user_id):
+                self._tenants[user_id] = await self._build(user_id)
+            return self._tenants[user_id]
+
+    async def search(
+        self,
+        user_id: int,
+        query: str,
+        limit: int = 20,
+        fuzzy: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Busca produtos da empresa por nome, código, código de barras ou grupo."""
+        index = await self.get(user_id)
+        return index.search(query, limit=limit, fuzzy=fuzzy)
+
+    def upsert(
+        self, user_id: int, product: Union[Produto, Dict[str, Any]]
+    ) -> None:
+        """Atualiza um produto no índice (ignorado se o índice não foi construído)."""
+        index = self._tenants.get(user_id)
+        if index is None:
+            return
+
+        if isinstance(product, dict):
+            doc = {name: product.get(name) for name in INDEX_FIELDS}
+        else:
+            doc = {name: getattr(product, name, None) for name in INDEX_FIELDS}
+
+        if doc['id'] is not None:
+            index.add(doc)
+
+    def remove(self, user_id: int, product_ids: Union[int, Iterable[int]]) -> None:
+        """Remove um ou mais produtos do índice da empresa."""
+        index = self._tenants.get(user_id)
+        if index is None:
+            return
+
+        if isinstance(product_ids, int):
+            product_ids = (product_ids,)
+        for product_id in product_ids:
+            index.discard(product_id)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Descarta o índice de uma empresa (ou de todas)."""
+        if user_id is None:
+            self._tenants.clear()
+        else:
+            self._tenants.pop(user_id, None)
+
+
+# Instância global
+product_index = ProductSearchIndex()
+
+__all__ = ['ProductSearchIndex', 'product_index']
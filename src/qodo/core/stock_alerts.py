@@ -0,0 +1,338 @@
+# src/core/stock_alerts.py
+import asyncio
+import os
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from tortoise.expressions import F, Q
+
+from qodo.core.cache import client
+from qodo.core.events import event_bus
+from qodo.logs.infos import LOGGER
+from qodo.model.product import Produto
+from qodo.model.stock_alert import AlertaEstoque
+from qodo.model.user import Usuario
+
+"""
+stock_alerts: Motor de alertas de reposição e validade.
+
+Em vez de percorrer o catálogo a cada consulta, mantém a tabela
+`alertas_estoque` com os produtos que precisam de atenção:
+
+- `refresh`: chamado pelos hooks de core/catalog.py a cada alteração de
+  produto/estoque; reavalia apenas os produtos alterados.
+- `sweep`: varredura diária (e na inicialização) que concilia cada
+  empresa com uma consulta indexada, incluindo os produtos que entraram na
+  janela de validade só pela passagem do tempo.
+
+Alertas novos são publicados no barramento de eventos (`alert.created`).
+"""
+
+REPLENISH = 'reposicao'
+EXPIRY = 'validade'
+ALERT_TYPES = (REPLENISH, EXPIRY)
+
+# Dias antes do vencimento em que o produto passa a ser alertado
+EXPIRY_WINDOW_DAYS = int(os.getenv('ALERT_EXPIRY_DAYS', '10'))
+
+# Horário local da varredura diária
+SWEEP_HOUR = int(os.getenv('ALERT_SWEEP_HOUR', '3'))
+
+# Apenas um worker executa a varredura de cada dia
+SWEEP_LOCK_KEY = 'lock:stock_alerts:sweep:{day}'
+
+TIMEZONE = ZoneInfo('America/Sao_Paulo')
+
+PRODUCT_FIELDS = (
+    'id',
+    'name',
+    'stock',
+    'stoke_min',
+    'date_expired',
+    'price_uni',
+    'active',
+)
+SNAPSHOT_FIELDS = ('name', 'stock', 'stoke_min', 'date_expired', 'price_uni')
+
+Key = Tuple[int, str]
+
+
+def _today() -> datetime:
+    return datetime.now(TIMEZONE).replace(tzinfo=None)
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(TIMEZONE).replace(tzinfo=None)
+
+
+def _expiry_limit() -> datetime:
+    """Fim do último dia da janela de aviso de validade."""
+    last_day = _today().date() + timedelta(days=EXPIRY_WINDOW_DAYS)
+    return datetime.combine(last_day, time.max)
+
+
+def _alert_types(row: Dict[str, Any], limit: datetime) -> List[str]:
+    if not row.get('active', True):
+        return []
+
+    types = []
+    if (row['stock'] or 0) <= (row['stoke_min'] or 0):
+        types.append(REPLENISH)
+    expires = _naive(row.get('date_expired'))
+    if expires is not None and expires <= limit:
+        types.append(EXPIRY)
+    return types
+
+
+def _snapshot(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'name': row['name'] or '',
+        'stock': row['stock'] or 0,
+        'stoke_min': row['stoke_min'] or 0,
+        'date_expired': _naive(row.get('date_expired')),
+        'price_uni': row['price_uni'] or 0.0,
+    }
+
+
+def serialize_alert(alert: Dict[str, Any]) -> Dict[str, Any]:
+    """Formato de saída de um alerta (dias restantes calculados na hora)."""
+    data = {
+        'product_id': alert['produto_id'],
+        'tipo': alert['tipo'],
+        'name': alert['name'],
+        'stock': alert['stock'],
+        'stoke_min': alert['stoke_min'],
+        'price_uni': alert['price_uni'],
+        'date_expired': None,
+        'dias_restantes': None,
+    }
+    expires = _naive(alert.get('date_expired'))
+    if expires is not None:
+        data['date_expired'] = expires.strftime('%Y-%m-%d')
+        data['dias_restantes'] = (expires.date() - _today().date()).days
+    return data
+
+
+class StockAlerts:
+    """Mantém e consulta o conjunto de produtos que precisam de atenção."""
+
+    def __init__(self):
+        self._sweep_task: Optional[asyncio.Task] = None
+
+    async def _sync(
+        self,
+        user_id: int,
+        rows: Iterable[Dict[str, Any]],
+        product_ids: Optional[List[int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Concilia os alertas da empresa com as linhas de produto.
+
+        Com `product_ids` a conciliação se limita a esses produtos; sem ele
+        (varredura), vale para todos os alertas da empresa.
+        Retorna os alertas criados.
+        """
+        limit = _expiry_limit()
+        wanted: Dict[Key, Dict[str, Any]] = {}
+        for row in rows:
+            for alert_type in _alert_types(row, limit):
+                wanted[(row['id'], alert_type)] = _snapshot(row)
+
+        query = AlertaEstoque.filter(usuario_id=user_id)
+        if product_ids is not None:
+            query = query.filter(produto_id__in=product_ids)
+        existing = {
+            (alert['produto_id'], alert['tipo']): alert
+            for alert in await query.values(
+                'id', 'produto_id', 'tipo', *SNAPSHOT_FIELDS
+            )
+        }
+
+        stale = [
+            alert['id'] for key, alert in existing.items() if key not in wanted
+        ]
+        if stale:
+            await AlertaEstoque.filter(id__in=stale).delete()
+
+        for key, snapshot in wanted.items():
+            alert = existing.get(key)
+            if alert is None:
+                continue
+            current = {name: alert[name] for name in SNAPSHOT_FIELDS}
+            current['date_expired'] = _naive(current['date_expired'])
+            if current != snapshot:
+                await AlertaEstoque.filter(id=alert['id']).update(**snapshot)
+
+        created = [
+            {'produto_id': product_id, 'tipo': alert_type, **snapshot}
+            for (product_id, alert_type), snapshot in wanted.items()
+            if (product_id, alert_type) not in existing
+        ]
+        if created:
+            await AlertaEstoque.bulk_create(
+                [
+                    AlertaEstoque(usuario_id=user_id, **alert)
+                    for alert in created
+                ],
+                ignore_conflicts=True,
+            )
+        return created
+
+    async def _notify(
+        self, user_id: int, created: List[Dict[str, Any]]
+    ) -> None:
+        if not created:
+            return
+        await event_bus.publish(
+            user_id,
+            {
+                'type': 'alert.created',
+                'alerts': [serialize_alert(alert) for alert in created],
+            },
+        )
+
+    async def refresh(self, user_id: int, *product_ids: int) -> None:
+        """Reavalia os produtos alterados (hook de cada mutação)."""
+        product_ids = sorted({pid for pid in product_ids if pid})
+        if not product_ids:
+            return
+
+        try:
+            rows = await Produto.filter(
+                usuario_id=user_id, id__in=product_ids
+            ).values(*PRODUCT_FIELDS)
+            created = await self._sync(user_id, rows, product_ids)
+            await self._notify(user_id, created)
+        except Exception as e:
+            LOGGER.error(
+                f'Falha ao atualizar alertas de estoque da empresa {user_id}: {e}'
+            )
+
+    async def reconcile(self, user_id: int) -> int:
+        """Concilia todos os alertas da empresa (consulta indexada)."""
+        rows = (
+            await Produto.filter(usuario_id=user_id, active=True)
+            .filter(
+                Q(stock__lte=F('stoke_min'))
+                | Q(date_expired__lte=_expiry_limit())
+            )
+            .values(*PRODUCT_FIELDS)
+        )
+        created = await self._sync(user_id, rows)
+        await self._notify(user_id, created)
+        return len(created)
+
+    async def sweep(self) -> None:
+        """Varredura de todas as empresas."""
+        started = datetime.now()
+        created = failed = 0
+        for user_id in await Usuario.all().values_list('id', flat=True):
+            try:
+                created += await self.reconcile(user_id)
+            except Exception as e:
+                failed += 1
+                LOGGER.error(
+                    f'Falha na varredura de alertas da empresa {user_id}: {e}'
+                )
+        LOGGER.info(
+            f'Varredura de alertas concluída: {created} novos, '
+            f'{failed} empresas com erro em '
+            f'{(datetime.now() - started).total_seconds():.1f}s'
+        )
+
+    async def page(
+        self,
+        user_id: int,
+        alert_type: Optional[str] = None,
+        cursor: Optional[int] = None,
+        limit: int = 200,
+    ) -> Dict[str, Any]:
+        """
+        Alertas da empresa, paginados pelo id do alerta. Um produto pode
+        ter dois alertas (reposição e validade): o cursor pelo id do
+        produto pularia o segundo quando a página termina entre eles.
+        """
+        query = AlertaEstoque.filter(usuario_id=user_id)
+        if alert_type:
+            query = query.filter(tipo=alert_type)
+        if cursor:
+            query = query.filter(id__gt=cursor)
+
+        rows = (
+            await query.order_by('id')
+            .limit(limit + 1)
+            .values('id', 'produto_id', 'tipo', *SNAPSHOT_FIELDS)
+        )
+        has_more = len(rows) > limit
+        items = rows[:limit]
+        return {
+            'items': [serialize_alert(row) for row in items],
+            'next_cursor': items[-1]['id'] if has_more else None,
+            'has_more': has_more,
+        }
+
+    async def by_type(
+        self, user_id: int, alert_type: str
+    ) -> List[Dict[str, Any]]:
+        rows = (
+            await AlertaEstoque.filter(usuario_id=user_id, tipo=alert_type)
+            .order_by('produto_id')
+            .values('produto_id', 'tipo', *SNAPSHOT_FIELDS)
+        )
+        return [serialize_alert(row) for row in rows]
+
+    @staticmethod
+    def _seconds_until_next_sweep() -> float:
+        now = _today()
+        next_run = datetime.combine(now.date(), time(hour=SWEEP_HOUR))
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+    async def _sweep_once(self) -> None:
+        day = _today().date().isoformat()
+        acquired = await client.acquire_lock(
+            SWEEP_LOCK_KEY.format(day=day), 86400
+        )
+        if not acquired:
+            return
+        try:
+            await self.sweep()
+        except Exception as e:
+            LOGGER.error(f'Falha na varredura de alertas: {e}')
+
+    async def _run(self) -> None:
+        # Concilia na inicialização (preenche a tabela na primeira execução)
+        await self._sweep_once()
+        while True:
+            await asyncio.sleep(self._seconds_until_next_sweep())
+            await self._sweep_once()
+
+    def start(self) -> None:
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._sweep_task = None
+
+
+# Instância global
+stock_alerts = StockAlerts()
+
+__all__ = [
+    'ALERT_TYPES',
+    'EXPIRY',
+    'REPLENISH',
+    'StockAlerts',
+    'serialize_alert',
+    'stock_alerts',
+]
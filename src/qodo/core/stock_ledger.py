@@ -0,0 +1,389 @@
+# src/core/stock_ledger.py
+import asyncio
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional
+
+from tortoise import timezone
+from tortoise.functions import Max, Sum
+from tortoise.transactions import in_transaction
+
+from qodo.core.cache import client
+from qodo.logs.infos import LOGGER
+from qodo.model.product import Produto
+from qodo.model.stock_movement import MovimentoEstoque, SnapshotEstoque
+from qodo.model.user import Usuario
+
+"""
+stock_ledger: Histórico de movimentações de estoque (somente inserção).
+
+- `record`: grava as variações de uma operação com um único bulk_create,
+  na mesma transação da alteração de estoque quando houver uma.
+- `snapshot`: fotografia periódica do estoque dos produtos movimentados
+  desde a última execução; cada fotografia guarda até qual movimentação
+  ela cobre e a divergência em relação ao histórico.
+- `current` / `as_of`: estoque atual ou em uma data, calculado como
+  fotografia + movimentações posteriores (custo proporcional ao número de
+  movimentações desde a fotografia).
+
+`Produto.stock` continua sendo o saldo usado pelas vendas; o histórico
+permite auditar diferenças e reconstruir o saldo em qualquer data.
+"""
+
+SALE = 'VENDA'
+CART = 'CARRINHO'
+CANCEL = 'CANCELAMENTO'
+REVERSAL = 'ESTORNO'
+ENTRY = 'ENTRADA'
+EXIT = 'SAIDA'
+ADJUSTMENT = 'AJUSTE'  # saldo sobrescrito (planilha, edição do produto)
+MOVEMENT_TYPES = (SALE, CART, CANCEL, REVERSAL, ENTRY, EXIT, ADJUSTMENT)
+
+# Intervalo entre as fotografias (horas)
+SNAPSHOT_INTERVAL_HOURS = int(os.getenv('STOCK_SNAPSHOT_HOURS', '24'))
+
+# Apenas um worker fotografa cada intervalo
+SNAPSHOT_LOCK_KEY = 'lock:stock_ledger:snapshot:{slot}'
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.replace(tzinfo=None)
+
+
+class StockLedger:
+    """Grava e consulta o histórico de movimentações de estoque."""
+
+    def __init__(self):
+        self._snapshot_task: Optional[asyncio.Task] = None
+
+    async def record(
+        self,
+        user_id: int,
+        deltas: Mapping[int, int],
+        kind: str,
+        reference: Optional[str] = None,
+        using_db=None,
+    ) -> None:
+        """Grava uma linha por produto alterado (quantidade com sinal)."""
+        movements = [
+            MovimentoEstoque(
+                usuario_id=user_id,
+                produto_id=product_id,
+                quantidade=int(delta),
+                tipo=kind,
+                referencia=str(reference)[:100] if reference else None,
+            )
+            for product_id, delta in deltas.items()
+            if product_id and delta
+        ]
+        if movements:
+            await MovimentoEstoque.bulk_create(movements, using_db=using_db)
+
+    async def _latest_snapshots(
+        self, product_ids: List[int]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Última fotografia de cada produto."""
+        last_ids = (
+            await SnapshotEstoque.filter(produto_id__in=product_ids)
+            .annotate(last=Max('id'))
+            .group_by('produto_id')
+            .values_list('last', flat=True)
+        )
+        if not last_ids:
+            return {}
+        rows = await SnapshotEstoque.filter(id__in=list(last_ids)).values(
+            'produto_id', 'estoque', 'movimento_id'
+        )
+        return {row['produto_id']: row for row in rows}
+
+    async def snapshot(self, user_id: int) -> Dict[str, int]:
+        """
+        Fotografa os produtos movimentados desde a última fotografia.
+
+        Retorna a quantidade de fotografias e de produtos divergentes.
+        """
+        cursor = (
+            await SnapshotEstoque.filter(usuario_id=user_id)
+            .annotate(last=Max('movimento_id'))
+            .first()
+            .values_list('last', flat=True)
+        ) or 0
+
+        product_ids = list(
+            await MovimentoEstoque.filter(usuario_id=user_id, id__gt=cursor)
+            .distinct()
+            .values_list('produto_id', flat=True)
+        )
+        if not product_ids:
+            return {'snapshots': 0, 'divergent': 0}
+
+        previous = await self._latest_snapshots(product_ids)
+        since = min(
+            (previous[pid]['movimento_id'] for pid in previous), default=0
+        )
+        if len(previous) < len(product_ids):
+            since = 0
+
+        async with in_transaction() as connection:
+            # Trava os produtos: nenhuma movimentação entra no meio da
+            # leitura do saldo
+            stock = dict(
+                await Produto.filter(usuario_id=user_id, id__in=product_ids)
+                .using_db(connection)
+                .select_for_update()
+                .order_by('id')
+                .values_list('id', 'stock')
+            )
+            movements = (
+                await MovimentoEstoque.filter(
+                    produto_id__in=product_ids, id__gt=since
+                )
+                .using_db(connection)
+                .values('produto_id', 'id', 'quantidade')
+            )
+
+            last: Dict[int, int] = {}
+            moved: Dict[int, int] = {}
+            for row in movements:
+                pid = row['produto_id']
+                base = previous.get(pid, {}).get('movimento_id', 0)
+                if row['id'] <= base:
+                    continue
+                last[pid] = max(last.get(pid, 0), row['id'])
+                moved[pid] = moved.get(pid, 0) + row['quantidade']
+
+            snapshots = []
+            for pid in product_ids:
+                if pid not in last:
+                    continue
+                prior = previous.get(pid)
+                expected = (prior['estoque'] if prior else 0) + moved[pid]
+                # Produto excluído: mantém o saldo calculado pelo histórico
+                current = stock.get(pid, expected)
+                snapshots.append(
+                    SnapshotEstoque(
+                        usuario_id=user_id,
+                        produto_id=pid,
+                        estoque=current,
+                        movimento_id=last[pid],
+                        # Sem fotografia anterior o histórico não cobre o
+                        # saldo de abertura: esta é a linha de base
+                        divergencia=current - expected if prior else 0,
+                    )
+                )
+            await SnapshotEstoque.bulk_create(snapshots, using_db=connection)
+
+        divergent = [s.produto_id for s in snapshots if s.divergencia]
+        if divergent:
+            LOGGER.warning(
+                f'Estoque divergente do histórico na empresa {user_id}: '
+                f'produtos {divergent[:20]}'
+            )
+        return {'snapshots': len(snapshots), 'divergent': len(divergent)}
+
+    async def current(self, user_id: int, product_id: int) -> Optional[int]:
+        """Estoque atual pelo histórico: fotografia + movimentações."""
+        snapshot = (
+            await SnapshotEstoque.filter(
+                usuario_id=user_id, produto_id=product_id
+            )
+            .order_by('-movimento_id')
+            .first()
+            .values('estoque', 'movimento_id')
+        )
+        if snapshot is None:
+            # Ainda sem fotografia: o saldo do produto é a referência
+            return (
+                await Produto.filter(usuario_id=user_id, id=product_id)
+                .first()
+                .values_list('stock', flat=True)
+            )
+
+        moved = (
+            await MovimentoEstoque.filter(
+                produto_id=product_id, id__gt=snapshot['movimento_id']
+            )
+            .annotate(total=Sum('quantidade'))
+            .first()
+            .values_list('total', flat=True)
+        )
+        return snapshot['estoque'] + int(moved or 0)
+
+    async def as_of(
+        self, user_id: int, product_id: int, when: datetime
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Estoque do produto em `when`.
+
+        Usa a última fotografia até a data somada às movimentações
+        seguintes; antes da primeira fotografia, parte da fotografia (ou
+        do saldo atual) e desfaz as movimentações posteriores à data.
+        """
+        when = _naive(when)
+        movements = MovimentoEstoque.filter(produto_id=product_id)
+
+        before = (
+            await SnapshotEstoque.filter(
+                usuario_id=user_id, produto_id=product_id, criado_em__lte=when
+            )
+            .order_by('-criado_em')
+            .first()
+            .values('estoque', 'movimento_id')
+        )
+        if before is not None:
+            moved = (
+                await movements.filter(
+                    id__gt=before['movimento_id'], criado_em__lte=when
+                )
+                .annotate(total=Sum('quantidade'))
+                .first()
+                .values_list('total', flat=True)
+            )
+            stock = before['estoque'] + int(moved or 0)
+            return {'product_id': product_id, 'stock': stock, 'at': when}
+
+        after = (
+            await SnapshotEstoque.filter(
+                usuario_id=user_id, produto_id=product_id, criado_em__gt=when
+            )
+            .order_by('criado_em')
+            .first()
+            .values('estoque', 'movimento_id')
+        )
+        if after is not None:
+            base = after['estoque']
+            later = movements.filter(
+                id__lte=after['movimento_id'], criado_em__gt=when
+            )
+        else:
+            base = (
+                await Produto.filter(usuario_id=user_id, id=product_id)
+                .first()
+                .values_list('stock', flat=True)
+            )
+            if base is None:
+                return None
+            later = movements.filter(criado_em__gt=when)
+
+        moved = (
+            await later.annotate(total=Sum('quantidade'))
+            .first()
+            .values_list('total', flat=True)
+        )
+        stock = base - int(moved or 0)
+        return {'product_id': product_id, 'stock': stock, 'at': when}
+
+    async def history(
+        self,
+        user_id: int,
+        product_id: int,
+        cursor: Optional[int] = None,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """Movimentações do produto, da mais recente para a mais antiga."""
+        query = MovimentoEstoque.filter(
+            usuario_id=user_id, produto_id=product_id
+        )
+        if cursor:
+            query = query.filter(id__lt=cursor)
+
+        rows = (
+            await query.order_by('-id')
+            .limit(limit + 1)
+            .values('id', 'quantidade', 'tipo', 'referencia', 'criado_em')
+        )
+        has_more = len(rows) > limit
+        items = rows[:limit]
+        return {
+            'items': items,
+            'next_cursor': items[-1]['id'] if has_more else None,
+            'has_more': has_more,
+        }
+
+    async def divergences(
+        self, user_id: int, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Fotografias mais recentes em que o saldo não bateu."""
+        return (
+            await SnapshotEstoque.filter(usuario_id=user_id)
+            .exclude(divergencia=0)
+            .order_by('-id')
+            .limit(limit)
+            .values(
+                'produto_id',
+                'estoque',
+                'divergencia',
+                'movimento_id',
+                'criado_em',
+            )
+        )
+
+    async def snapshot_all(self) -> None:
+        """Fotografia de todas as empresas."""
+        started = datetime.now()
+        total = divergent = failed = 0
+        for user_id in await Usuario.all().values_list('id', flat=True):
+            try:
+                result = await self.snapshot(user_id)
+                total += result['snapshots']
+                divergent += result['divergent']
+            except Exception as e:
+                failed += 1
+                LOGGER.error(
+                    f'Falha na fotografia de estoque da empresa {user_id}: {e}'
+                )
+        LOGGER.info(
+            f'Fotografia de estoque concluída: {total} produtos, '
+            f'{divergent} divergentes, {failed} empresas com erro em '
+            f'{(datetime.now() - started).total_seconds():.1f}s'
+        )
+
+    async def _snapshot_once(self) -> None:
+        interval = SNAPSHOT_INTERVAL_HOURS * 3600
+        slot = int(timezone.now().timestamp()) // interval
+        acquired = await client.acquire_lock(
+            SNAPSHOT_LOCK_KEY.format(slot=slot), interval
+        )
+        if not acquired:
+            return
+        try:
+            await self.snapshot_all()
+        except Exception as e:
+            LOGGER.error(f'Falha na fotografia de estoque: {e}')
+
+    async def _run(self) -> None:
+        while True:
+            await self._snapshot_once()
+            await asyncio.sleep(SNAPSHOT_INTERVAL_HOURS * 3600)
+
+    def start(self) -> None:
+        if self._snapshot_task is None or self._snapshot_task.done():
+            self._snapshot_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            try:
+                await self._snapshot_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._snapshot_task = None
+
+
+# Instância global
+stock_ledger = StockLedger()
+
+__all__ = [
+    'ADJUSTMENT',
+    'CANCEL',
+    'CART',
+    'ENTRY',
+    'EXIT',
+    'MOVEMENT_TYPES',
+    'REVERSAL',
+    'SALE',
+    'StockLedger',
+    'stock_ledger',
+]
@@ -0,0 +1,182 @@
+# src/core/stock_summary.py
+from datetime import timedelta
+from typing import Any, Dict, List, Mapping
+
+from tortoise import timezone
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F, Q, RawSQL
+from tortoise.functions import Count, Sum
+
+from qodo.logs.infos import LOGGER
+from qodo.model.catalog import ResumoEstoque
+from qodo.model.product import Produto
+
+"""
+stock_summary: Métricas de estoque da empresa sem varrer o catálogo.
+
+- `rebuild`: uma única consulta agregada (COUNT/SUM) no banco.
+- `apply_deltas`: ajusta a linha de resumo pela diferença de estoque de
+  cada movimentação (venda, carrinho, entrada, saída, cancelamento).
+- `mark_stale`: alterações de preço/cadastro/exclusão não trazem os valores
+  anteriores; a linha é recalculada na próxima leitura.
+
+Como proteção contra deriva (arredondamentos, escritas concorrentes com um
+recálculo), a linha também é recalculada quando fica mais velha que
+MAX_AGE.
+"""
+
+MAX_AGE = timedelta(hours=6)
+
+# Categoria exibida para os produtos sem grupo
+UNCATEGORIZED = 'Sem categoria'
+
+SUMMARY_FIELDS = (
+    'total_produtos',
+    'total_itens',
+    'valor_custo',
+    'valor_venda',
+    'estoque_baixo',
+)
+
+
+def _aggregates() -> Dict[str, Any]:
+    return {
+        'total_produtos': Count('id'),
+        'total_itens': Sum('stock'),
+        # Float x Int: o tortoise recusa F() * F() de tipos diferentes
+        'valor_custo': RawSQL('SUM(cost_price * stock)'),
+        'valor_venda': RawSQL('SUM(sale_price * stock)'),
+        # Mesmo critério dos alertas de reposição: estoque <= mínimo
+        'estoque_baixo': Count('id', _filter=Q(stock__lte=F('stoke_min'))),
+    }
+
+
+def _as_dict(row: Mapping[str, Any]) -> Dict[str, Any]:
+    return {
+        'total_produtos': int(row.get('total_produtos') or 0),
+        'total_itens': int(row.get('total_itens') or 0),
+        'valor_custo': round(float(row.get('valor_custo') or 0), 2),
+        'valor_venda': round(float(row.get('valor_venda') or 0), 2),
+        'estoque_baixo': int(row.get('estoque_baixo') or 0),
+    }
+
+
+class StockSummary:
+    """Leitura e manutenção da linha de resumo do estoque por empresa."""
+
+    async def rebuild(self, user_id: int) -> Dict[str, Any]:
+        """Recalcula os totais com uma agregação no banco."""
+        row = (
+            await Produto.filter(usuario_id=user_id)
+            .annotate(**_aggregates())
+            .first()
+            .values(*SUMMARY_FIELDS)
+        )
+        summary = _as_dict(row or {})
+        values = {
+            **summary,
+            'desatualizado': False,
+            'recalculado_em': timezone.now(),
+        }
+
+        updated = await ResumoEstoque.filter(usuario_id=user_id).update(
+            **values
+        )
+        if not updated:
+            try:
+                await ResumoEstoque.create(usuario_id=user_id, **values)
+            except IntegrityError:
+                # Outro request criou a linha ao mesmo tempo
+                await ResumoEstoque.filter(usuario_id=user_id).update(
+                    **values
+                )
+        return summary
+
+    async def get(self, user_id: int) -> Dict[str, Any]:
+        """Totais atuais (recalcula se a linha não existe ou está velha)."""
+        row = await ResumoEstoque.filter(usuario_id=user_id).first()
+        if (
+            row is None
+            or row.desatualizado
+            or row.recalculado_em is None
+            or timezone.now().replace(tzinfo=None)
+            - row.recalculado_em.replace(tzinfo=None)
+            > MAX_AGE
+        ):
+            return await self.rebuild(user_id)
+
+        return _as_dict({name: getattr(row, name) for name in SUMMARY_FIELDS})
+
+    async def by_category(self, user_id: int) -> List[Dict[str, Any]]:
+        """Totais por categoria (GROUP BY group)."""
+        rows = (
+            await Produto.filter(usuario_id=user_id)
+            .annotate(**_aggregates())
+            .group_by('group')
+            .order_by('group')
+            .values('group', *SUMMARY_FIELDS)
+        )
+        return [
+            {'category': row['group'] or UNCATEGORIZED, **_as_dict(row)}
+            for row in rows
+        ]
+
+    async def apply_deltas(
+        self, user_id: int, deltas: Mapping[int, int]
+    ) -> None:
+        """
+        Ajusta o resumo pela variação de estoque de cada produto.
+
+        Chamado depois de gravado o novo estoque: o valor anterior é
+        `stock - delta`, usado para saber se o produto entrou ou saiu da
+        faixa de estoque baixo.
+        """
+        deltas = {pid: int(delta) for pid, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        try:
+            rows = await Produto.filter(
+                usuario_id=user_id, id__in=list(deltas)
+            ).values('id', 'stock', 'stoke_min', 'cost_price', 'sale_price')
+
+            items = cost = sale = low = 0
+            for row in rows:
+                delta = deltas[row['id']]
+                stock = row['stock'] or 0
+                minimum = row['stoke_min'] or 0
+                items += delta
+                cost += delta * (row['cost_price'] or 0)
+                sale += delta * (row['sale_price'] or 0)
+                low += int(stock <= minimum) - int(stock - delta <= minimum)
+
+            # Linha desatualizada será recalculada inteira na leitura
+            await ResumoEstoque.filter(
+                usuario_id=user_id, desatualizado=False
+            ).update(
+                total_itens=F('total_itens') + items,
+                valor_custo=F('valor_custo') + cost,
+                valor_venda=F('valor_venda') + sale,
+                estoque_baixo=F('estoque_baixo') + low,
+            )
+        except Exception as e:
+            LOGGER.error(
+                f'Falha ao atualizar resumo de estoque da empresa {user_id}: {e}'
+            )
+            await self.mark_stale(user_id)
+
+    async def mark_stale(self, user_id: int) -> None:
+        try:
+            await ResumoEstoque.filter(usuario_id=user_id).update(
+                desatualizado=True
+            )
+        except Exception as e:
+            LOGGER.error(
+                f'Falha ao invalidar resumo de estoque da empresa {user_id}: {e}'
+            )
+
+
+# Instância global
+stock_summary = StockSummary()
+
+__all__ = ['UNCATEGORIZED', 'StockSummary', 'stock_summary']
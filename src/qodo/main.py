@@ -7,9 +7,21 @@ from fastapi.middleware.cors import CORSMiddleware
 
 # ✅ Import da nova estrutura
 from qodo.conf.database import init_database, close_database
+from qodo.controllers.products.image_pipeline import image_gc
+from qodo.core.abc_curve import abc_curve
+from qodo.core.analytics_export import analytics_export
+from qodo.core.cache import WORKERS
+from qodo.core.cache import client as cache_client
+from qodo.core.cached import cache_stats
+from qodo.core.events import event_bus
+from qodo.core.process_pool import shutdown_process_pool
+from qodo.core.sales_rollup import sales_rollup
+from qodo.core.stock_alerts import stock_alerts
+from qodo.core.stock_ledger import stock_ledger
 from qodo.logs.infos import LOGGER
 from qodo.routes import setup_routes, get_api_metadata
 from qodo.utils.dados_teste import create_mock_data_and_sell_all_stock
+from qodo.utils.search_keys import backfill_search_keys
 
 
 @asynccontextmanager
@@ -20,6 +32,30 @@ async def lifespan(app: FastAPI):
     # ✅ Inicializa banco usando a nova configuração
     if await init_database():
         LOGGER.info('Banco de dados iniciado e tabelas criadas!')
+        await backfill_search_keys()
+        if cache_client.shared_locks:
+            # Varredura diária de alertas de reposição/validade
+            stock_alerts.start()
+            # Fotografia periódica do estoque (histórico de movimentações)
+            stock_ledger.start()
+            # Backfill e conciliação diária do resumo de vendas
+            sales_rollup.start()
+            # Cópia em Parquet para os relatórios analíticos
+            analytics_export.start()
+            # Curva ABC dos produtos (cálculo diário fora do pico)
+            abc_curve.start()
+            # Coleta das imagens de produto sem uso
+            image_gc.start()
+        else:
+            # Sem Redis os locks são por processo: os jobs rodariam em
+            # todos os workers ao mesmo tempo
+            LOGGER.error(
+                f'CACHE_REDIS não definido com WEB_CONCURRENCY={WORKERS}: '
+                'jobs em segundo plano (alertas, fotografia de estoque, '
+                'resumo de vendas, exportação analítica, curva ABC e '
+                'coleta de imagens) DESATIVADOS. Configure o Redis ou use '
+                'um único worker.'
+            )
         # await create_mock_data_and_sell_all_stock()  # Descomente se necessário
     else:
         LOGGER.error('Falha ao inicializar banco de dados')
@@ -27,6 +63,14 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    await stock_alerts.stop()
+    await stock_ledger.stop()
+    await sales_rollup.stop()
+    await analytics_export.stop()
+    await abc_curve.stop()
+    await image_gc.stop()
+    shutdown_process_pool()
+    await event_bus.close()
     await close_database()
     LOGGER.info('Banco de dados encerrado com sucesso.')
 
@@ -60,6 +104,7 @@ class Server:
             allow_credentials=True,
             allow_methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'OPTIONS'],
             allow_headers=['*'],
+            expose_headers=['ETag', 'X-Labels', 'X-Catalog-Version'],
         )
 
     def setup_routes(self):
@@ -96,8 +141,14 @@ class Server:
                 'timestamp': '2024-01-01T00:00:00Z',  # Usar datetime.utcnow() em produção
                 'service': 'qodo-pdv-api',
                 'version': '1.0.0',
+                'cache': await cache_client.health(),
             }
 
+        @self.api.get('/api/v1/cache/stats', tags=['🏠 Sistema'])
+        async def cache_statistics():
+            """Hits, misses e latência das funções cacheadas (deste worker)."""
+            return cache_stats.snapshot()
+
         @self.api.get('/api/v1/info', tags=['🏠 Sistema'])
         async def system_info():
             """Informações detalhadas do sistema."""
@@ -0,0 +1,43 @@
+# Model da curva ABC de produtos
+from tortoise import fields, models
+
+
+# ========================
+# 🔹 Classificação ABC (Pareto) por janela
+# ========================
+class CurvaABC(models.Model):
+    """
+    Classe ABC de cada produto vendido na janela (últimos `janela_dias`).
+
+    Recalculada pelo job de core/abc_curve.py; a rota só lê estas linhas.
+    Produtos sem venda na janela não aparecem (equivalem à classe C).
+    """
+
+    id = fields.IntField(pk=True)
+    produto_id = fields.IntField()
+    janela_dias = fields.IntField()
+    classe = fields.CharField(max_length=1)
+    # Posição no ranking de receita (1 = maior receita)
+    posicao = fields.IntField()
+    receita = fields.FloatField(default=0.0)
+    lucro = fields.FloatField(default=0.0)
+    margem = fields.FloatField(default=0.0)
+    itens = fields.IntField(default=0)
+    # Participação na receita e participação acumulada (0 a 1)
+    participacao = fields.FloatField(default=0.0)
+    acumulado = fields.FloatField(default=0.0)
+    calculado_em = fields.DatetimeField(auto_now_add=True)
+
+    usuario = fields.ForeignKeyField(
+        'models.Usuario',
+        related_name='curva_abc',
+        on_delete=fields.CASCADE,
+    )
+
+    class Meta:
+        table = 'curva_abc'
+        unique_together = (('usuario_id', 'janela_dias', 'produto_id'),)
+        indexes = [
+            ('usuario_id', 'janela_dias', 'posicao'),
+            ('usuario_id', 'janela_dias', 'classe'),
+        ]
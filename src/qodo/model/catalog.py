@@ -0,0 +1,108 @@
+# Model de sincronização do catálogo
+from tortoise import fields, models
+
+
+# ========================
+# 🔹 Versão do catálogo (por empresa)
+# ========================
+class CatalogVersion(models.Model):
+    """
+    Contador monotônico do catálogo de cada empresa.
+
+    Toda alteração de produto incrementa `version` e grava o novo valor em
+    `Produto.catalog_version`, na mesma transação. O lock da linha deste
+    contador garante que as versões sejam confirmadas em ordem.
+    """
+
+    id = fields.IntField(pk=True)
+    version = fields.BigIntField(default=0)
+    atualizado_em = fields.DatetimeField(auto_now=True)
+
+    usuario = fields.OneToOneField(
+        'models.Usuario',
+        related_name='catalog_version',
+        on_delete=fields.CASCADE,
+    )
+
+    class Meta:
+        table = 'catalog_versions'
+
+
+# ========================
+# 🔹 Produto removido (tombstone)
+# ========================
+class ProdutoRemovido(models.Model):
+    """Registro de produto excluído, usado pelo delta-sync dos PDVs."""
+
+    id = fields.IntField(pk=True)
+    produto_id = fields.IntField()
+    version = fields.BigIntField()
+    removido_em = fields.DatetimeField(auto_now_add=True)
+
+    usuario = fields.ForeignKeyField(
+        'models.Usuario',
+        related_name='produtos_removidos',
+        on_delete=fields.CASCADE,
+    )
+
+    class Meta:
+        table = 'produtos_removidos'
+        indexes = [('usuario_id', 'version')]
+
+
+# ========================
+# 🔹 Resumo do estoque (por empresa)
+# ========================
+class ResumoEstoque(models.Model):
+    """
+    Totais do estoque da empresa para o painel.
+
+    Atualizado por diferença a cada movimentação de estoque (core/catalog.py)
+    e recalculado com uma única agregação quando marcado como desatualizado
+    (alteração de preço, cadastro ou exclusão de produto).
+    """
+
+    id = fields.IntField(pk=True)
+    total_produtos = fields.IntField(default=0)
+    total_itens = fields.BigIntField(default=0)
+    valor_custo = fields.FloatField(default=0.0)
+    valor_venda = fields.FloatField(default=0.0)
+    estoque_baixo = fields.IntField(default=0)
+    desatualizado = fields.BooleanField(default=True)
+    recalculado_em = fields.DatetimeField(null=True)
+    atualizado_em = fields.DatetimeField(auto_now=True)
+
+    usuario = fields.OneToOneField(
+        'models.Usuario',
+        related_name='resumo_estoque',
+        on_delete=fields.CASCADE,
+    )
+
+    class Meta:
+        table = 'resumo_estoque'
+
+
+# ========================
+# 🔹 Sequência de códigos de barras internos (por empresa)
+# ========================
+class SequenciaCodigoBarras(models.Model):
+    """
+    Último número da sequência de EAN-13 internos (prefixo 2) da empresa.
+
+    Os códigos são reservados incrementando `ultimo` na transação que
+    grava os produtos; o lock da linha serializa cadastro, importação e
+    geração em lote da mesma empresa.
+    """
+
+    id = fields.IntField(pk=True)
+    ultimo = fields.BigIntField(default=0)
+    atualizado_em = fields.DatetimeField(auto_now=True)
+
+    usuario = fields.OneToOneField(
+        'models.Usuario',
+        related_name='sequencia_codigo_barras',
+        on_delete=fields.CASCADE,
+    )
+
+    class Meta:
+        table = 'sequencia_codigo_barras'
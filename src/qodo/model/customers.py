@@ -5,6 +5,7 @@ from zoneinfo import ZoneInfo
 from tortoise import fields, models
 
 from qodo.model.sale import Sales
+from qodo.utils.text_normalize import normalize_text
 
 
 class Customer(models.Model):
@@ -16,6 +17,8 @@ class Customer(models.Model):
 
     # Dados pessoais
     full_name = fields.CharField(max_length=150)
+    # Nome sem acentos/casefold, mantido no save() para buscas por prefixo
+    search_name = fields.CharField(max_length=150, null=True, index=True)
     birth_date = fields.DatetimeField()
     cpf = fields.CharField(max_length=14, unique=True, index=True)
     mother_name = fields.CharField(max_length=150, null=True)
@@ -50,3 +53,15 @@ class Customer(models.Model):
 
     # 🔹 Relacionamento com vendas
     vendas: fields.ReverseRelation['Sales']
+
+    async def save(self, *args, **kwargs):
+        """
+        Sobrescreve save para manter a chave de busca normalizada
+        """
+        self.search_name = normalize_text(self.full_name)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields and 'full_name' in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'search_name']
+
+        await super().save(*args, **kwargs)
@@ -6,6 +6,7 @@ from zoneinfo import ZoneInfo
 from tortoise import fields, models
 
 from qodo.model.product import Produto
+from qodo.utils.text_normalize import normalize_text
 
 
 # ========================
@@ -59,6 +60,9 @@ class Fornecedor(models.Model):
     )
     razao_social = fields.CharField(max_length=200)
     nome_fantasia = fields.CharField(max_length=200, null=True)
+    # Razão social / nome fantasia normalizados, mantidos no save()
+    search_name = fields.CharField(max_length=200, null=True, index=True)
+    search_trade_name = fields.CharField(max_length=200, null=True, index=True)
 
     # REMOVER unique=True ou usar index=True apenas
     cnpj = fields.CharField(
@@ -109,3 +113,22 @@ class Fornecedor(models.Model):
 
     def __str__(self):
         return f'{self.razao_social} ({self.tipo})'
+
+    async def save(self, *args, **kwargs):
+        """
+        Sobrescreve save para manter as chaves de busca normalizadas
+        """
+        self.search_name = normalize_text(self.razao_social)
+        self.search_trade_name = normalize_text(self.nome_fantasia) or None
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields and (
+            'razao_social' in update_fields or 'nome_fantasia' in update_fields
+        ):
+            kwargs['update_fields'] = [
+                *update_fields,
+                'search_name',
+                'search_trade_name',
+            ]
+
+        await super().save(*args, **kwargs)
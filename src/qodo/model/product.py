@@ -6,6 +6,7 @@ from zoneinfo import ZoneInfo
 from tortoise import fields, models
 
 from qodo.model.sale import Sales
+from qodo.utils.text_normalize import normalize_text
 
 
 # ========================
@@ -15,6 +16,10 @@ class Produto(models.Model):
     id = fields.IntField(pk=True)
     product_code = fields.CharField(max_length=50, index=True)
     name = fields.CharField(max_length=150, index=True)
+    # Nome sem acentos/casefold, mantido no save() para buscas por prefixo
+    search_name = fields.CharField(max_length=150, null=True, index=True)
+    # Versão do catálogo da empresa na última alteração (delta-sync)
+    catalog_version = fields.BigIntField(default=0)
     stock = fields.IntField(default=0)
     stoke_min = fields.IntField(default=0)
     stoke_max = fields.IntField(default=0)
@@ -26,6 +31,8 @@ class Produto(models.Model):
     supplier = fields.CharField(max_length=150, null=True)
     lot_bar_code = fields.CharField(max_length=100, null=True)
     image_url = fields.CharField(max_length=255, null=True)
+    # SHA-256 da imagem no armazenamento por conteúdo (image_pipeline)
+    image_hash = fields.CharField(max_length=64, null=True, index=True)
 
     # Campos extras
     product_type = fields.CharField(max_length=100, null=True)
@@ -60,6 +67,24 @@ class Produto(models.Model):
 
     vendas: fields.ReverseRelation['Sales']
 
+    class Meta:
+        indexes = [
+            ('usuario_id', 'catalog_version'),
+            ('usuario_id', 'date_expired'),
+        ]
+
+    async def save(self, *args, **kwargs):
+        """
+        Sobrescreve save para manter a chave de busca normalizada
+        """
+        self.search_name = normalize_text(self.name)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields and 'name' in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'search_name']
+
+        await super().save(*args, **kwargs)
+
 
 # ========================
 # 🔹 Produto Arquivado
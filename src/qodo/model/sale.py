@@ -60,3 +60,4 @@ class Sales(models.Model):
     class Meta:
         table = 'sales'
         ordering = ['-criado_em']
+        indexes = [('usuario_id', 'criado_em')]
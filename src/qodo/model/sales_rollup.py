@@ -0,0 +1,70 @@
+# Model do resumo diário de vendas
+from tortoise import fields, models
+
+
+# ========================
+# 🔹 Resumo diário de vendas
+# ========================
+class DailySalesRollup(models.Model):
+    """
+    Totais de vendas por empresa, dia, funcionário e forma de pagamento.
+
+    Atualizado na mesma transação de cada venda, edição e cancelamento
+    (core/sales_rollup.py); os painéis leem estas linhas em vez de somar a
+    tabela de vendas. `funcionario_id` 0 significa venda sem funcionário.
+    """
+
+    id = fields.IntField(pk=True)
+    dia = fields.DateField()
+    funcionario_id = fields.IntField(default=0)
+    payment_method = fields.CharField(max_length=9)
+    # Linhas da tabela sales
+    vendas = fields.IntField(default=0)
+    # Vendas distintas (códigos de venda)
+    vendas_distintas = fields.IntField(default=0)
+    receita = fields.FloatField(default=0.0)
+    custo = fields.FloatField(default=0.0)
+    lucro = fields.FloatField(default=0.0)
+    itens = fields.IntField(default=0)
+    atualizado_em = fields.DatetimeField(auto_now=True)
+
+    usuario = fields.ForeignKeyField(
+        'models.Usuario',
+        related_name='resumo_vendas',
+        on_delete=fields.CASCADE,
+    )
+
+    class Meta:
+        table = 'resumo_vendas_diario'
+        unique_together = (
+            ('usuario_id', 'dia', 'funcionario_id', 'payment_method'),
+        )
+        indexes = [('usuario_id', 'dia')]
+
+
+# ========================
+# 🔹 Controle da reconstrução do resumo
+# ========================
+class SalesRollupState(models.Model):
+    """
+    Estado do resumo de cada empresa.
+
+    A linha também serve de trava: a reconstrução e cada venda/edição
+    travam a linha da empresa (SELECT ... FOR UPDATE), para que nenhuma
+    soma incremental se perca entre a leitura das vendas e a troca das
+    linhas do resumo. `completo` indica que o histórico já foi
+    reconstruído.
+    """
+
+    id = fields.IntField(pk=True)
+    completo = fields.BooleanField(default=False)
+    reconstruido_em = fields.DatetimeField(auto_now=True)
+
+    usuario = fields.OneToOneField(
+        'models.Usuario',
+        related_name='resumo_vendas_estado',
+        on_delete=fields.CASCADE,
+    )
+
+    class Meta:
+        table = 'resumo_vendas_estado'
@@ -0,0 +1,42 @@
+# Model de alertas de estoque
+from tortoise import fields, models
+
+
+# ========================
+# 🔹 Alerta de estoque (produtos que precisam de atenção)
+# ========================
+class AlertaEstoque(models.Model):
+    """
+    Conjunto "precisa de atenção" da empresa.
+
+    Uma linha por produto e tipo de alerta:
+    - `reposicao`: stock <= stoke_min
+    - `validade`: date_expired dentro da janela de aviso (ou vencido)
+
+    Mantido pelos hooks de core/catalog.py a cada movimentação e
+    conciliado por uma varredura diária (core/stock_alerts.py). Guarda uma
+    cópia dos campos exibidos para que as consultas de alerta não precisem
+    tocar a tabela de produtos.
+    """
+
+    id = fields.IntField(pk=True)
+    produto_id = fields.IntField()
+    tipo = fields.CharField(max_length=20)
+    name = fields.CharField(max_length=150)
+    stock = fields.IntField(default=0)
+    stoke_min = fields.IntField(default=0)
+    date_expired = fields.DatetimeField(null=True)
+    price_uni = fields.FloatField(default=0.0)
+    criado_em = fields.DatetimeField(auto_now_add=True)
+    atualizado_em = fields.DatetimeField(auto_now=True)
+
+    usuario = fields.ForeignKeyField(
+        'models.Usuario',
+        related_name='alertas_estoque',
+        on_delete=fields.CASCADE,
+    )
+
+    class Meta:
+        table = 'alertas_estoque'
+        unique_together = (('produto_id', 'tipo'),)
+        indexes = [('usuario_id', 'tipo', 'produto_id')]
@@ -0,0 +1,63 @@
+# Model de entradas de estoque em lote (notas de fornecedor)
+from tortoise import fields, models
+
+
+# ========================
+# 🔹 Entrada de estoque (documento)
+# ========================
+class EntradaEstoque(models.Model):
+    """
+    Recebimento de mercadoria: uma lista enviada pelo painel ou uma NF-e
+    do fornecedor. A chave da NF-e impede que a mesma nota entre duas vezes.
+    """
+
+    id = fields.IntField(pk=True)
+    # 'LISTA' ou 'NFE'
+    origem = fields.CharField(max_length=10)
+    chave_nfe = fields.CharField(max_length=44, null=True)
+    numero_nota = fields.CharField(max_length=20, null=True)
+    fornecedor_nome = fields.CharField(max_length=150, null=True)
+    fornecedor_cnpj = fields.CharField(max_length=20, null=True)
+    total_itens = fields.IntField(default=0)
+    total_linhas = fields.IntField(default=0)
+    valor_total = fields.FloatField(default=0.0)
+    detail = fields.TextField(null=True)
+    criado_em = fields.DatetimeField(auto_now_add=True)
+
+    usuario = fields.ForeignKeyField(
+        'models.Usuario',
+        related_name='entradas_estoque',
+        on_delete=fields.CASCADE,
+    )
+
+    linhas: fields.ReverseRelation['EntradaEstoqueItem']
+
+    class Meta:
+        table = 'entradas_estoque'
+        unique_together = (('usuario_id', 'chave_nfe'),)
+        indexes = [('usuario_id', 'criado_em')]
+
+
+# ========================
+# 🔹 Linha da entrada de estoque
+# ========================
+class EntradaEstoqueItem(models.Model):
+    """Produto recebido em uma entrada (quantidade somada ao estoque)."""
+
+    id = fields.IntField(pk=True)
+    produto_id = fields.IntField()
+    codigo = fields.CharField(max_length=100)
+    descricao = fields.CharField(max_length=150, null=True)
+    quantidade = fields.IntField()
+    custo_unitario = fields.FloatField(null=True)
+    estoque_anterior = fields.IntField()
+
+    entrada = fields.ForeignKeyField(
+        'models.EntradaEstoque',
+        related_name='linhas',
+        on_delete=fields.CASCADE,
+    )
+
+    class Meta:
+        table = 'entradas_estoque_itens'
+        indexes = [('produto_id',)]
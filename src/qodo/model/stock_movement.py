@@ -0,0 +1,67 @@
+# Model do histórico de movimentações de estoque
+from tortoise import fields, models
+
+
+# ========================
+# 🔹 Movimentação de estoque (livro-razão, somente inserção)
+# ========================
+class MovimentoEstoque(models.Model):
+    """
+    Cada alteração de estoque vira uma linha com a quantidade com sinal
+    (+ entrada / - saída). Linhas nunca são alteradas nem apagadas; o
+    produto_id não é FK para que o histórico sobreviva à exclusão do
+    produto.
+    """
+
+    id = fields.BigIntField(pk=True)
+    produto_id = fields.IntField()
+    quantidade = fields.IntField()
+    # VENDA, CARRINHO, CANCELAMENTO, ESTORNO, ENTRADA, SAIDA, AJUSTE
+    tipo = fields.CharField(max_length=20)
+    referencia = fields.CharField(max_length=100, null=True)
+    criado_em = fields.DatetimeField(auto_now_add=True)
+
+    usuario = fields.ForeignKeyField(
+        'models.Usuario',
+        related_name='movimentos_estoque',
+        on_delete=fields.CASCADE,
+    )
+
+    class Meta:
+        table = 'movimentos_estoque'
+        indexes = [('produto_id', 'id'), ('usuario_id', 'id')]
+
+
+# ========================
+# 🔹 Fotografia periódica do estoque
+# ========================
+class SnapshotEstoque(models.Model):
+    """
+    Estoque do produto no momento da fotografia, cobrindo todas as
+    movimentações até `movimento_id`. O estoque em qualquer data é a
+    fotografia anterior mais as movimentações posteriores a ela.
+
+    `divergencia` é a diferença entre o estoque gravado no produto e o
+    calculado pelo histórico (fotografia anterior + movimentações);
+    diferente de zero indica uma alteração feita fora do livro-razão.
+    """
+
+    id = fields.BigIntField(pk=True)
+    produto_id = fields.IntField()
+    estoque = fields.IntField()
+    movimento_id = fields.BigIntField(default=0)
+    divergencia = fields.IntField(default=0)
+    criado_em = fields.DatetimeField(auto_now_add=True)
+
+    usuario = fields.ForeignKeyField(
+        'models.Usuario',
+        related_name='snapshots_estoque',
+        on_delete=fields.CASCADE,
+    )
+
+    class Meta:
+        table = 'snapshots_estoque'
+        indexes = [
+            ('produto_id', 'criado_em'),
+            ('usuario_id', 'movimento_id'),
+        ]
@@ -67,13 +67,17 @@ class RouterManager:
 
         # ===== PRODUTOS =====
         from .products.buscar_prod import buscar_produtos
+        from .products.bulk_import import router as bulk_import
         from .products.cancel_sale import router as cancel_sales
         from .products.create import router as create_products
         from .products.deep_infos import product_deep_infos
+        from .products.events import router as catalog_events
         from .products.delete import router as delete_products
         from .products.list import list_products as list_router
+        from .products.low_stock_product import router as stock_alerts
         from .products.product_information import list_products as product_info
         from .products.sales import router as sales
+        from .products.sync import router as catalog_sync
         from .products.ticket import router as ticket_prods
         from .products.update import router as updates_products
         from .products.upload_img import router as upload_img
@@ -88,10 +92,14 @@ class RouterManager:
         self.routers['produtos'].include_router(list_router)
         self.routers['produtos'].include_router(product_info)
         self.routers['produtos'].include_router(create_products)
+        self.routers['produtos'].include_router(bulk_import)
         self.routers['produtos'].include_router(updates_products)
         self.routers['produtos'].include_router(delete_products)
         self.routers['produtos'].include_router(product_deep_infos)
         self.routers['produtos'].include_router(ticket_prods)
+        self.routers['produtos'].include_router(catalog_sync)
+        self.routers['produtos'].include_router(catalog_events)
+        self.routers['produtos'].include_router(stock_alerts)
 
         # ===== CARRINHO & VENDAS =====
         from .car import cart_router
@@ -118,6 +126,7 @@ class RouterManager:
         self.routers['fornecedor'].include_router(fornecedores_rt)
 
         # ===== DASHBOARD & RELATÓRIOS =====
+        from .analytics import router as analytics
         from .updates import allDatas
         from .user.clientes import router as system_user
 
@@ -128,6 +137,7 @@ class RouterManager:
         )
         self.routers['dashboard'].include_router(allDatas)
         self.routers['dashboard'].include_router(system_user)
+        self.routers['dashboard'].include_router(analytics)
 
         # ===== PAGAMENTOS =====
         from .payments.partial import partial as payment_partial
@@ -166,6 +176,9 @@ class RouterManager:
         self.routers['marketplace'].include_router(marketplace)
 
         # ===== INVENTÁRIO =====
+        # Registra entradas em lote e histórico no router de inventário
+        from .products.inventario import batch_entry  # noqa: F401
+        from .products.inventario import stock_ledger  # noqa: F401
         from .products.inventario.label_generator import (
             inventory_router as label,
         )
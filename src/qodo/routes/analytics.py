@@ -0,0 +1,57 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from fastapi import APIRouter, Depends, Query
+
+from qodo.auth.deps import SystemUser, get_company_id, get_current_user
+from qodo.controllers.report_controller import AnalyticsReports
+
+router = APIRouter(prefix='/analytics')
+
+
+def _reports(
+    current_user: SystemUser,
+    inicio: Optional[date],
+    fim: Optional[date],
+) -> AnalyticsReports:
+    end = fim or datetime.now(ZoneInfo('America/Sao_Paulo')).date()
+    start = inicio or end - timedelta(days=29)
+    return AnalyticsReports(get_company_id(current_user), start, end)
+
+
+@router.get('/comparativo')
+async def period_comparison(
+    inicio: Optional[date] = Query(None, description='Primeiro dia'),
+    fim: Optional[date] = Query(None, description='Último dia'),
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Compara o período (padrão: últimos 30 dias) com o período anterior de
+    mesmo tamanho.
+    """
+    data = await _reports(current_user, inicio, fim).comparison()
+    return {'success': True, 'data': data, 'error': None}
+
+
+@router.get('/mapa-horario')
+async def hourly_heatmap(
+    inicio: Optional[date] = Query(None, description='Primeiro dia'),
+    fim: Optional[date] = Query(None, description='Último dia'),
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """Receita e vendas por dia da semana x hora do dia."""
+    data = await _reports(current_user, inicio, fim).heatmap()
+    return {'success': True, 'data': data, 'error': None}
+
+
+@router.get('/margens')
+async def margin_analysis(
+    inicio: Optional[date] = Query(None, description='Primeiro dia'),
+    fim: Optional[date] = Query(None, description='Último dia'),
+    limit: int = Query(20, ge=1, le=200),
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """Margem por produto: maiores lucros, piores margens e faixas."""
+    data = await _reports(current_user, inicio, fim).margins(limit)
+    return {'success': True, 'data': data, 'error': None}
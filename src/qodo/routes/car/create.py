@@ -37,3 +37,18 @@ async def adicionar_produto(
 
     cart = CartManagerDB(company_id=empresa_id, employee_id=employee_id)
     return await cart.add_produto(product_id=product_id, quantity=quantity)
+
+
+@router.post('/escanear')
+async def escanear_produto(
+    code: str = Body(..., min_length=1),
+    quantity: int = Body(1, gt=0),
+    current_user: SystemEmployees = Depends(get_current_employee),
+):
+    """
+    Adiciona um produto ao carrinho pelo código de barras (leitura do scanner).
+    """
+    cart = CartManagerDB(
+        company_id=current_user.empresa_id, employee_id=current_user.id
+    )
+    return await cart.adicionar_por_codigo(code=code, quantity=quantity)
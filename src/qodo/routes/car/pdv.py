@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from qodo.auth.deps import get_current_user
 from qodo.controllers.sales.separate_payment_methods import (
@@ -10,6 +13,20 @@ router = APIRouter()
 
 
 @router.get('/completedsales')
-async def result_sales(current_user: Usuario = Depends(get_current_user)):
+async def result_sales(
+    inicio: Optional[date] = Query(None, description='Primeiro dia'),
+    fim: Optional[date] = Query(None, description='Último dia'),
+    caixa_id: Optional[int] = Query(None),
+    funcionario_id: Optional[int] = Query(None),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Totais de vendas por forma de pagamento no período e vendas do dia."""
+    if inicio and fim and inicio > fim:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='A data inicial deve ser anterior à final.',
+        )
 
-    return await separating_sales_by_payments(current_user.empresa_id)
+    return await separating_sales_by_payments(
+        current_user.empresa_id, inicio, fim, caixa_id, funcionario_id
+    )
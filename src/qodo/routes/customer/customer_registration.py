@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
@@ -12,6 +12,7 @@ from qodo.schemas.customers.schema_customers import (
     SchemasCustomer,
     SchemasCustomerCreditUpdate,
 )
+from qodo.utils.text_normalize import normalize_text
 
 customers = APIRouter(tags=['Customers'])
 
@@ -81,7 +82,12 @@ async def create_customer(
 
 
 @customers.get('/list-customer', response_model=List[GetCustomers])
-async def list_customer(current_user: SystemUser = Depends(get_current_user)):
+async def list_customer(
+    busca: Optional[str] = Query(
+        None, description='Início do nome do cliente (sem diferenciar acentos)'
+    ),
+    current_user: SystemUser = Depends(get_current_user),
+):
     """
     Lista clientes do usuário atual.
     CORREÇÃO: Cada usuário (admin ou funcionário) deve ver apenas SEUS PRÓPRIOS clientes
@@ -89,10 +95,13 @@ async def list_customer(current_user: SystemUser = Depends(get_current_user)):
     try:
 
         # CORREÇÃO: Sempre busca clientes do usuário atual, independente de ser admin ou funcionário
+        query = Customer.filter(usuario_id=current_user.empresa_id)
+
+        # Busca por prefixo na chave normalizada (usa o índice de search_name)
+        if busca:
+            query = query.filter(search_name__startswith=normalize_text(busca))
 
-        clients = await Customer.filter(
-            usuario_id=current_user.empresa_id
-        ).all()
+        clients = await query.all()
 
         return clients
 
@@ -1,8 +1,10 @@
 import json
 from datetime import datetime
+from typing import Optional
 from zoneinfo import ZoneInfo
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from tortoise.expressions import Q
 from tortoise.functions import Count
 from tortoise.transactions import in_transaction
 
@@ -16,6 +18,7 @@ from qodo.schemas.fornecedor.schemas_fornecedor import (
     SupplierSummary,
 )
 from qodo.schemas.fornecedor.update_spplierBase import SupplierUpdate
+from qodo.utils.text_normalize import normalize_text
 
 router = APIRouter()
 
@@ -137,17 +140,22 @@ async def list_fornecedores(
     current_user: Usuario = Depends(get_current_user),
     page: int = 1,
     size: int = 20,
+    busca: Optional[str] = None,
 ):
     try:
         offset = (page - 1) * size
-        fornecedores = (
-            await Fornecedor.filter(usuario_id=current_user.id)
-            .offset(offset)
-            .limit(size)
-        )
-        total_count = await Fornecedor.filter(
-            usuario_id=current_user.id
-        ).count()
+        query = Fornecedor.filter(usuario_id=current_user.id)
+
+        # Busca por prefixo na razão social ou no nome fantasia normalizados
+        if busca:
+            prefix = normalize_text(busca)
+            query = query.filter(
+                Q(search_name__startswith=prefix)
+                | Q(search_trade_name__startswith=prefix)
+            )
+
+        fornecedores = await query.offset(offset).limit(size)
+        total_count = await query.count()
 
         data = []
         for f in fornecedores:
@@ -35,3 +35,32 @@ async def deep_search_of_products(
         target_company=target_company,
     )
     return await deep_search.result()
+
+
+@marketplace.get('/buscar')
+async def search_marketplace(
+    q: str = Query(..., min_length=1),
+    empresa: Optional[str] = None,
+    pagina: int = Query(1, ge=1),
+    por_pagina: int = Query(20, ge=1, le=100),
+    disponiveis: bool = False,
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Busca ranqueada e paginada de produtos entre as empresas cadastradas.
+
+    Usa o índice do marketplace em memória (atualizado periodicamente),
+    sem varrer a tabela de produtos a cada requisição.
+    """
+    search = CustomerMarketplace(
+        user_id=current_user.id,
+        product_name=q,
+        target_company=empresa,
+    )
+    try:
+        results = await search.page(
+            page=pagina, page_size=por_pagina, only_available=disponiveis
+        )
+        return {'success': True, 'data': results, 'error': None}
+    except Exception as e:
+        return {'success': False, 'data': None, 'error': str(e)}
@@ -0,0 +1,81 @@
+import os
+import tempfile
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+
+from qodo.auth.deps import SystemUser, get_current_user
+from qodo.controllers.products.bulk_import import import_jobs
+
+router = APIRouter()
+
+ALLOWED_EXTENSIONS = {'.csv', '.txt', '.xlsx', '.xlsm'}
+
+# Tamanho máximo do arquivo de importação (bytes)
+MAX_IMPORT_BYTES = int(os.getenv('IMPORT_MAX_BYTES', str(200 * 1024 * 1024)))
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@router.post('/importar', status_code=status.HTTP_202_ACCEPTED)
+async def import_products(
+    file: UploadFile = File(...),
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Importa produtos de um CSV ou XLSX em segundo plano.
+
+    Produtos com o mesmo `product_code` da empresa são atualizados (apenas
+    as colunas presentes no arquivo); os demais são criados. Acompanhe o
+    progresso em GET /importar/{job_id}.
+    """
+    if not current_user.empresa_id:
+        raise HTTPException(status_code=400, detail='Usuário inválido')
+
+    suffix = Path(file.filename or '').suffix.lower()
+    if suffix not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail='Formato não suportado (use .csv ou .xlsx)',
+        )
+
+    # Copia o upload para disco em blocos: memória constante
+    fd, path = tempfile.mkstemp(prefix='qodo_import_', suffix=suffix)
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as buffer:
+            while chunk := await file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_IMPORT_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail='Arquivo maior que o limite de importação',
+                    )
+                buffer.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    job = import_jobs.start(current_user.empresa_id, path, file.filename)
+    return {
+        'success': True,
+        'data': {'job_id': job.id, 'status': job.status},
+        'error': None,
+    }
+
+
+@router.get('/importar/{job_id}', status_code=200)
+async def import_progress(
+    job_id: str,
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Progresso da importação: linhas processadas, criados, atualizados e
+    erros por linha.
+    """
+    job = await import_jobs.get(job_id, current_user.empresa_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404, detail='Importação não encontrada'
+        )
+    return {'success': True, 'data': job, 'error': None}
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, Query
 from fastapi.encoders import jsonable_encoder
 
 from qodo.auth.deps import get_current_user
+from qodo.core.search_index import product_index
 from qodo.model.user import Usuario
 from qodo.utils.get_produtos_user import get_product_by_user
 
@@ -46,3 +47,30 @@ async def get_product(
             'data': None,
             'error': f'Erro inesperado: {str(e)}',
         }
+
+
+@buscar_produtos.get('/pesquisar', status_code=200)
+async def search_products(
+    q: str = Query(
+        ..., min_length=1, description='Nome, código, código de barras ou grupo'
+    ),
+    limite: int = Query(20, ge=1, le=100),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Busca ranqueada (prefixo, substring e aproximada) no índice em memória da empresa"""
+    try:
+        results = await product_index.search(
+            current_user.empresa_id, q, limit=limite
+        )
+        return {
+            'success': True,
+            'data': jsonable_encoder(results),
+            'error': None,
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'data': None,
+            'error': f'Erro inesperado: {str(e)}',
+        }
@@ -3,9 +3,14 @@ from zoneinfo import ZoneInfo
 
 from fastapi import APIRouter, Body, Depends, HTTPException, status
 from pydantic import BaseModel
-from tortoise.expressions import Q
+from tortoise.expressions import F, Q
+from tortoise.transactions import in_transaction
 
 from qodo.auth.deps import get_current_user
+from qodo.core.cache_tags import TAG_SALES, tagged_cache
+from qodo.core.catalog import stamp, stock_changed
+from qodo.core.sales_rollup import sales_rollup
+from qodo.core.stock_ledger import CANCEL, stock_ledger
 from qodo.model.product import Produto
 from qodo.model.sale import Sales
 from qodo.model.user import Usuario
@@ -76,31 +81,63 @@ async def cancel_sale(
             f'✅ Produto encontrado: {product.name}, Estoque atual: {product.stock}'
         )
 
-        # 🔹 CORREÇÃO: Restaura o estoque
+        # Estoque, histórico, resumo diário e a venda: uma transação
         quantidade_restaurada = sale.quantity
-        product.stock += quantidade_restaurada
-        product.atualizado_em = datetime.now(ZoneInfo('America/Sao_Paulo'))
-        await product.save()
+        async with in_transaction() as connection:
+            # 🔹 CORREÇÃO: Restaura o estoque no próprio UPDATE (sem
+            # sobrescrever vendas/entradas feitas desde a leitura)
+            await Produto.filter(id=product.id).using_db(connection).update(
+                stock=F('stock') + quantidade_restaurada,
+                atualizado_em=datetime.now(ZoneInfo('America/Sao_Paulo')),
+            )
+            product.stock = (
+                await Produto.filter(id=product.id)
+                .using_db(connection)
+                .first()
+                .values_list('stock', flat=True)
+            )
+            await stock_ledger.record(
+                current_user.id,
+                {product.id: quantidade_restaurada},
+                CANCEL,
+                reference=body.code,
+                using_db=connection,
+            )
 
-        print(
-            f'📦 Estoque restaurado: +{quantidade_restaurada} unidades. Novo estoque: {product.stock}'
-        )
+            print(
+                f'📦 Estoque restaurado: +{quantidade_restaurada} unidades. Novo estoque: {product.stock}'
+            )
+
+            await sales_rollup.remove_sale(sale)
 
-        # 🔹 CORREÇÃO: Marcar a venda como cancelada em vez de deletar
-        # (Mantenha o registro para auditoria)
-        # Primeiro verifica se o campo existe, se não, apenas deleta
-        if hasattr(Sales, 'cancelada'):
-            sale.cancelada = True
-            sale.motivo_cancelamento = body.reason
-            sale.data_cancelamento = datetime.now(
-                ZoneInfo('America/Sao_Paulo')
+            # 🔹 CORREÇÃO: Marcar a venda como cancelada em vez de deletar
+            # (Mantenha o registro para auditoria)
+            # Primeiro verifica se o campo existe, se não, apenas deleta
+            if hasattr(Sales, 'cancelada'):
+                sale.cancelada = True
+                sale.motivo_cancelamento = body.reason
+                sale.data_cancelamento = datetime.now(
+                    ZoneInfo('America/Sao_Paulo')
+                )
+                await sale.save(using_db=connection)
+                print(f'✅ Venda marcada como cancelada: {sale.id}')
+            else:
+                # Se não tem campo de cancelamento, deleta a venda
+                await sale.delete(using_db=connection)
+                print(f'✅ Venda deletada: {sale.id}')
+
+            version = await stamp(
+                current_user.id, changed=(product.id,), using_db=connection
             )
-            await sale.save()
-            print(f'✅ Venda marcada como cancelada: {sale.id}')
-        else:
-            # Se não tem campo de cancelamento, deleta a venda
-            await sale.delete()
-            print(f'✅ Venda deletada: {sale.id}')
+
+        # Cache e eventos só depois do commit
+        await tagged_cache.bump(current_user.id, TAG_SALES)
+        await stock_changed(
+            current_user.id,
+            product.id,
+            deltas={product.id: quantidade_restaurada},
+            version=version,
+        )
 
         return {
             'success': True,
@@ -3,15 +3,17 @@ from datetime import datetime
 
 from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, HTTPException, status
+from tortoise.transactions import in_transaction
 
 from qodo.auth.deps import SystemUser, get_current_user
+from qodo.core.catalog import product_changed, stamp
 from qodo.model.product import Produto
 from qodo.model.user import Usuario
 from qodo.schemas.schema_product import ProductRegisterSchema
 from qodo.utils.load_images import load_imgs
 from qodo.utils.sales_code_generator import (
     gerar_codigo_venda,
-    lot_bar_code_size,
+    reserve_internal_eans,
 )
 
 load_dotenv()
@@ -40,40 +42,49 @@ async def create_product(
         product_code = (
             prod.product_code if prod.product_code else gerar_codigo_venda()
         )
-        barcode = (
-            prod.lot_bar_code if prod.lot_bar_code else lot_bar_code_size()
-        )
-
-        # Criar produto
-        register_prod = await Produto.create(
-            product_code=product_code,
-            name=prod.name,
-            stock=prod.stock,
-            stoke_min=prod.stoke_min,
-            stoke_max=prod.stoke_max,
-            date_expired=date_expired,
-            fabricator=prod.fabricator,
-            cost_price=prod.cost_price,
-            price_uni=prod.price_uni,
-            sale_price=prod.sale_price,
-            supplier=prod.supplier,
-            lot_bar_code=barcode,
-            image_url=image_url,
-            usuario_id=current_user.empresa_id,
-            product_type=prod.product_type,
-            active=prod.active,
-            group=prod.group,
-            sub_group=prod.sub_group,
-            sector=prod.sector,
-            ticket=prod.ticket,
-            unit=prod.unit,
-            controllstoke=prod.controllstoke,
-            sales_config=(
-                prod.sales_config.model_dump_json()
-                if prod.sales_config
-                else None
-            ),
-        )
+        # Criar produto (com o código de barras interno e a versão do
+        # catálogo na mesma transação)
+        async with in_transaction() as connection:
+            barcode = prod.lot_bar_code
+            if not barcode:
+                (barcode,) = await reserve_internal_eans(
+                    current_user.empresa_id, using_db=connection
+                )
+            register_prod = await Produto.create(
+                product_code=product_code,
+                name=prod.name,
+                stock=prod.stock,
+                stoke_min=prod.stoke_min,
+                stoke_max=prod.stoke_max,
+                date_expired=date_expired,
+                fabricator=prod.fabricator,
+                cost_price=prod.cost_price,
+                price_uni=prod.price_uni,
+                sale_price=prod.sale_price,
+                supplier=prod.supplier,
+                lot_bar_code=barcode,
+                image_url=image_url,
+                usuario_id=current_user.empresa_id,
+                product_type=prod.product_type,
+                active=prod.active,
+                group=prod.group,
+                sub_group=prod.sub_group,
+                sector=prod.sector,
+                ticket=prod.ticket,
+                unit=prod.unit,
+                controllstoke=prod.controllstoke,
+                sales_config=(
+                    prod.sales_config.model_dump_json()
+                    if prod.sales_config
+                    else None
+                ),
+                using_db=connection,
+            )
+            version = await stamp(
+                current_user.empresa_id,
+                changed=(register_prod.id,),
+                using_db=connection,
+            )
 
         # CORREÇÃO: Verificar se o produto precisa de imagem padrão
         if not image_url:
@@ -90,6 +101,16 @@ async def create_product(
             except Exception as img_error:
                 print(f'Erro ao adicionar imagem padrão: {img_error}')
                 # Não levantar exceção aqui para não interromper o cadastro
+            else:
+                await register_prod.refresh_from_db(
+                    fields=['image_url', 'image_hash']
+                )
+
+        # Mantém índice de busca, mapa de códigos e manifesto de imagens
+        # atualizados (depois da imagem padrão)
+        await product_changed(
+            current_user.empresa_id, register_prod, version=version
+        )
 
         return {
             'message': 'Produto cadastrado com sucesso!',
@@ -1,8 +1,10 @@
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from tortoise.transactions import in_transaction
 
 from qodo.auth.deps import get_current_user
+from qodo.core.catalog import product_removed, stamp
 from qodo.model.product import Produto, ProdutoArquivado
 from qodo.model.user import Usuario
 from qodo.routes.products.helpers import to_dict
@@ -35,13 +37,18 @@ async def delete_product(
     product_data.pop('id', None)
     product_data.pop('criado_em', None)
     product_data.pop('atualizado_em', None)
-
-    # 🔹 Cria o ProdutoArquivado
-    archived_product = ProdutoArquivado(**product_data)
-    await archived_product.save()
-
-    # 🔹 Remove o produto original
-    await product.delete()
+    product_data.pop('search_name', None)
+    product_data.pop('catalog_version', None)
+
+    async with in_transaction():
+        # 🔹 Cria o ProdutoArquivado
+        archived_product = ProdutoArquivado(**product_data)
+        await archived_product.save()
+
+        # 🔹 Remove o produto original
+        await product.delete()
+        version = await stamp(current_user.id, removed=(product.id,))
+    await product_removed(current_user.id, product.id, version=version)
 
     return {
         'message': f"Produto '{product.name}' removido e arquivado com sucesso!",
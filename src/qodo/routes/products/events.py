@@ -0,0 +1,123 @@
+from typing import Literal, Optional
+
+import orjson
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
+
+from qodo.auth.deps import get_current_user
+from qodo.auth.deps_employes import get_current_employee
+from qodo.core.events import event_bus, next_event
+from qodo.logs.infos import LOGGER
+
+router = APIRouter()
+
+Perfil = Literal['funcionario', 'usuario']
+
+
+def _bearer(authorization: Optional[str]) -> Optional[str]:
+    if authorization and authorization.lower().startswith('bearer '):
+        return authorization[7:].strip()
+    return None
+
+
+async def _company_id(token: Optional[str], perfil: Perfil) -> int:
+    """
+    Valida o token (query `token` ou header Authorization) e retorna a
+    empresa. EventSource e WebSocket do navegador não enviam headers, por
+    isso o token também é aceito na query.
+    """
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Token não informado.',
+        )
+
+    if perfil == 'funcionario':
+        employee = await get_current_employee(token)
+        return employee.empresa_id
+
+    user = await get_current_user(token)
+    if not user.empresa_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='Usuário sem empresa vinculada.',
+        )
+    return user.empresa_id
+
+
+@router.websocket('/eventos/ws')
+async def catalog_events_ws(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+    perfil: Perfil = Query('funcionario'),
+):
+    """
+    Canal WebSocket com as alterações de preço/estoque da empresa.
+
+    Mensagens: `product.updated`, `product.removed`, `stock.changed`,
+    `resync` (o cliente ficou para trás: chame /changes) e `ping`.
+    """
+    try:
+        company_id = await _company_id(
+            token or _bearer(websocket.headers.get('authorization')), perfil
+        )
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        LOGGER.info(f'Conexão de eventos recusada: {e.detail}')
+        return
+
+    await websocket.accept()
+    try:
+        async with event_bus.subscribe(company_id) as queue:
+            while True:
+                event = await next_event(queue)
+                await websocket.send_bytes(orjson.dumps(event, default=str))
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        LOGGER.warning(f'Conexão de eventos encerrada: {e}')
+
+
+@router.get('/eventos', status_code=200)
+async def catalog_events_sse(
+    request: Request,
+    token: Optional[str] = Query(None),
+    perfil: Perfil = Query('funcionario'),
+):
+    """
+    Mesmo canal via Server-Sent Events, para clientes sem WebSocket.
+    """
+    company_id = await _company_id(
+        token or _bearer(request.headers.get('authorization')), perfil
+    )
+
+    async def stream():
+        async with event_bus.subscribe(company_id) as queue:
+            # Sugere ao EventSource reconectar em 3s se a conexão cair
+            yield b'retry: 3000\n\n'
+            while not await request.is_disconnected():
+                event = await next_event(queue)
+                if event['type'] == 'ping':
+                    yield b': ping\n\n'
+                    continue
+                yield (
+                    b'event: '
+                    + event['type'].encode()
+                    + b'\ndata: '
+                    + orjson.dumps(event, default=str)
+                    + b'\n\n'
+                )
+
+    return StreamingResponse(
+        stream(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
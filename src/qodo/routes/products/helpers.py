@@ -4,6 +4,7 @@ from typing import Optional
 from qodo.model.customers import Customer
 from qodo.model.product import Produto
 from qodo.model.user import Usuario
+from qodo.utils.text_normalize import normalize_text
 
 
 def to_dict(model) -> dict:
@@ -48,7 +49,9 @@ async def get_customers(
     query = Customer.filter(usuario_id=user_id)
 
     if customer_name:
-        query = query.filter(full_name__icontains=customer_name)
+        query = query.filter(
+            search_name__startswith=normalize_text(customer_name)
+        )
     if cpf:
         cpf_clean = re.sub(r'\D', '', cpf)
         query = query.filter(cpf__contains=cpf_clean)
@@ -0,0 +1,74 @@
+# Arquivo: src/routes/products/inventario/batch_entry.py
+
+from typing import Optional
+
+from fastapi import Depends, File, Form, HTTPException, UploadFile, status
+
+from qodo.auth.deps import SystemUser, get_company_id, get_current_user
+from qodo.controllers.products.inventario.batch_entry import (
+    BatchStockEntry,
+    document_from_list,
+    document_from_nfe,
+)
+from qodo.routes.products.inventario.stock_entry_controller import (
+    inventory_router,
+)
+from qodo.schemas.schema_product import StockEntryBatchSchema
+
+# Tamanho máximo do XML da NF-e (bytes)
+MAX_NFE_BYTES = 5 * 1024 * 1024
+
+
+@inventory_router.post('/entrada-lote', status_code=status.HTTP_200_OK)
+async def batch_stock_entry(
+    payload: StockEntryBatchSchema,
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Entrada de estoque de vários produtos em uma requisição.
+
+    Os itens são identificados pelo `product_code` ou código de barras.
+    Sem `allow_partial`, um código desconhecido cancela a entrada inteira.
+    """
+    document = document_from_list(
+        [item.model_dump() for item in payload.items], payload.detail
+    )
+    result = await BatchStockEntry(
+        company_id=get_company_id(current_user),
+        document=document,
+        allow_partial=payload.allow_partial,
+        update_cost=payload.update_cost,
+    ).apply()
+    return {'success': True, 'data': result, 'error': None}
+
+
+@inventory_router.post('/entrada-nfe', status_code=status.HTTP_200_OK)
+async def nfe_stock_entry(
+    file: UploadFile = File(..., description='XML da NF-e do fornecedor'),
+    detail: Optional[str] = Form(None),
+    allow_partial: bool = Form(False),
+    update_cost: bool = Form(False),
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Entrada de estoque a partir do XML da NF-e do fornecedor.
+
+    Cada item é procurado pelo EAN (cEAN); itens sem EAN, fracionados ou
+    em embalagem (CX, FD...) voltam em `nao_encontrados` e, sem
+    `allow_partial`, cancelam a entrada. A mesma nota não pode ser lançada
+    duas vezes.
+    """
+    xml = await file.read(MAX_NFE_BYTES + 1)
+    if len(xml) > MAX_NFE_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail='Arquivo da NF-e maior que o limite permitido',
+        )
+
+    result = await BatchStockEntry(
+        company_id=get_company_id(current_user),
+        document=document_from_nfe(xml, detail),
+        allow_partial=allow_partial,
+        update_cost=update_cost,
+    ).apply()
+    return {'success': True, 'data': result, 'error': None}
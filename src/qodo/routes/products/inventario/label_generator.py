@@ -3,12 +3,19 @@
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
-from qodo.auth.deps import SystemUser, get_current_user
+from qodo.auth.deps import SystemUser, get_company_id, get_current_user
 from qodo.controllers.products.inventario.generetor_label import LabelGenerator
+from qodo.controllers.products.inventario.label_sheet import (
+    LabelSheet,
+    iter_file,
+)
 from qodo.routes.products.inventario.stock_entry_controller import (
     inventory_router,
 )
+from qodo.schemas.schema_product import LabelBatchSchema
+from qodo.utils.sales_code_generator import barcode_generator
 
 
 # Usando o router de inventário já definido para o endpoint
@@ -25,11 +32,7 @@ async def create_label(
     """
     try:
         # Define o ID da empresa. Se for funcionário, usa empresa_id; se for dono, usa o próprio ID.
-        company_id = (
-            current_user.empresa_id
-            if current_user.empresa_id
-            else current_user.id
-        )
+        company_id = get_company_id(current_user)
 
         # 1. Instancia o gerador de rótulos com os dados necessários
         label_gen = LabelGenerator(
@@ -58,3 +61,49 @@ async def create_label(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f'Erro interno ao processar a geração de rótulo: {str(e)}',
         )
+
+
+@inventory_router.post('/gerar-codigos-barras', status_code=status.HTTP_200_OK)
+async def generate_barcodes(
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Gera EAN-13 para todos os produtos da empresa sem código de barras e
+    retorna o catálogo ordenado pelo código.
+    """
+    company_id = get_company_id(current_user)
+    products = await barcode_generator(company_id)
+    return {'success': True, 'data': products, 'error': None}
+
+
+@inventory_router.post('/etiquetas/lote', status_code=status.HTTP_200_OK)
+async def batch_labels(
+    payload: LabelBatchSchema,
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Gera um PDF com as etiquetas (preço e código de barras) dos produtos
+    filtrados por ids, grupo e/ou versão do catálogo.
+
+    Guarde o cabeçalho `X-Catalog-Version` e envie-o em `since_version`
+    na próxima remarcação para imprimir apenas os produtos alterados.
+    """
+    company_id = get_company_id(current_user)
+    sheet = await LabelSheet(
+        company_id=company_id,
+        product_ids=payload.product_ids,
+        group=payload.group,
+        since_version=payload.since_version,
+        layout=payload.layout,
+        copies=payload.copies,
+    ).render()
+
+    return StreamingResponse(
+        iter_file(sheet['path']),
+        media_type='application/pdf',
+        headers={
+            'Content-Disposition': 'inline; filename="etiquetas.pdf"',
+            'X-Labels': str(sheet['labels']),
+            'X-Catalog-Version': str(sheet['version']),
+        },
+    )
@@ -2,7 +2,7 @@ from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from qodo.auth.deps import SystemUser, get_current_user
+from qodo.auth.deps import SystemUser, get_company_id, get_current_user
 from qodo.controllers.products.inventario.stoke_entry import EntryProducts
 
 # Renomeando o router para seguir a convenção de PEP 8 (snake_case)
@@ -35,11 +35,7 @@ async def generate_product_entry(
     try:
         # Define o ID da empresa. Se for funcionário, usa empresa_id; se for dono, usa o próprio ID.
         # company_id é a única forma de obter o usuário dono da venda, ou seja, o id da empresa.
-        company_id = (
-            current_user.empresa_id
-            if current_user.empresa_id
-            else current_user.id
-        )
+        company_id = get_company_id(current_user)
 
         # 1. Validação de campos na rota (A validação de "pelo menos um deve ser fornecido"
         #    será feita dentro de EntryProducts.check_fields(), mas podemos adicionar um
@@ -4,7 +4,7 @@ from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from qodo.auth.deps import SystemUser, get_current_user
+from qodo.auth.deps import SystemUser, get_company_id, get_current_user
 
 # 💡 Importação da classe de controle de saída de estoque
 from qodo.controllers.products.inventario.stoke_exit import StockExit
@@ -41,11 +41,7 @@ async def stock_exit_products(
     """
     try:
         # Define o ID da empresa
-        company_id = (
-            current_user.empresa_id
-            if current_user.empresa_id
-            else current_user.id
-        )
+        company_id = get_company_id(current_user)
 
         # 1. Instancia a classe de controle
         stock_exit = StockExit(
@@ -0,0 +1,61 @@
+# Arquivo: src/routes/products/inventario/stock_ledger.py
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, status
+
+from qodo.auth.deps import SystemUser, get_company_id, get_current_user
+from qodo.core.stock_ledger import stock_ledger
+from qodo.routes.products.inventario.stock_entry_controller import (
+    inventory_router,
+)
+
+
+
+@inventory_router.get(
+    '/movimentos/{product_id}', status_code=status.HTTP_200_OK
+)
+async def stock_movements(
+    product_id: int,
+    cursor: Optional[int] = Query(
+        None, description='next_cursor da página anterior'
+    ),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """Histórico de movimentações do produto (mais recentes primeiro)."""
+    data = await stock_ledger.history(
+        get_company_id(current_user), product_id, cursor, limit
+    )
+    return {'success': True, 'data': data, 'error': None}
+
+
+@inventory_router.get(
+    '/estoque-em/{product_id}', status_code=status.HTTP_200_OK
+)
+async def stock_as_of(
+    product_id: int,
+    data: datetime = Query(..., description='Data/hora da consulta'),
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """Estoque do produto em uma data (fotografia + movimentações)."""
+    result = await stock_ledger.as_of(
+        get_company_id(current_user), product_id, data
+    )
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Produto sem histórico de estoque.',
+        )
+    return {'success': True, 'data': result, 'error': None}
+
+
+@inventory_router.get('/divergencias', status_code=status.HTTP_200_OK)
+async def stock_divergences(
+    limit: int = Query(100, ge=1, le=500),
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """Produtos cujo saldo não bateu com o histórico nas fotografias."""
+    data = await stock_ledger.divergences(get_company_id(current_user), limit)
+    return {'success': True, 'data': data, 'error': None}
@@ -1,16 +1,29 @@
 import json
 from datetime import datetime
-from typing import List, Union
-
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional, Union
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
 from fastapi.encoders import jsonable_encoder
 from tortoise.exceptions import DoesNotExist
 
 from qodo.auth.deps import SystemUser, get_current_user
 from qodo.auth.deps_employes import SystemEmployees, get_current_employee
-from qodo.core.cache import client
+from qodo.controllers.products.product_listing import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    count_products,
+    list_products_page,
+)
+from qodo.core.cache_tags import TAG_PRODUCTS
+from qodo.core.etag import check_etag
 from qodo.model.employee import Employees
-from qodo.model.product import Produto
 from qodo.model.user import Usuario
 from qodo.utils.user_or_functional import i_request
 
@@ -20,11 +33,24 @@ list_products = APIRouter()
 @list_products.get('/list', status_code=200)
 @i_request
 async def list_all_products(
+    request: Request,
+    response: Response,
+    cursor: Optional[int] = Query(
+        None, ge=0, description='Último id recebido'
+    ),
+    limite: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(
+        None, description="Campos separados por vírgula ou 'all'"
+    ),
+    group: Optional[str] = None,
+    sector: Optional[str] = None,
+    active: Optional[bool] = None,
+    estoque_baixo: bool = False,
     current_user: SystemUser = Depends(get_current_user),
 ):
     """
-    Lista todos os produtos do usuário ou do funcionário vinculado à empresa.
-    O decorador @i_request já cuida do cache automaticamente.
+    Lista os produtos da empresa em páginas (cursor = último id recebido).
+    Use `next_cursor` da resposta para buscar a próxima página.
     """
     try:
         if not current_user.empresa_id:
@@ -34,21 +60,38 @@ async def list_all_products(
                 'error': 'Usuário sem empresa vinculada.',
             }
 
-        # Se chegou aqui, é porque o decorador não encontrou cache
-        # e não encontrou produtos no banco, então executa a lógica original
-        usuario_id = current_user.empresa_id
-
-        # Busca produtos no banco
-        products = await Produto.filter(usuario_id=usuario_id).all()
-        products_data = jsonable_encoder(products)
+        not_modified = await check_etag(
+            request,
+            response,
+            current_user.empresa_id,
+            f'etag:{request.url.path}?{request.url.query}',
+            TAG_PRODUCTS,
+        )
+        if not_modified:
+            return not_modified
+
+        page = await list_products_page(
+            current_user.empresa_id,
+            cursor=cursor,
+            limit=limite,
+            fields=fields,
+            group=group,
+            sector=sector,
+            active=active,
+            low_stock=estoque_baixo,
+        )
 
         return {
             'success': True,
-            'data': products_data,
+            'data': jsonable_encoder(page['items']),
             'error': None,
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more'],
             'source': 'database',
         }  # Para debug
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f'[ERROR] {str(e)}')
         return {
@@ -61,17 +104,37 @@ async def list_all_products(
 @list_products.get('/funcionario/list', status_code=200)
 @i_request
 async def list_products_for_employee(
+    request: Request,
+    response: Response,
+    cursor: Optional[int] = Query(
+        None, ge=0, description='Último id recebido'
+    ),
+    limite: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(
+        None, description="Campos separados por vírgula ou 'all'"
+    ),
+    group: Optional[str] = None,
+    sector: Optional[str] = None,
+    active: Optional[bool] = None,
+    estoque_baixo: bool = False,
     current_employee: SystemEmployees = Depends(get_current_employee),
 ):
     """
-    Lista todos os produtos da empresa do funcionário.
+    Lista os produtos da empresa do funcionário em páginas.
     O funcionário está autenticado e buscamos os produtos da empresa dele.
     """
     try:
-        # O funcionário já está autenticado via get_current_employee
-        # Precisamos buscar o usuario_id (empresa) do funcionário
+        not_modified = await check_etag(
+            request,
+            response,
+            current_employee.empresa_id,
+            f'etag:{request.url.path}?{request.url.query}',
+            TAG_PRODUCTS,
+        )
+        if not_modified:
+            return not_modified
 
-        # Busca o funcionário com relacionamento para pegar o usuario_id
+        # Busca o funcionário com relacionamento para pegar o nome da empresa
         employee = (
             await Employees.filter(id=current_employee.id)
             .select_related('usuario')
@@ -83,33 +146,35 @@ async def list_products_for_employee(
                 status_code=404, detail='Funcionário não encontrado'
             )
 
-        if not employee:
-            return {
-                'success': False,
-                'data': None,
-                'error': 'Funcionário não vinculado a uma empresa.',
-            }
-
-        # O decorador @i_request vai automaticamente:
-        # 1. Buscar no cache usando o usuario_id
-        # 2. Se não tiver cache, buscar no banco
-        # 3. Retornar os dados
-
-        # Se chegou aqui, é porque o decorador não encontrou cache
-        # e não encontrou produtos no banco, então executa a lógica original
-        usuario_id = current_employee.empresa_id
-
-        # Busca produtos no banco da empresa do funcionário
-        products = await Produto.filter(usuario_id=usuario_id).all()
-        products_data = jsonable_encoder(products)
+        page = await list_products_page(
+            current_employee.empresa_id,
+            cursor=cursor,
+            limit=limite,
+            fields=fields,
+            group=group,
+            sector=sector,
+            active=active,
+            low_stock=estoque_baixo,
+        )
+        products_data = jsonable_encoder(page['items'])
+        # Total de produtos com os filtros, não só os desta página
+        total = await count_products(
+            current_employee.empresa_id,
+            group=group,
+            sector=sector,
+            active=active,
+            low_stock=estoque_baixo,
+        )
 
         return {
             'success': True,
             'data': products_data,
             'error': None,
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more'],
             'source': 'database',
             'empresa': employee.usuario.company_name if employee.id else 'N/A',
-            'total_produtos': len(products_data),
+            'total_produtos': total,
         }
 
     except HTTPException:
@@ -0,0 +1,66 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from qodo.auth.deps import SystemUser, get_current_user
+from qodo.controllers.stoke.stoke_control import gerar_relatorio_completo
+from qodo.core.stock_alerts import stock_alerts
+
+router = APIRouter()
+
+MAX_ALERTS_PAGE = 1000
+
+
+@router.get('/alertas', status_code=200)
+async def stock_alerts_list(
+    tipo: Optional[Literal['reposicao', 'validade']] = None,
+    cursor: Optional[int] = Query(
+        None, ge=0, description='next_cursor da página anterior'
+    ),
+    limite: int = Query(200, ge=1, le=MAX_ALERTS_PAGE),
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Produtos que precisam de atenção: reposição (estoque <= mínimo) e
+    validade (vencidos ou vencendo). Novos alertas também chegam pelo
+    canal de eventos (`alert.created`).
+    """
+    try:
+        page = await stock_alerts.page(
+            current_user.empresa_id, tipo, cursor=cursor, limit=limite
+        )
+        return {
+            'success': True,
+            'data': page['items'],
+            'error': None,
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more'],
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        return {
+            'success': False,
+            'data': None,
+            'error': f'Erro inesperado: {str(e)}',
+        }
+
+
+@router.get('/alertas/relatorio', status_code=200)
+async def stock_alerts_report(
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Relatório de reposição e validade com valores em risco.
+    """
+    try:
+        report = await gerar_relatorio_completo(current_user.empresa_id)
+        return {'success': True, 'data': report, 'error': None}
+
+    except Exception as e:
+        return {
+            'success': False,
+            'data': None,
+            'error': f'Erro inesperado: {str(e)}',
+        }
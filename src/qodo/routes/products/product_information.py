@@ -1,10 +1,30 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import Optional
 
-from qodo.auth.deps import get_current_user
-from qodo.controllers.products.monitoring_products import ProductInfo
-from qodo.controllers.sales.sales_controller import (
-    information_about_sales_and_products_and_employees,
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
 )
+
+from qodo.auth.deps import get_company_id, get_current_user
+from qodo.controllers.products.monitoring_products import (
+    MAX_CATEGORY_PAGE,
+    ProductInfo,
+)
+from qodo.controllers.sales.sales_explorer import (
+    MAX_PAGE_SIZE,
+    SalesExplorer,
+)
+from qodo.core.abc_curve import ABC_WINDOWS, abc_curve
+from qodo.core.cache_tags import TAG_PRODUCTS
+from qodo.core.etag import check_etag
+from qodo.model.product import Produto
+from qodo.model.sale import PaymentMethods
 from qodo.schemas.schema_user import SystemUser
 
 list_products = APIRouter(prefix='/products', tags=['Produtos'])
@@ -12,14 +32,42 @@ list_products = APIRouter(prefix='/products', tags=['Produtos'])
 
 @list_products.get('/por-categoria')
 async def products_by_category(
+    request: Request,
+    response: Response,
+    categoria: Optional[str] = Query(
+        None, description='Lista os produtos desta categoria (paginado)'
+    ),
+    cursor: Optional[int] = Query(
+        None, ge=0, description='next_cursor da página anterior'
+    ),
+    limit: int = Query(100, ge=1, le=MAX_CATEGORY_PAGE),
     current_user: SystemUser = Depends(get_current_user),
 ):
     """
-    Retorna todos os produtos do usuário separados por categoria.
+    Retorna os totais de cada categoria (GROUP BY no banco).
+
+    Com `categoria`, `products` traz uma página dos produtos dessa
+    categoria; sem ela, `products` é None (o catálogo não é carregado).
     """
-    product_info = ProductInfo(current_user.id)
-    products = await product_info.get_products_by_category()
-    return {'products': products}
+    company_id = get_company_id(current_user)
+    not_modified = await check_etag(
+        request,
+        response,
+        company_id,
+        f'etag:{request.url.path}:{categoria}:{cursor}:{limit}',
+        TAG_PRODUCTS,
+    )
+    if not_modified:
+        return not_modified
+
+    product_info = ProductInfo(company_id)
+    products = None
+    if categoria:
+        products = await product_info.get_products_by_category(
+            categoria, cursor, limit
+        )
+    categories = await product_info.get_category_rollups()
+    return {'products': products, 'categories': categories}
 
 
 @list_products.get('/quantidade-estoque')
@@ -29,21 +77,49 @@ async def quantity_in_stock(
     """
     Retorna a quantidade total de produtos em estoque do usuário.
     """
-    product_info = ProductInfo(current_user.id)
+    product_info = ProductInfo(get_company_id(current_user))
     quantity = await product_info.count_products()
     return {'quantity': quantity}
 
 
 @list_products.get('/valor-estoque')
 async def total_stock_price(
+    request: Request,
+    response: Response,
     current_user: SystemUser = Depends(get_current_user),
 ):
     """
-    Retorna o valor total de custo do estoque do usuário.
+    Retorna o valor total do estoque do usuário (custo e venda).
     """
-    product_info = ProductInfo(current_user.id)
+    company_id = get_company_id(current_user)
+    not_modified = await check_etag(
+        request,
+        response,
+        company_id,
+        f'etag:{request.url.path}',
+        TAG_PRODUCTS,
+    )
+    if not_modified:
+        return not_modified
+
+    product_info = ProductInfo(company_id)
     total_price = await product_info.calculate_total_stock_price()
-    return {'total_stock_price': total_price}
+    return {
+        'total_stock_price': total_price,
+        'total_retail_value': product_info.total_retail_value,
+    }
+
+
+@list_products.get('/resumo-estoque')
+async def stock_summary(
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Retorna os totais do estoque para o painel (produtos, itens, valor de
+    custo, valor de venda e produtos com estoque baixo).
+    """
+    product_info = ProductInfo(get_company_id(current_user))
+    return {'summary': await product_info.get_summary()}
 
 
 @list_products.get('/stoque-baixo')
@@ -54,17 +130,122 @@ async def low_stock(
     Retorna todos os produtos com estoque baixo
     """
 
-    product_info = ProductInfo(current_user.id)
+    product_info = ProductInfo(get_company_id(current_user))
     all_products_witch_low_stock = await product_info.low_product_stock()
     return {'stokc': all_products_witch_low_stock}
 
 
 @list_products.get('/informacao-geral-vendas')
-async def informatios(current_user: SystemUser = Depends(get_current_user)):
+async def informatios(
+    inicio: Optional[date] = Query(None, description='Primeiro dia'),
+    fim: Optional[date] = Query(None, description='Último dia'),
+    caixa_id: Optional[int] = Query(None),
+    funcionario_id: Optional[int] = Query(None),
+    payment_method: Optional[PaymentMethods] = Query(None),
+    produto_id: Optional[int] = Query(None),
+    cursor: Optional[int] = Query(
+        None, description='next_cursor da página anterior'
+    ),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    current_user: SystemUser = Depends(get_current_user),
+):
     """
-    Retona informação completa sobre vendas, quem vendeu, quantidade,data entre outras informaçoes
+    Retona as vendas da janela (padrão: últimos 7 dias) com produto, caixa
+    e funcionário, paginadas da mais recente para a mais antiga.
     """
+    explorer = SalesExplorer(
+        get_company_id(current_user),
+        inicio,
+        fim,
+        caixa_id,
+        funcionario_id,
+        payment_method,
+        produto_id,
+    )
+    return {
+        'success': True,
+        'data': await explorer.page(cursor, limit),
+        'error': None,
+    }
 
-    return await information_about_sales_and_products_and_employees(
-        user_id=current_user.id
+
+@list_products.get('/informacao-geral-vendas/grupos')
+async def informatios_groups(
+    agrupar_por: str = Query(
+        'caixa', description='caixa, funcionario, pagamento ou produto'
+    ),
+    inicio: Optional[date] = Query(None, description='Primeiro dia'),
+    fim: Optional[date] = Query(None, description='Último dia'),
+    caixa_id: Optional[int] = Query(None),
+    funcionario_id: Optional[int] = Query(None),
+    payment_method: Optional[PaymentMethods] = Query(None),
+    produto_id: Optional[int] = Query(None),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """Totais das vendas da janela agrupados no banco."""
+    explorer = SalesExplorer(
+        get_company_id(current_user),
+        inicio,
+        fim,
+        caixa_id,
+        funcionario_id,
+        payment_method,
+        produto_id,
     )
+    return {
+        'success': True,
+        'data': await explorer.groups(agrupar_por, limit),
+        'error': None,
+    }
+
+
+@list_products.get('/curva-abc')
+async def abc_curve_report(
+    janela: int = Query(90, description='Janela em dias (ABC_WINDOWS)'),
+    classe: Optional[str] = Query(None, pattern='^[ABC]$'),
+    cursor: Optional[int] = Query(
+        None, description='next_cursor da página anterior'
+    ),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Curva ABC dos produtos (A: 80% da receita, B: 15%, C: 5%), calculada
+    diariamente fora do horário de pico.
+    """
+    if janela not in ABC_WINDOWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                'Janela não calculada. Use: '
+                + ', '.join(str(days) for days in ABC_WINDOWS)
+            ),
+        )
+
+    company_id = get_company_id(current_user)
+    page = await abc_curve.page(company_id, janela, classe, cursor, limit)
+
+    ids = [row['produto_id'] for row in page['items']]
+    products = {}
+    if ids:
+        products = {
+            row['id']: row
+            for row in await Produto.filter(
+                usuario_id=company_id, id__in=ids
+            ).values('id', 'name', 'product_code')
+        }
+    for row in page['items']:
+        product = products.get(row['produto_id'], {})
+        row['name'] = product.get('name')
+        row['product_code'] = product.get('product_code')
+
+    return {
+        'success': True,
+        'data': {
+            'janela_dias': janela,
+            **await abc_curve.summary(company_id, janela),
+            **page,
+        },
+        'error': None,
+    }
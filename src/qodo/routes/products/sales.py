@@ -92,6 +92,13 @@ async def finalizar_venda(
                 or validation_process.get('error')
                 or 'Erro ao processar venda'
             )
+            if 'nao_encontrados' in validation_process:
+                # Códigos que recusaram a venda, para o PDV apontar o item
+                error_msg = {
+                    'message': error_msg,
+                    'nao_encontrados': validation_process['nao_encontrados'],
+                    'sem_estoque': validation_process['sem_estoque'],
+                }
             raise HTTPException(status_code=400, detail=error_msg)
 
         validation_data = validation_process.get('data', {})
@@ -0,0 +1,122 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from tortoise.expressions import Q
+
+from qodo.auth.deps import SystemUser, get_current_user
+from qodo.controllers.products.product_listing import MAX_PAGE_SIZE, parse_fields
+from qodo.model.catalog import CatalogVersion, ProdutoRemovido
+from qodo.model.product import Produto
+
+router = APIRouter()
+
+# Limite de exclusões retornadas por chamada
+MAX_DELETED = 5000
+
+
+@router.get('/changes', status_code=200)
+async def catalog_changes(
+    since: int = Query(0, ge=0, description='Última versão sincronizada'),
+    after_id: int = Query(
+        0, ge=0, description='Último id recebido na mesma versão (paginação)'
+    ),
+    deleted_after: int = Query(
+        0, ge=0, description='Cursor das exclusões (paginação)'
+    ),
+    limite: int = Query(500, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(
+        None, description="Campos separados por vírgula ou 'all'"
+    ),
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Delta-sync do catálogo para os PDVs.
+
+    Retorna apenas os produtos alterados e os ids removidos depois de
+    `since`. As exclusões vêm primeiro: enquanto houver mais de
+    MAX_DELETED, as páginas trazem só exclusões. Enquanto `has_more` for
+    verdadeiro, chame de novo com os parâmetros de `next`; ao terminar,
+    guarde `version`.
+    """
+    try:
+        usuario_id = current_user.empresa_id
+        columns = parse_fields(fields)
+        if 'catalog_version' not in columns:
+            columns.append('catalog_version')
+
+        current = await CatalogVersion.filter(usuario_id=usuario_id).first()
+        version = current.version if current else 0
+
+        deleted = []
+        deleted_more = False
+        if after_id == 0:
+            tombstones = (
+                await ProdutoRemovido.filter(
+                    usuario_id=usuario_id,
+                    version__gt=since,
+                    version__lte=version,
+                    id__gt=deleted_after,
+                )
+                .order_by('id')
+                .limit(MAX_DELETED + 1)
+                .values_list('id', 'produto_id')
+            )
+            deleted_more = len(tombstones) > MAX_DELETED
+            tombstones = tombstones[:MAX_DELETED]
+            deleted = [product_id for _, product_id in tombstones]
+
+        changed = []
+        has_more = False
+        next_page = None
+        if deleted_more:
+            # Exclusões pendentes: os produtos ficam para as próximas
+            # páginas (mesmo since/after_id)
+            next_page = {
+                'since': since,
+                'after_id': after_id,
+                'deleted_after': tombstones[-1][0],
+            }
+        else:
+            rows = (
+                await Produto.filter(usuario_id=usuario_id)
+                .filter(
+                    Q(catalog_version__gt=since)
+                    | Q(catalog_version=since, id__gt=after_id)
+                )
+                .filter(catalog_version__lte=version)
+                .order_by('catalog_version', 'id')
+                .limit(limite + 1)
+                .values(*columns)
+            )
+            has_more = len(rows) > limite
+            changed = rows[:limite]
+
+            if has_more:
+                last = changed[-1]
+                next_page = {
+                    'since': last['catalog_version'],
+                    'after_id': last['id'],
+                    'deleted_after': 0,
+                }
+
+        return {
+            'success': True,
+            'data': {
+                'version': version,
+                'changed': jsonable_encoder(changed),
+                'deleted': deleted,
+                'has_more': has_more or deleted_more,
+                'next': next_page,
+            },
+            'error': None,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        return {
+            'success': False,
+            'data': None,
+            'error': f'Erro inesperado: {str(e)}',
+        }
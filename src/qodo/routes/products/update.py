@@ -3,8 +3,11 @@ from datetime import date, datetime
 from typing import Optional
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from tortoise.transactions import in_transaction
 
 from qodo.auth.deps import get_current_user
+from qodo.core.catalog import product_changed, stamp
+from qodo.core.stock_ledger import ADJUSTMENT, stock_ledger
 from qodo.model.product import Produto
 from qodo.model.user import Usuario
 from qodo.schemas.schema_product import ProductUpdateSchema
@@ -60,7 +63,37 @@ async def update_product(
         }
 
     product.atualizado_em = datetime.now()
-    await product.save()  # 🔹 Salva alterações no banco
+    async with in_transaction() as connection:
+        deltas = {}
+        if 'stock' in updated_fields:
+            # Saldo sobrescrito: a diferença para o saldo atual (travado
+            # até o commit) vai para o histórico
+            current = (
+                await Produto.filter(id=product.id)
+                .using_db(connection)
+                .select_for_update()
+                .first()
+                .values_list('stock', flat=True)
+            )
+            deltas[product.id] = product.stock - (current or 0)
+
+        # 🔹 Salva só os campos alterados (o estoque lido antes não
+        # sobrescreve vendas feitas nesse meio tempo)
+        await product.save(
+            update_fields=[*updated_fields, 'atualizado_em'],
+            using_db=connection,
+        )
+        await stock_ledger.record(
+            current_user.id,
+            deltas,
+            ADJUSTMENT,
+            reference=f'produto:{product.id}',
+            using_db=connection,
+        )
+        version = await stamp(
+            current_user.id, changed=(product.id,), using_db=connection
+        )
+    await product_changed(current_user.id, product, version=version)
 
     return {
         'message': 'Produto atualizado com sucesso!',
@@ -1,20 +1,45 @@
 import os
-import shutil
 from pathlib import Path
-
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from typing import Literal
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import FileResponse, RedirectResponse
 from tortoise.transactions import in_transaction
 
 from qodo.auth.deps import SystemUser, get_current_user
+from qodo.controllers.products.image_pipeline import (
+    DEFAULT_VARIANT,
+    IMAGE_URL_TEMPLATE,
+    IMAGES_DIR,
+    VARIANTS,
+    image_hash_from_url,
+    image_url_for,
+    is_valid_hash,
+    release,
+    store_upload,
+    variant_path,
+)
+from qodo.core.cache_tags import TAG_PRODUCTS
+from qodo.core.catalog import product_changed, stamp
+from qodo.core.etag import CACHE_IMMUTABLE, check_etag, check_immutable
 from qodo.model.product import Produto
 
 router = APIRouter()
 
-# Diretório onde as imagens serão salvas
-IMAGES_DIR = Path('static/images')
 IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 
+Variant = Literal['64', '128', '256', '512', 'full']
+
 
 # ===============================
 # Upload de imagem do produto
@@ -23,19 +48,18 @@ IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 async def upload_image(
     product_id: int,
     file: UploadFile = File(...),
+    content_length: int | None = Header(None),
     current_user: SystemUser = Depends(get_current_user),
 ):
+    """
+    Recebe a imagem do produto e gera as miniaturas WebP.
+
+    Imagens iguais (mesmo conteúdo) são armazenadas uma única vez e
+    compartilhadas entre os produtos.
+    """
     if not current_user:
         raise HTTPException(status_code=401, detail='Usuário não autenticado')
 
-    # Verifica extensão permitida
-    allowed_extensions = {'.png', '.jpg', '.jpeg', '.gif', '.webp'}
-    file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in allowed_extensions:
-        raise HTTPException(
-            status_code=400, detail='Formato de arquivo não suportado'
-        )
-
     # Busca o produto verificando o usuário
     produto = await Produto.filter(
         id=product_id, usuario_id=current_user.empresa_id
@@ -43,98 +67,94 @@ async def upload_image(
     if not produto:
         raise HTTPException(status_code=404, detail='Produto não encontrado')
 
-    # Gera nome único para o arquivo
-    unique_filename = (
-        f'produto_{product_id}_{current_user.empresa_id}{file_ext}'
-    )
-    file_path = IMAGES_DIR / unique_filename
+    digest = await store_upload(file, content_length)
 
     try:
-        # Salva o arquivo de forma assíncrona
-        with open(file_path, 'wb') as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Remove imagem anterior se existir e for diferente
-        if produto.image_url:
-            old_filename = os.path.basename(produto.image_url)
-            if old_filename != unique_filename:
-                old_path = IMAGES_DIR / old_filename
-                if old_path.exists():
-                    old_path.unlink()
-
-        # Atualiza a URL da imagem no banco (caminho relativo)
-        produto.image_url = unique_filename  # Salva apenas o nome do arquivo
-        await produto.save()
+        old_image = produto.image_url
+        produto.image_hash = digest
+        produto.image_url = f'{digest}.webp'  # Salva apenas o nome
+        async with in_transaction():
+            await produto.save(update_fields=['image_hash', 'image_url'])
+            version = await stamp(
+                current_user.empresa_id, changed=(produto.id,)
+            )
+
+        # Arquivo antigo sem uso sai agora; hashes ficam para a coleta
+        await release(old_image)
+        await product_changed(
+            current_user.empresa_id, produto, version=version
+        )
 
         return {
             'message': 'Imagem enviada com sucesso',
             'image_url': f'/produtos/produto/{product_id}/imagem',
-            'filename': unique_filename,
+            'filename': produto.image_url,
+            'image_hash': digest,
+            'urls': {name: image_url_for(digest, name) for name in VARIANTS},
         }
 
     except Exception as e:
-        # Limpa o arquivo em caso de erro
-        if file_path.exists():
-            file_path.unlink()
         raise HTTPException(
             status_code=500, detail=f'Erro ao salvar imagem: {str(e)}'
         )
 
 
+def _default_image() -> FileResponse:
+    # Retorna imagem padrão se não tiver imagem
+    default_path = Path('static/images/NAHTEC-SIMBOLO.png')
+    if default_path.exists():
+        return FileResponse(
+            default_path,
+            media_type='image/png',
+            headers={
+                'Access-Control-Allow-Origin': '*',
+                'Cache-Control': 'public, max-age=3600',
+            },
+        )
+    raise HTTPException(status_code=404, detail='Imagem não encontrada')
+
+
 # ===============================
 # Exibir imagem do produto
 # ===============================
 @router.get('/produto/{product_id}/imagem')
 async def get_image(
-    product_id: int, current_user: SystemUser = Depends(get_current_user)
+    product_id: int,
+    tamanho: Variant = Query(
+        DEFAULT_VARIANT, description='Lado máximo da miniatura (px) ou full'
+    ),
+    current_user: SystemUser = Depends(get_current_user),
 ):
     if not current_user:
         raise HTTPException(status_code=401, detail='Usuário não autenticado')
 
-    produto = await Produto.filter(
-        usuario_id=current_user.empresa_id, id=product_id
-    ).first()
+    produto = (
+        await Produto.filter(usuario_id=current_user.empresa_id, id=product_id)
+        .first()
+        .values('image_url', 'image_hash')
+    )
     if not produto:
         raise HTTPException(status_code=404, detail='Produto não encontrado')
 
-    if not produto.image_url:
-        # Retorna imagem padrão se não tiver imagem
-        default_path = Path('static/images/NAHTEC-SIMBOLO.png')
-        if default_path.exists():
-            return FileResponse(
-                default_path,
-                media_type='image/png',
-                headers={
-                    'Access-Control-Allow-Origin': '*',
-                    'Cache-Control': 'public, max-age=3600',
-                },
-            )
-        raise HTTPException(status_code=404, detail='Imagem não encontrada')
-
-    # CORREÇÃO: Busca a imagem no diretório de imagens
-    filename = produto.image_url
+    digest = produto['image_hash'] or image_hash_from_url(
+        produto['image_url']
+    )
+    if digest:
+        if variant_path(digest, tamanho).exists():
+            # A URL por hash é imutável e pode ficar no cache do cliente
+            return RedirectResponse(image_url_for(digest, tamanho), 307)
+        return _default_image()
 
-    # Se for um caminho completo, extrai apenas o nome do arquivo
-    if '/' in filename:
-        filename = os.path.basename(filename)
+    if not produto['image_url']:
+        return _default_image()
 
+    # Imagens enviadas antes do armazenamento por conteúdo
+    filename = os.path.basename(produto['image_url'])
     file_path = IMAGES_DIR / filename
 
     if not file_path.exists():
         # Fallback para imagem padrão
-        default_path = Path('static/images/NAHTEC-SIMBOLO.png')
-        if default_path.exists():
-            return FileResponse(
-                default_path,
-                media_type='image/png',
-                headers={
-                    'Access-Control-Allow-Origin': '*',
-                    'Cache-Control': 'public, max-age=3600',
-                },
-            )
-        raise HTTPException(
-            status_code=404, detail='Arquivo de imagem não encontrado'
-        )
+        return _default_image()
 
     # Content-Type
     extension_to_type = {
@@ -158,6 +178,83 @@ async def get_image(
     )
 
 
+# ===============================
+# Imagem por conteúdo (URL imutável)
+# ===============================
+@router.get('/imagens/{digest}/{variant}.webp')
+async def get_image_by_hash(digest: str, variant: str, request: Request):
+    """
+    Variante WebP pelo hash do conteúdo.
+
+    O conteúdo de uma URL nunca muda (uma imagem nova tem outro hash), então
+    a resposta é `immutable` e o ETag é o próprio hash. Suporta Range.
+    """
+    if not is_valid_hash(digest) or variant not in VARIANTS:
+        raise HTTPException(status_code=404, detail='Imagem não encontrada')
+
+    etag = f'"{digest}-{variant}"'
+    not_modified = check_immutable(request, etag)
+    if not_modified:
+        return not_modified
+
+    file_path = variant_path(digest, variant)
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail='Imagem não encontrada')
+
+    # FileResponse atende Range / If-Range a partir do ETag informado
+    return FileResponse(
+        file_path,
+        media_type='image/webp',
+        headers={
+            'ETag': etag,
+            'Cache-Control': CACHE_IMMUTABLE,
+            'Access-Control-Allow-Origin': '*',
+        },
+    )
+
+
+@router.get('/imagens/manifest')
+async def image_manifest(
+    request: Request,
+    response: Response,
+    current_user: SystemUser = Depends(get_current_user),
+):
+    """
+    Imagens de todos os produtos da empresa em uma resposta, para o PDV
+    pré-carregar as miniaturas.
+
+    `images` traz cada hash uma única vez; `products` liga produto a hash.
+    Monte as URLs com `url_template`.
+    """
+    not_modified = await check_etag(
+        request,
+        response,
+        current_user.empresa_id,
+        'images:manifest',
+        TAG_PRODUCTS,
+    )
+    if not_modified:
+        return not_modified
+
+    rows = (
+        await Produto.filter(
+            usuario_id=current_user.empresa_id, image_hash__isnull=False
+        )
+        .order_by('id')
+        .values_list('id', 'image_hash')
+    )
+    return {
+        'success': True,
+        'data': {
+            'url_template': IMAGE_URL_TEMPLATE,
+            'variants': list(VARIANTS),
+            'images': sorted({digest for _, digest in rows}),
+            'products': [[product_id, digest] for product_id, digest in rows],
+        },
+        'error': None,
+    }
+
+
 # ===============================
 # Remover imagem do produto
 # ===============================
@@ -180,15 +277,22 @@ async def delete_image(
         )
 
     try:
-        # Remove o arquivo físico
-        filename = os.path.basename(produto.image_url)
-        file_path = IMAGES_DIR / filename
-        if file_path.exists():
-            file_path.unlink()
+        old_image = produto.image_url
 
         # Remove a referência no banco
         produto.image_url = None
-        await produto.save()
+        produto.image_hash = None
+        async with in_transaction():
+            await produto.save(update_fields=['image_url', 'image_hash'])
+            version = await stamp(
+                current_user.empresa_id, changed=(produto.id,)
+            )
+
+        # Arquivo antigo sem uso sai agora; hashes ficam para a coleta
+        await release(old_image)
+        await product_changed(
+            current_user.empresa_id, produto, version=version
+        )
 
         return {'message': 'Imagem removida com sucesso'}
 
@@ -2,19 +2,22 @@ from datetime import datetime, time
 from typing import Any, Dict, List
 from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, Depends, HTTPException
-from tortoise.functions import Sum  # Import necessário para agregar
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
 from qodo.auth.deps import SystemUser, get_current_user
+from qodo.core.cache_tags import TAG_SALES
+from qodo.core.etag import check_etag
+from qodo.core.sales_rollup import sales_rollup
 from qodo.model.sale import Sales
 from qodo.model.user import Usuario
-from qodo.utils.sales_of_the_day import sales_of_the_day, total_in_sales
 
 allDatas = APIRouter()
 
 
 @allDatas.get('/profit')
 async def profit(
+    request: Request,
+    response: Response,
     current_user: SystemUser = Depends(get_current_user),
 ) -> Dict[str, Any]:
     """
@@ -33,81 +36,74 @@ async def profit(
             today, time.max, tzinfo=ZoneInfo('America/Sao_Paulo')
         )
 
+        # Nenhuma venda nova/cancelada hoje: o painel já tem os dados
+        not_modified = await check_etag(
+            request,
+            response,
+            current_user.empresa_id,
+            f'etag:profit:{today.isoformat()}',
+            TAG_SALES,
+        )
+        if not_modified:
+            return not_modified
+
         # --- 2. CONSULTAS ---
 
-        # A. Busca todas as vendas do usuário no dia atual (para iteração e lista)
-        sales_of_the_day_list = await Sales.filter(
-            usuario_id=current_user.empresa_id,
-            criado_em__gte=start_of_day,
-            criado_em__lte=end_of_day,
-        ).all()
+        # A. Totais do dia e do histórico vêm do resumo diário
+        #    (custo proporcional aos dias, não ao histórico de vendas)
+        day_totals = await sales_rollup.totals(
+            current_user.empresa_id, today, today
+        )
+        history_totals = await sales_rollup.totals(current_user.empresa_id)
 
-        # B. Consulta de Agregação (para total de itens vendidos no dia)
-        daily_aggregation = (
+        # B. Lista das vendas do dia (consulta limitada ao dia atual)
+        sales_of_the_day_list = (
             await Sales.filter(
                 usuario_id=current_user.empresa_id,
                 criado_em__gte=start_of_day,
                 criado_em__lte=end_of_day,
             )
-            .annotate(total_items_sold=Sum('quantity'))
-            .first()
+            .order_by('id')
+            .values(
+                'id',
+                'product_name',
+                'quantity',
+                'total_price',
+                'lucro_total',
+                'cost_price',
+                'sale_code',
+                'criado_em',
+            )
         )
 
-        # C. Contagem de Vendas Únicas (usando a função corrigida)
-        qtd_sales_day = await sales_of_the_day(current_user.empresa_id)
-
-        # A única informação que é persistida no banco de dados,
-        # não sendo recalculada ou zerada automaticamente pelo sistema ou rotinas diárias.
-        __valor__no__update__ = await total_in_sales(current_user.empresa_id)
-
-        # D. Contagem de Vendas (Histórico Total)
-        total_sales_count = await Sales.filter(
-            usuario_id=current_user.empresa_id
-        ).count()
-
         # --- 3. PROCESSAMENTO DE DADOS ---
-        total_user_profit = 0.0  # Receita bruta total do dia
-        total_lucro = 0.0  # Lucro líquido total do dia
-        sales_list: List[Dict] = []
-
-        for sale in sales_of_the_day_list:
-            total_user_profit += sale.total_price
-            total_lucro += sale.lucro_total
-
-            sales_list.append(
-                {
-                    'id': sale.id,
-                    'product_name': sale.product_name,
-                    'quantity': sale.quantity,
-                    'total_price': sale.total_price,
-                    'lucro_total': sale.lucro_total,
-                    'cost_price': sale.cost_price,
-                    'codigo_da_venda': sale.sale_code,
-                    'created_at': (
-                        sale.criado_em.strftime('%d/%m/%Y %H:%M:%S')
-                        if sale.criado_em
-                        else None
-                    ),
-                }
-            )
-
-        # Total de itens vendidos hoje
-        total_items_sold_today = (
-            daily_aggregation.total_items_sold
-            if daily_aggregation
-            and daily_aggregation.total_items_sold is not None
-            else 0
-        )
+        sales_list: List[Dict] = [
+            {
+                'id': sale['id'],
+                'product_name': sale['product_name'],
+                'quantity': sale['quantity'],
+                'total_price': sale['total_price'],
+                'lucro_total': sale['lucro_total'],
+                'cost_price': sale['cost_price'],
+                'codigo_da_venda': sale['sale_code'],
+                'created_at': (
+                    sale['criado_em'].strftime('%d/%m/%Y %H:%M:%S')
+                    if sale['criado_em']
+                    else None
+                ),
+            }
+            for sale in sales_of_the_day_list
+        ]
 
         # --- 4. RETORNO OTIMIZADO ---
         return {
             # 🎯 MÉTRICAS DO DIA
-            'total_user_profit': f'{total_user_profit:.2f}',  # Receita bruta do dia
-            'total_lucro': f'{__valor__no__update__:.2f}',  # Lucro líquido real
-            'sales_of_the_day': qtd_sales_day,  # Quantidade de Vendas Únicas (Transações) do dia
-            'total_items_sold_today': total_items_sold_today,  # Quantidade total de itens vendidos hoje
+            'total_user_profit': f"{day_totals['receita']:.2f}",  # Receita bruta do dia
+            'total_lucro': f"{history_totals['receita']:.2f}",  # Total vendido (histórico)
+            'sales_of_the_day': day_totals['vendas_distintas'],  # Quantidade de Vendas Únicas (Transações) do dia
+            'total_items_sold_today': day_totals['itens'],  # Quantidade total de itens vendidos hoje
             # 🎯 MÉTRICAS GERAIS
-            'total_sales_count_history': total_sales_count,  # Quantidade TOTAL de registros de vendas (linhas na tabela)
+            'total_sales_count_history': history_totals['vendas'],  # Quantidade TOTAL de registros de vendas (linhas na tabela)
             # 🎯 DADOS DETALHADOS
             'sales': sales_list,  # Lista de todas as vendas do dia
             # Codigo de venda
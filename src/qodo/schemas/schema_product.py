@@ -1,6 +1,6 @@
 from datetime import date, datetime
 from enum import Enum
-from typing import Annotated, Optional
+from typing import Annotated, List, Literal, Optional
 
 from pydantic import BaseModel, Field, HttpUrl
 
@@ -11,6 +11,7 @@ Str50 = Annotated[str, Field(min_length=1, max_length=50)]
 Str150 = Annotated[str, Field(min_length=2, max_length=150)]
 NonNegativeInt = Annotated[int, Field(ge=0)]
 NonNegativeFloat = Annotated[float, Field(ge=0)]
+PositiveInt = Annotated[int, Field(gt=0)]
 
 
 # ======================================
@@ -228,6 +229,36 @@ class ProductRegisterSchema(BaseModel):
     sales_config: Optional[ApplyingSalesType] = None
 
 
+class ProductImportUpdateSchema(BaseModel):
+    """Schema for updating an existing product from an import file"""
+
+    # Only the filled cells are set; blank cells keep the current value
+    product_code: Str50
+    name: Optional[Str150] = None
+    stock: Optional[NonNegativeInt] = None
+    stoke_min: Optional[NonNegativeInt] = None
+    stoke_max: Optional[NonNegativeInt] = None
+    date_expired: Optional[datetime] = None
+    fabricator: Optional[str] = None
+    cost_price: Optional[NonNegativeFloat] = None
+    price_uni: Optional[NonNegativeFloat] = None
+    sale_price: Optional[NonNegativeFloat] = None
+    supplier: Optional[str] = None
+    lot_bar_code: Optional[str] = None
+    image_url: Optional[str] = None
+
+    # 🔹 Connected enums and options
+    product_type: Optional[ProductType] = None
+    active: Optional[ProductStatus] = None
+    group: Optional[str] = None
+    sub_group: Optional[str] = None
+    ticket: Optional[str] = None
+    sector: Optional[ProductSector] = None
+    unit: Optional[str] = None
+    controllstoke: Optional[ProductStatus] = None
+    sales_config: Optional[ApplyingSalesType] = None
+
+
 class ProductUpdateSchema(BaseModel):
     """Schema for updating product information"""
 
@@ -255,3 +286,36 @@ class ProductUpdateSchema(BaseModel):
     unit: Optional[str] = None
     controllstoke: Optional[str] = None
     sales_config: Optional[str] = None
+
+
+# ======================================
+# 🔹 Stock Entry Schemas
+# ======================================
+class StockEntryItemSchema(BaseModel):
+    """Item of a batch stock entry (product_code or barcode)"""
+
+    code: Annotated[str, Field(min_length=1, max_length=100)]
+    quantity: PositiveInt
+    unit_cost: Optional[NonNegativeFloat] = None
+
+
+class StockEntryBatchSchema(BaseModel):
+    """Batch stock entry sent as a list"""
+
+    items: Annotated[List[StockEntryItemSchema], Field(min_length=1)]
+    detail: Optional[str] = None
+    allow_partial: bool = False
+    update_cost: bool = False
+
+
+# ======================================
+# 🔹 Label Schemas
+# ======================================
+class LabelBatchSchema(BaseModel):
+    """Batch label sheet (at least one filter is required)"""
+
+    product_ids: Optional[List[int]] = None
+    group: Optional[str] = None
+    since_version: Optional[NonNegativeInt] = None
+    layout: Literal['a4', 'termica'] = 'a4'
+    copies: Annotated[int, Field(ge=1, le=50)] = 1
@@ -3,8 +3,10 @@ from typing import Optional
 
 from fastapi import HTTPException, status
 
+from qodo.core.barcode_map import barcode_map
 from qodo.core.cache import client
-from qodo.logs.infos import LOGGER
+from qodo.core.cache_tags import TAG_PRODUCTS, tagged_cache
+from qodo.core.marketplace_index import MAX_RESULTS, marketplace_index
 from qodo.model.product import Produto
 from qodo.model.user import Usuario
 
@@ -17,8 +19,18 @@ async def get_product_by_user(
 ):
     """Busca produto pelo usuário, código ou nome."""
 
-    cache_key = f"product:{user_id}:{code or ''}:{name or ''}"
-    cache = await client.get(cache_key)
+    # Código lido pelo scanner: resolve o id pelo mapa em memória (O(1))
+    if code and not name and not product_id:
+        record = await barcode_map.resolve(user_id, code)
+        if record:
+            code, product_id = None, record.id
+
+    cache_key = await tagged_cache.key(
+        user_id,
+        f"product:{user_id}:{product_id or ''}:{code or ''}:{name or ''}",
+        TAG_PRODUCTS,
+    )
+    cache = await client.get(cache_key) if cache_key else None
 
     if cache:
         return json.loads(cache)  # volta dict
@@ -34,9 +46,9 @@ async def get_product_by_user(
 
     product = await query.first().values()  # <-- pega dict direto
 
-    if product:
+    if product and cache_key:
         await client.setex(
-            cache_key, 90, json.dumps(product, default=str)
+            cache_key, 600, json.dumps(product, default=str)
         )  # salva no Redis
     return product
 
@@ -46,118 +58,28 @@ async def deep_search(
 ):
     """
     Realiza uma busca aprofundada por um produto...
-    """
-
-    # --- 1. Lógica de Cache (Início) ---
-    cache_key = None  # Definir fora para usar no 'setex'
-    try:
-        # Normaliza a chave para evitar duplicatas (ex: "Ham" vs "ham")
-        prod_name_key = product_name.lower().strip() if product_name else ''
-        company_key = target_company.lower().strip() if target_company else ''
-
-        cache_key = f'product:{user_id}:{prod_name_key}:{company_key}'
-
-        # FIX 1: Adicionar 'await' para realmente buscar no Redis
-        cache = await client.get(cache_key)
 
-        if cache:
-            LOGGER.info('Retonando dados em cache.')
-            return json.loads(cache)  # Agora 'cache' é uma string JSON
-
-        print(f'Cache MISS na função: {cache_key}')
-
-    except Exception as e:
-        # Se o cache falhar, não quebre a aplicação. Apenas logue e continue.
-        print(f'AVISO: Erro no cache (get): {e}. Buscando no banco...')
-    # --- Fim da Lógica de Cache (Início) ---
+    A busca usa o índice do marketplace em memória (todas as empresas ou
+    apenas `target_company`), sem consultar a tabela de produtos.
+    """
 
     try:
-        data = []
-        user_exists = await Usuario.filter(id=user_id).first()
+        user_exists = await Usuario.filter(id=user_id).exists()
         if not user_exists:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail='Parece que você ainda não possui um cadastro...',
             )
 
-        # Busca sem empresa específica
-        if product_name and target_company is None:
-            query = await Produto.filter(
-                name__icontains=product_name
-            ).prefetch_related('usuario')
-            if query:
-                for product in query:
-                    data.append(
-                        {
-                            'id': product.id,
-                            'company': product.usuario.company_name
-                            if product.usuario
-                            else 'N/A',
-                            'name': product.name,
-                            'fabricator': product.fabricator
-                            if product.fabricator
-                            else 'Não informado.',
-                            'cost_price': product.cost_price,
-                            'price_uni': product.price_uni,
-                            'sale_price': product.sale_price,
-                            'supplier': product.supplier
-                            if product.supplier
-                            else 'não informado.',
-                            'image_url': f'https://api.nahtec.com.br/produto/{product.id}/imagem',
-                        }
-                    )
-
-        # Busca com empresa específica
-        elif product_name and target_company:
-            query = await Produto.filter(
-                name__icontains=product_name
-            ).prefetch_related('usuario')
-
-            filtered_products = []
-            for product in query:
-                if (
-                    product.usuario
-                    and product.usuario.company_name.lower()
-                    == target_company.lower()
-                ):
-                    filtered_products.append(product)
-
-            if filtered_products:
-                for product in filtered_products:
-                    data.append(
-                        {
-                            'id': product.id,
-                            'company': product.usuario.company_name
-                            if product.usuario
-                            else 'N/A',
-                            'name': product.name,
-                            'fabricator': product.fabricator
-                            if product.fabricator
-                            else 'Não informado.',
-                            'cost_price': product.cost_price,
-                            'price_uni': product.price_uni,
-                            'sale_price': product.sale_price,
-                            'supplier': product.supplier
-                            if product.supplier
-                            else 'Não informado.',
-                            'image_url': f'https://api.nahtec.com.br/produto/{product.id}/imagem',
-                        }
-                    )
-
-        # --- 2. Lógica de Cache (Final) ---
-        try:
-            if cache_key:
-                # FIX 2: Salvar o resultado (mesmo que seja uma lista vazia [])
-                # FIX 1: Adicionar 'await' para realmente salvar no Redis
-                await client.setex(
-                    cache_key, 90, json.dumps(data, default=str)
-                )
-                print(f'Cache SET na função: {cache_key}')
-        except Exception as e:
-            print(f'AVISO: Erro no cache (setex): {e}')
-        # --- Fim da Lógica de Cache (Final) ---
-
-        return data  # Retorna os dados (sejam eles [] ou cheios)
+        if not product_name:
+            return []
+
+        result = await marketplace_index.search(
+            product_name,
+            company=target_company,
+            page_size=MAX_RESULTS,
+        )
+        return result['items']
 
     except HTTPException:
         raise
@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+
+from qodo.conf.database import close_database, init_database
+from qodo.controllers.products.bulk_import import ImportJob, ProductImporter
+
+"""
+import_products: Importação de produtos pela linha de comando.
+
+    qodo-import --empresa 7 produtos.csv
+    python -m qodo.utils.import_products --empresa 7 produtos.xlsx
+
+Usa o mesmo importador do endpoint /produtos/importar, mas roda em
+primeiro plano e mantém o arquivo original.
+"""
+
+
+async def run(empresa_id: int, path: str) -> int:
+    if not await init_database():
+        print('❌ Não foi possível inicializar o banco de dados')
+        return 1
+
+    try:
+        job = ImportJob(
+            id=uuid.uuid4().hex,
+            usuario_id=empresa_id,
+            filename=os.path.basename(path),
+        )
+        await ProductImporter(job, path, remove_file=False).run()
+    finally:
+        await close_database()
+
+    print(
+        f'Linhas: {job.processed} | criados: {job.created} | '
+        f'atualizados: {job.updated} | com erro: {job.failed}'
+    )
+    for error in job.errors:
+        print(f"  linha {error['line']}: {error['error']}")
+    if job.failed > len(job.errors):
+        print(f'  ... e mais {job.failed - len(job.errors)} erros')
+    if job.status == 'erro':
+        print(f'❌ Importação interrompida: {job.message}')
+        return 1
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Importa produtos de um arquivo CSV ou XLSX.'
+    )
+    parser.add_argument('arquivo', help='Caminho do CSV/XLSX')
+    parser.add_argument(
+        '--empresa', type=int, required=True, help='ID da empresa (usuário)'
+    )
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.arquivo):
+        parser.error(f'Arquivo não encontrado: {args.arquivo}')
+
+    sys.exit(asyncio.run(run(args.empresa, args.arquivo)))
+
+
+if __name__ == '__main__':
+    main()
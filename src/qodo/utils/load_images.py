@@ -5,6 +5,7 @@ from typing import List, Optional
 
 from fastapi import HTTPException, status
 
+from qodo.controllers.products.image_pipeline import store_file
 from qodo.model.product import Produto
 from qodo.utils.get_produtos_user import get_product_by_user
 
@@ -60,10 +61,14 @@ async def load_imgs(
         # Verificar se o arquivo existe (opcional)
         if not os.path.exists(path):
             print(f'Aviso: Arquivo de imagem não encontrado em {path}')
-
-        # Atualizar produto
-        product.image_url = path
-        await product.save()
+            product.image_url = path
+            await product.save(update_fields=['image_url'])
+        else:
+            # A imagem padrão é armazenada uma vez e compartilhada pelo hash
+            digest = await store_file(path)
+            product.image_hash = digest
+            product.image_url = f'{digest}.webp'
+            await product.save(update_fields=['image_hash', 'image_url'])
 
         return {
             'success': True,
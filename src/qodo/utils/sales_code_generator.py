@@ -1,20 +1,19 @@
 import random
 import string
+from typing import Any, Dict, List
 
 from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F, Q
+from tortoise.transactions import in_transaction
 
+from qodo.model.catalog import SequenciaCodigoBarras
 from qodo.model.product import Produto
 
-"""
-ATENÇÃO: 
-    Este script foi desenvolvido apenas para fins de aprendizado do programador atual: Gilderlan Silva.
-    Caso você não entenda o que está acontecendo aqui, relaxe: você pode substituir por .sort() ou sorted(), 
-    métodos padrão do Python.
-    Se quiser entender melhor o funcionamento, pesquise por: 
-        'Quicksort: o que é e para que serve' 
-    e depois por 
-        'sort e sorted em Python'.
-"""
+# Prefixo GS1 "2": códigos de circulação restrita (uso interno da loja)
+INTERNAL_EAN_PREFIX = '2'
+
+# Produtos atualizados por comando UPDATE na geração em lote
+BARCODE_CHUNK_SIZE = 1000
 
 
 def gerar_codigo_venda(size: int = 6) -> str:
@@ -24,8 +23,31 @@ def gerar_codigo_venda(size: int = 6) -> str:
     )
 
 
+def ean13_check_digit(body: str) -> str:
+    """Dígito verificador de um EAN-13 (12 primeiros dígitos)."""
+    total = sum(
+        int(digit) * (3 if position % 2 else 1)
+        for position, digit in enumerate(body)
+    )
+    return str((10 - total % 10) % 10)
+
+
+def ean13(body: str) -> str:
+    """EAN-13 completo a partir dos 12 primeiros dígitos."""
+    return body + ean13_check_digit(body)
+
+
 def lot_bar_code_size(size: int = 13) -> str:
-    """Gera um código aleatório para a venda."""
+    """
+    Gera um código de barras aleatório.
+
+    Com 13 dígitos gera um EAN-13 válido de uso interno (prefixo 2). Não
+    garante unicidade: para produtos use `reserve_internal_eans`.
+    """
+    if size == 13:
+        return ean13(
+            INTERNAL_EAN_PREFIX + ''.join(random.choices(string.digits, k=11))
+        )
     return ''.join(random.choices(string.digits, k=size))
 
 
@@ -60,31 +82,132 @@ async def generator_code_to_checkout(usuario_id: int):
     return random.randint(1000, 9999)
 
 
-def quicksort(arr, key=lambda x: x):
-    """Ordena uma lista usando quicksort."""
-    if len(arr) <= 1:
-        return arr
-    pivot = arr[len(arr) // 2]
-    left = [x for x in arr if key(x) < key(pivot)]
-    middle = [x for x in arr if key(x) == key(pivot)]
-    right = [x for x in arr if key(x) > key(pivot)]
-    return quicksort(left, key) + middle + quicksort(right, key)
+async def _highest_internal_ean(user_id: int, connection) -> int:
+    """Maior número interno já usado (semente da sequência da empresa)."""
+    codes = await (
+        Produto.filter(
+            usuario_id=user_id, lot_bar_code__startswith=INTERNAL_EAN_PREFIX
+        )
+        .using_db(connection)
+        .values_list('lot_bar_code', flat=True)
+    )
+
+    last = 0
+    for code in codes:
+        if len(code) == 13 and code.isdigit():
+            last = max(last, int(code[1:12]))
+    return last
 
 
-async def barcode_generator(user_id: int, size: int = 13):
-    """Gera códigos para produtos com lot_bar_code vazio e ordena pelo código."""
+async def _reserve(user_id: int, count: int, connection) -> int:
+    """Avança a sequência em `count` (linha travada até o commit)."""
+    updated = (
+        await SequenciaCodigoBarras.filter(usuario_id=user_id)
+        .using_db(connection)
+        .update(ultimo=F('ultimo') + count)
+    )
+    if not updated:
+        last = await _highest_internal_ean(user_id, connection)
+        try:
+            # Savepoint: a violação de unicidade não aborta a escrita
+            async with in_transaction() as savepoint:
+                await SequenciaCodigoBarras.create(
+                    usuario_id=user_id, ultimo=last + count, using_db=savepoint
+                )
+            return last + count
+        except IntegrityError:
+            # Outro request criou a sequência ao mesmo tempo
+            await SequenciaCodigoBarras.filter(usuario_id=user_id).using_db(
+                connection
+            ).update(ultimo=F('ultimo') + count)
+
+    return (
+        await SequenciaCodigoBarras.filter(usuario_id=user_id)
+        .using_db(connection)
+        .first()
+        .values_list('ultimo', flat=True)
+    )
 
-    # Busca produtos do usuário
-    products = await Produto.filter(usuario_id=user_id)
 
-    # Atualiza os que têm lot_bar_code = None
-    for prod in products:
-        if prod.lot_bar_code is None:
-            prod.lot_bar_code = ''.join(random.choices(string.digits, k=size))
-            print(prod.lot_bar_code)
-            await prod.save()
+async def reserve_internal_eans(
+    user_id: int, count: int = 1, using_db=None
+) -> List[str]:
+    """
+    Reserva `count` EAN-13 internos (prefixo 2 + número + dígito
+    verificador) da sequência da empresa.
 
-    # Ordena os produtos pelo código de barras (usando quicksort)
-    ordered_products = quicksort(products, key=lambda p: p.lot_bar_code)
+    Chamar dentro da transação que grava os produtos: o lock da sequência
+    vale até o commit, e um rollback devolve os números.
+    """
+    if count <= 0:
+        return []
+
+    if using_db is None:
+        async with in_transaction() as connection:
+            last = await _reserve(user_id, count, connection)
+    else:
+        last = await _reserve(user_id, count, using_db)
+    return [
+        ean13(f'{INTERNAL_EAN_PREFIX}{number:011d}')
+        for number in range(last - count + 1, last + 1)
+    ]
+
+
+async def barcode_generator(
+    user_id: int, chunk_size: int = BARCODE_CHUNK_SIZE
+) -> List[Dict[str, Any]]:
+    """
+    Gera EAN-13 para os produtos sem lot_bar_code e retorna o catálogo
+    ordenado pelo código.
 
-    return ordered_products
+    Os códigos vêm da sequência interna da empresa
+    (`reserve_internal_eans`), a mesma do cadastro e da importação, o que
+    garante que não se repitam. A gravação é feita em lotes com
+    bulk_update, e a ordenação fica com o ORDER BY do banco.
+    """
+    from qodo.core.catalog import products_bulk_changed, stamp
+
+    missing = await (
+        Produto.filter(usuario_id=user_id)
+        .filter(Q(lot_bar_code__isnull=True) | Q(lot_bar_code=''))
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+
+    if missing:
+        version = None
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start : start + chunk_size]
+            async with in_transaction() as connection:
+                # Trava e confere de novo: outra geração pode ter chegado
+                # antes
+                products = (
+                    await Produto.filter(id__in=chunk)
+                    .filter(Q(lot_bar_code__isnull=True) | Q(lot_bar_code=''))
+                    .using_db(connection)
+                    .select_for_update()
+                    .order_by('id')
+                    .only('id', 'lot_bar_code')
+                )
+                codes = await reserve_internal_eans(
+                    user_id, len(products), using_db=connection
+                )
+                for product, code in zip(products, codes):
+                    product.lot_bar_code = code
+                if products:
+                    await Produto.bulk_update(
+                        products, fields=['lot_bar_code'], using_db=connection
+                    )
+                    version = await stamp(
+                        user_id,
+                        changed=[product.id for product in products],
+                        using_db=connection,
+                    )
+
+        await products_bulk_changed(user_id, missing, version=version)
+
+    return (
+        await Produto.filter(usuario_id=user_id)
+        .order_by('lot_bar_code', 'id')
+        .values('id', 'name', 'product_code', 'lot_bar_code')
+    )
@@ -0,0 +1,51 @@
+from typing import Dict
+
+from qodo.logs.infos import LOGGER
+from qodo.model.customers import Customer
+from qodo.model.fornecedor import Fornecedor
+from qodo.model.product import Produto
+from qodo.utils.text_normalize import normalize_text
+
+
+async def backfill_search_keys(batch_size: int = 500) -> Dict[str, int]:
+    """
+    Preenche as chaves de busca normalizadas de registros antigos
+    (criados antes das colunas existirem), em lotes com bulk_update.
+    """
+    targets = (
+        (Produto, {'search_name': 'name'}),
+        (Customer, {'search_name': 'full_name'}),
+        (
+            Fornecedor,
+            {'search_name': 'razao_social', 'search_trade_name': 'nome_fantasia'},
+        ),
+    )
+
+    updated: Dict[str, int] = {}
+    for model, key_fields in targets:
+        total = 0
+        while True:
+            rows = await model.filter(search_name__isnull=True).limit(
+                batch_size
+            )
+            if not rows:
+                break
+
+            for row in rows:
+                for key, source in key_fields.items():
+                    setattr(
+                        row, key, normalize_text(getattr(row, source)) or None
+                    )
+                # search_name nunca fica nulo, senão o laço não termina
+                row.search_name = row.search_name or ''
+
+            await model.bulk_update(rows, fields=list(key_fields))
+            total += len(rows)
+
+        updated[model.__name__] = total
+        if total:
+            LOGGER.info(
+                f'Chaves de busca preenchidas para {total} registros de {model.__name__}'
+            )
+
+    return updated
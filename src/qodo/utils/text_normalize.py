@@ -0,0 +1,43 @@
+import re
+import unicodedata
+from typing import Any, List, Set
+
+"""
+text_normalize: Funções de normalização de texto usadas nas buscas.
+
+"Pão Francês", "PAO FRANCES" e "pão  francês" devem gerar a mesma chave,
+por isso removemos acentos, aplicamos casefold e colapsamos espaços.
+"""
+
+_WHITESPACE = re.compile(r'\s+')
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_text(value: Any) -> str:
+    """Remove acentos, aplica casefold e colapsa espaços em branco."""
+    if value is None:
+        return ''
+
+    text = unicodedata.normalize('NFKD', str(value))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _WHITESPACE.sub(' ', text.casefold()).strip()
+
+
+def tokenize(value: Any) -> List[str]:
+    """Quebra o texto normalizado em palavras alfanuméricas."""
+    return [token for token in _NON_ALNUM.split(normalize_text(value)) if token]
+
+
+def compact_code(value: Any) -> str:
+    """Normaliza códigos (produto, barras) removendo espaços e separadores."""
+    return ''.join(tokenize(value))
+
+
+def trigrams(value: Any) -> Set[str]:
+    """Gera os trigramas de cada palavra (com borda) do texto normalizado."""
+    grams: Set[str] = set()
+    for token in tokenize(value):
+        padded = f' {token} '
+        for index in range(len(padded) - 2):
+            grams.add(padded[index : index + 3])
+    return grams
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Pacote em src/ (layout do setup.py)
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')
+)
+
+from tortoise import Tortoise  # noqa: E402
+
+from qodo.conf.database import DatabaseConfig  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """
+    Executa uma corrotina com o Tortoise em um SQLite em memória (schema
+    completo, criado do zero a cada teste).
+    """
+
+    def run(factory):
+        from qodo.core.sales_rollup import sales_rollup
+
+        # Estado do processo que se refere ao banco anterior
+        sales_rollup._ready.clear()
+
+        async def main():
+            await Tortoise.init(
+                config=DatabaseConfig.get_sqlite_config(':memory:')
+            )
+            await Tortoise.generate_schemas()
+            try:
+                return await factory()
+            finally:
+                await Tortoise.close_connections()
+
+        return asyncio.run(main())
+
+    return run
+
+
+async def create_company(name: str = 'Loja'):
+    from qodo.model.user import Usuario
+
+    return await Usuario.create(
+        username=name,
+        email=f'{name.lower()}@example.com',
+        password='secret',
+        company_name=name,
+    )
+
+
+async def create_product(company, **values):
+    from qodo.model.product import Produto
+
+    defaults = {
+        'product_code': values.get('name', 'P'),
+        'name': 'Produto',
+        'cost_price': 1.0,
+        'price_uni': 1.0,
+        'sale_price': 2.0,
+    }
+    return await Produto.create(usuario=company, **{**defaults, **values})
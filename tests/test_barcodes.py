@@ -0,0 +1,27 @@
+from conftest import create_company, create_product
+
+from qodo.utils.sales_code_generator import (
+    barcode_generator,
+    ean13,
+    reserve_internal_eans,
+)
+
+
+def test_internal_codes_share_one_sequence(db):
+    async def scenario():
+        company = await create_company()
+        await create_product(
+            company, product_code='A1', lot_bar_code=ean13('200000000005')
+        )
+        await create_product(company, product_code='B1', lot_bar_code='')
+        await create_product(company, product_code='C1', lot_bar_code='')
+
+        catalog = await barcode_generator(company.id)
+        reserved = await reserve_internal_eans(company.id, 2)
+        return catalog, reserved
+
+    catalog, reserved = db(scenario)
+    codes = {row['product_code']: row['lot_bar_code'] for row in catalog}
+    assert codes['B1'] == ean13('200000000006')
+    assert codes['C1'] == ean13('200000000007')
+    assert reserved == [ean13('200000000008'), ean13('200000000009')]
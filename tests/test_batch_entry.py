@@ -0,0 +1,89 @@
+from conftest import create_company, create_product
+
+from qodo.controllers.products.inventario.batch_entry import (
+    BatchStockEntry,
+    document_from_list,
+)
+from qodo.core.stock_summary import stock_summary
+
+
+def test_cost_update_refreshes_stock_value(db):
+    async def scenario():
+        company = await create_company()
+        await create_product(
+            company, product_code='A1', stock=10, cost_price=2.0
+        )
+        await stock_summary.rebuild(company.id)
+
+        document = document_from_list(
+            [{'code': 'A1', 'quantity': 5, 'unit_cost': 3.0}]
+        )
+        await BatchStockEntry(company.id, document, update_cost=True).apply()
+        return await stock_summary.get(company.id)
+
+    summary = db(scenario)
+    assert summary['total_itens'] == 15
+    assert summary['valor_custo'] == 45.0
+
+
+NFE = '''<?xml version="1.0" encoding="UTF-8"?>
+<nfeProc xmlns="http://www.portalfiscal.inf.br/nfe">
+  <NFe><infNFe Id="NFe35260100000000000100550010000001231000001234">
+    <ide><nNF>123</nNF></ide>
+    <emit><CNPJ>00000000000100</CNPJ><xNome>Fornecedor</xNome></emit>
+    <det nItem="1"><prod>
+      <cProd>X-1</cProd><cEAN>7891000000001</cEAN><xProd>Arroz</xProd>
+      <uCom>UN</uCom><qCom>4.0000</qCom><vUnCom>20.00</vUnCom>
+    </prod></det>
+    <det nItem="2"><prod>
+      <cProd>A2</cProd><cEAN>SEM GTIN</cEAN><xProd>Feijao</xProd>
+      <uCom>UN</uCom><qCom>2.0000</qCom><vUnCom>8.00</vUnCom>
+    </prod></det>
+    <det nItem="3"><prod>
+      <cProd>X-3</cProd><cEAN>7891000000003</cEAN><xProd>Cafe</xProd>
+      <uCom>KG</uCom><qCom>1.5000</qCom><vUnCom>30.00</vUnCom>
+    </prod></det>
+  </infNFe></NFe>
+</nfeProc>'''.encode()
+
+
+def test_nfe_matches_only_by_ean_and_reports_the_rest(db):
+    from fastapi import HTTPException
+
+    from qodo.controllers.products.inventario.batch_entry import (
+        document_from_nfe,
+    )
+
+    async def scenario():
+        from qodo.model.product import Produto
+
+        company = await create_company()
+        rice = await create_product(
+            company, product_code='A1', lot_bar_code='7891000000001', stock=1
+        )
+        # Código da loja igual ao cProd do fornecedor: não pode casar
+        beans = await create_product(company, product_code='A2', stock=1)
+        await create_product(
+            company, product_code='A3', lot_bar_code='7891000000003', stock=1
+        )
+
+        try:
+            await BatchStockEntry(company.id, document_from_nfe(NFE)).apply()
+        except HTTPException as e:
+            refused = e.detail['nao_encontrados']
+        result = await BatchStockEntry(
+            company.id, document_from_nfe(NFE), allow_partial=True
+        ).apply()
+        stocks = dict(
+            await Produto.filter(id__in=[rice.id, beans.id]).values_list(
+                'product_code', 'stock'
+            )
+        )
+        return refused, result, stocks
+
+    refused, result, stocks = db(scenario)
+    assert [item['line'] for item in refused] == [2, 3]
+    assert refused[0]['supplier_code'] == 'A2'
+    assert result['produtos_atualizados'] == 1
+    assert len(result['nao_encontrados']) == 2
+    assert stocks == {'A1': 5, 'A2': 1}
@@ -0,0 +1,81 @@
+from conftest import create_company, create_product
+
+from qodo.controllers.products.bulk_import import ImportJob, ProductImporter
+from qodo.core.stock_ledger import ADJUSTMENT
+from qodo.model.product import Produto
+from qodo.model.stock_movement import MovimentoEstoque
+
+CSV = (
+    'codigo;nome;estoque;custo;preco_venda\n'
+    'A1;Arroz 5kg;12;20,00;29,90\n'
+    'B2;Feijão;x;7,50;9,90\n'
+    'C3;Café 500g;4;12,00;18,50\n'
+)
+
+
+def test_import_records_stock_overwrite_in_ledger(db, tmp_path):
+    path = tmp_path / 'produtos.csv'
+    path.write_text(CSV, encoding='utf-8')
+
+    async def scenario():
+        company = await create_company()
+        existing = await create_product(
+            company, product_code='A1', name='Arroz', stock=5
+        )
+        job = ImportJob(id='job1', usuario_id=company.id, filename=path.name)
+        await ProductImporter(job, str(path), remove_file=False).run()
+        await existing.refresh_from_db()
+        movements = await MovimentoEstoque.filter(
+            usuario_id=company.id
+        ).values_list('produto_id', 'quantidade', 'tipo')
+        created = await Produto.filter(
+            usuario_id=company.id, product_code='C3'
+        ).exists()
+        return job, existing, movements, created
+
+    job, existing, movements, created = db(scenario)
+    assert job.status == 'concluido', job.message
+    assert (job.created, job.updated, job.failed) == (1, 1, 1)
+    assert job.errors[0]['line'] == 3
+    assert created
+    assert existing.stock == 12
+    assert movements == [(existing.id, 7, ADJUSTMENT)]
+
+
+def test_import_updates_only_filled_cells(db, tmp_path):
+    path = tmp_path / 'precos.csv'
+    path.write_text(
+        'codigo;preco_venda;estoque\nA1;15,00;\nZ9;3,00;1\n', encoding='utf-8'
+    )
+
+    async def scenario():
+        company = await create_company()
+        existing = await create_product(
+            company,
+            product_code='A1',
+            name='Arroz',
+            stock=5,
+            stoke_min=2,
+            active=False,
+        )
+        job = ImportJob(id='job2', usuario_id=company.id, filename=path.name)
+        await ProductImporter(job, str(path), remove_file=False).run()
+        await existing.refresh_from_db()
+        movements = await MovimentoEstoque.filter(
+            usuario_id=company.id
+        ).count()
+        return job, existing, movements
+
+    job, existing, movements = db(scenario)
+    assert job.status == 'concluido', job.message
+    # Z9 não existe e a linha não tem os campos do cadastro
+    assert (job.created, job.updated, job.failed) == (0, 1, 1)
+    assert job.errors[0]['line'] == 3
+    assert existing.sale_price == 15.0
+    assert (existing.name, existing.stock, existing.stoke_min) == (
+        'Arroz',
+        5,
+        2,
+    )
+    assert existing.active is False
+    assert movements == 0
@@ -0,0 +1,51 @@
+import asyncio
+
+from qodo.core import cache
+from qodo.core.cache import FallbackCache, MemoryBackend
+
+
+def test_job_lock_without_redis(monkeypatch):
+    async def acquire_twice():
+        client = FallbackCache(primary=None, fallback=MemoryBackend())
+        return (
+            client.shared_locks,
+            await client.acquire_lock('lock:job', 60),
+            await client.acquire_lock('lock:job', 60),
+        )
+
+    # Um worker: a memória basta e o lock funciona
+    monkeypatch.setattr(cache, 'WORKERS', 1)
+    assert asyncio.run(acquire_twice()) == (True, True, False)
+
+    # Vários workers sem Redis: nenhum worker roda o job
+    monkeypatch.setattr(cache, 'WORKERS', 4)
+    assert asyncio.run(acquire_twice()) == (False, False, False)
+
+
+def test_cached_skips_memory_cache_with_many_workers(monkeypatch):
+    from qodo.core import cache_tags, cached as cached_module
+    from qodo.core.cache_tags import TAG_SALES
+
+    calls = []
+
+    @cached_module.cached(
+        'test:payments:{user_id}', ttl=600, tags=(TAG_SALES,)
+    )
+    async def payments(user_id: int):
+        calls.append(user_id)
+        return len(calls)
+
+    async def call_twice():
+        memory = FallbackCache(primary=None, fallback=MemoryBackend())
+        monkeypatch.setattr(cache_tags, 'client', memory)
+        monkeypatch.setattr(cached_module, 'client', memory)
+        return await payments(1), await payments(1)
+
+    # Um worker: a segunda chamada vem do cache
+    monkeypatch.setattr(cache, 'WORKERS', 1)
+    assert asyncio.run(call_twice()) == (1, 1)
+
+    # Vários workers sem Redis: sempre recalcula no banco
+    calls.clear()
+    monkeypatch.setattr(cache, 'WORKERS', 4)
+    assert asyncio.run(call_twice()) == (1, 2)
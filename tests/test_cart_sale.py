@@ -0,0 +1,121 @@
+from conftest import create_company, create_product
+
+from qodo.controllers.sales.services import processar_venda_carrinho
+from qodo.core.barcode_map import barcode_map
+from qodo.model.product import Produto
+
+
+def test_sale_uses_current_price_not_code_map(db):
+    async def scenario():
+        company = await create_company()
+        product = await create_product(
+            company, product_code='789', stock=5, sale_price=2.0,
+            cost_price=1.0,
+        )
+        await barcode_map.preload(company.id)
+        # Reajuste de preço que o mapa em memória ainda não viu
+        await Produto.filter(id=product.id).update(sale_price=3.5)
+
+        result = await processar_venda_carrinho(
+            company.id,
+            [{'product_code': '789', 'quantity': 2, 'product_name': 'P'}],
+            'PIX',
+            None,
+        )
+        await product.refresh_from_db()
+        barcode_map.invalidate(company.id)
+        return result, product
+
+    result, product = db(scenario)
+    assert result['success'], result
+    assert result['data']['total_venda'] == 7.0
+    assert product.stock == 3
+
+
+def test_stock_changes_only_invalidate_the_company(db):
+    from qodo.controllers.sales.delete_sales import delete_or_update_sale
+    from qodo.core.cache import client
+    from qodo.core.cache_tags import (
+        GENERATION_KEY,
+        GLOBAL_SCOPE,
+        TAG_PRODUCTS,
+    )
+
+    async def scenario():
+        company = await create_company()
+        product = await create_product(company, product_code='42', stock=5)
+        global_key = GENERATION_KEY.format(
+            scope=GLOBAL_SCOPE, tag=TAG_PRODUCTS
+        )
+        company_key = GENERATION_KEY.format(
+            scope=company.id, tag=TAG_PRODUCTS
+        )
+        before = (await client.get(global_key), await client.get(company_key))
+
+        result = await processar_venda_carrinho(
+            company.id,
+            [{'product_code': '42', 'quantity': 1, 'product_name': 'P'}],
+            'PIX',
+            None,
+        )
+        deleted = await delete_or_update_sale(
+            company.id, result['data']['venda_id']
+        )
+        after = (await client.get(global_key), await client.get(company_key))
+        await product.refresh_from_db()
+        barcode_map.invalidate(company.id)
+        return before, after, deleted, product
+
+    before, after, deleted, product = db(scenario)
+    assert deleted['status'] == 200, deleted
+    assert product.stock == 5
+    assert after[0] == before[0]
+    assert after[1] != before[1]
+
+
+def test_code_missing_from_map_is_found_in_the_database(db):
+    async def scenario():
+        company = await create_company()
+        await create_product(company, product_code='1', stock=5)
+        await barcode_map.preload(company.id)
+        # Criado por outro worker: este mapa ainda não o conhece
+        other = await create_product(company, product_code='2', stock=5)
+
+        result = await processar_venda_carrinho(
+            company.id,
+            [{'product_code': '2', 'quantity': 1, 'product_name': 'P'}],
+            'PIX',
+            None,
+        )
+        await other.refresh_from_db()
+        barcode_map.invalidate(company.id)
+        return result, other
+
+    result, other = db(scenario)
+    assert result['success'], result
+    assert other.stock == 4
+
+
+def test_unknown_code_rejects_the_whole_sale(db):
+    async def scenario():
+        company = await create_company()
+        product = await create_product(company, product_code='1', stock=5)
+
+        result = await processar_venda_carrinho(
+            company.id,
+            [
+                {'product_code': '1', 'quantity': 1, 'product_name': 'P'},
+                {'product_code': 'X9', 'quantity': 1, 'product_name': 'Q'},
+            ],
+            'PIX',
+            None,
+        )
+        await product.refresh_from_db()
+        barcode_map.invalidate(company.id)
+        return result, product
+
+    result, product = db(scenario)
+    assert not result['success']
+    assert result['nao_encontrados'] == ['X9']
+    # Nada lançado: a baixa do primeiro item foi desfeita
+    assert product.stock == 5
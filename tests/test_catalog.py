@@ -0,0 +1,35 @@
+from tortoise.transactions import in_transaction
+
+from conftest import create_company, create_product
+
+
+def test_stamp_rolls_back_with_the_write(db):
+    async def scenario():
+        from qodo.core.catalog import stamp
+        from qodo.model.catalog import CatalogVersion
+        from qodo.model.product import Produto
+
+        company = await create_company()
+        product = await create_product(company, name='Cafe')
+
+        version = await stamp(company.id, changed=(product.id,))
+        try:
+            async with in_transaction() as connection:
+                await Produto.filter(id=product.id).using_db(
+                    connection
+                ).update(stock=7)
+                await stamp(
+                    company.id, changed=(product.id,), using_db=connection
+                )
+                raise RuntimeError('falha depois da escrita')
+        except RuntimeError:
+            pass
+
+        current = await CatalogVersion.get(usuario_id=company.id)
+        product = await Produto.get(id=product.id)
+        return version, current.version, product.catalog_version
+
+    version, current, product_version = db(scenario)
+    assert version == 1
+    assert current == 1
+    assert product_version == 1
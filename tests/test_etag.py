@@ -0,0 +1,27 @@
+from conftest import create_company, create_product
+
+from qodo.core import cache
+from qodo.core.cache_tags import TAG_PRODUCTS, TAG_SALES
+from qodo.core.etag import tag_etag
+
+
+def test_product_etag_follows_catalog_version(db, monkeypatch):
+    # Vários workers sem Redis: só o ETag do catálogo (banco) é confiável
+    monkeypatch.setattr(cache, 'WORKERS', 4)
+
+    async def scenario():
+        from qodo.core.catalog import stamp
+
+        company = await create_company()
+        product = await create_product(company)
+        before = await tag_etag(company.id, 'etag:list', TAG_PRODUCTS)
+        again = await tag_etag(company.id, 'etag:list', TAG_PRODUCTS)
+        await stamp(company.id, changed=(product.id,))
+        after = await tag_etag(company.id, 'etag:list', TAG_PRODUCTS)
+        sales = await tag_etag(company.id, 'etag:profit', TAG_SALES)
+        return before, again, after, sales
+
+    before, again, after, sales = db(scenario)
+    assert before == again
+    assert after != before
+    assert sales is None
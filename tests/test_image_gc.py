@@ -0,0 +1,44 @@
+import os
+import time
+
+from conftest import create_company, create_product
+
+from qodo.controllers.products import image_pipeline
+from qodo.controllers.products.image_pipeline import (
+    VARIANTS,
+    image_gc,
+    variant_dir,
+    variant_path,
+)
+
+USED = 'a' * 64
+ORPHAN = 'b' * 64
+FRESH = 'c' * 64
+
+
+def _fake_store(digest, age):
+    target = variant_dir(digest)
+    target.mkdir(parents=True)
+    for name in VARIANTS:
+        variant_path(digest, name).write_bytes(b'webp')
+    moment = time.time() - age
+    os.utime(target, (moment, moment))
+
+
+def test_collect_keeps_used_and_recent_hashes(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(image_pipeline, 'STORE_DIR', tmp_path / 'cas')
+    _fake_store(USED, 7200)
+    _fake_store(ORPHAN, 7200)
+    # Upload do mesmo hash em andamento: reaproveitado há pouco
+    _fake_store(FRESH, 7200)
+    assert image_pipeline._touch(FRESH)
+
+    async def scenario():
+        company = await create_company()
+        await create_product(company, image_hash=USED)
+        return await image_gc.collect(grace=3600)
+
+    assert db(scenario) == 1
+    assert variant_dir(USED).exists()
+    assert variant_dir(FRESH).exists()
+    assert not variant_dir(ORPHAN).exists()
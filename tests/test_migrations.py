@@ -0,0 +1,63 @@
+def test_migrations_add_missing_columns_once(db):
+    async def scenario():
+        from tortoise import Tortoise
+
+        from qodo.conf.migrations import _Schema, apply_migrations
+
+        connection = Tortoise.get_connection('default')
+        schema = _Schema(connection)
+
+        # Banco criado antes das chaves de busca
+        for index in await connection.execute_query_dict(
+            'PRAGMA index_list("produto")'
+        ):
+            if index['name'].startswith(
+                (
+                    'idx_produto_search',
+                    'idx_produto_usuario',
+                    'idx_produto_image',
+                )
+            ):
+                await connection.execute_script(
+                    f'DROP INDEX "{index["name"]}"'
+                )
+        for index in await connection.execute_query_dict(
+            'PRAGMA index_list("sales")'
+        ):
+            if index['name'].startswith('idx_sales_usuario'):
+                await connection.execute_script(
+                    f'DROP INDEX "{index["name"]}"'
+                )
+        for column in ('search_name', 'catalog_version', 'image_hash'):
+            await connection.execute_script(
+                f'ALTER TABLE "produto" DROP COLUMN "{column}"'
+            )
+
+        first = await apply_migrations()
+        second = await apply_migrations()
+        return (
+            first,
+            second,
+            'search_name' in await schema.columns('produto'),
+            ('search_name',) in await schema.indexes('produto'),
+            ('usuario_id', 'catalog_version')
+            in await schema.indexes('produto'),
+            ('usuario_id', 'criado_em') in await schema.indexes('sales'),
+        )
+
+    (
+        first,
+        second,
+        has_column,
+        has_index,
+        has_version_index,
+        has_sales_index,
+    ) = db(scenario)
+    # 3 colunas e 5 índices (busca, versão do catálogo, validade, imagem
+    # e vendas por data)
+    assert len(first) == 8
+    assert second == []
+    assert has_column
+    assert has_index
+    assert has_version_index
+    assert has_sales_index
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from conftest import create_company, create_product
+
+from qodo.controllers.sales import separate_payment_methods
+from qodo.controllers.sales.separate_payment_methods import (
+    separating_sales_by_payments,
+)
+from qodo.core.sales_rollup import today
+from qodo.model.sale import Sales
+
+
+def test_completed_sales_keep_sales_list(db):
+    async def scenario():
+        company = await create_company()
+        product = await create_product(company, name='Cafe')
+        sale = await Sales.create(
+            usuario=company,
+            produto=product,
+            product_name='Cafe',
+            quantity=2,
+            total_price=8.0,
+            cost_price=4.0,
+            lucro_total=4.0,
+            sale_code='B00001',
+            payment_method='PIX',
+        )
+        return sale.id, await separating_sales_by_payments(company.id)
+
+    sale_id, result = db(scenario)
+    assert result['PIX']['total_value'] == 'R$ 8.00'
+    assert result['CARTAO']['sales_list'] == []
+    (listed,) = result['PIX']['sales_list']
+    assert listed['id'] == sale_id
+    assert listed['Product_name'] == 'Cafe'
+    assert listed['amount'] == 2
+    assert listed['price'] == 8.0
+    assert set(listed) == {'id', 'Product_name', 'amount', 'price', 'date'}
+
+
+def test_sales_list_follows_the_current_day(db, monkeypatch):
+    async def scenario():
+        company = await create_company()
+        product = await create_product(company, name='Cafe')
+        await Sales.create(
+            usuario=company,
+            produto=product,
+            product_name='Cafe',
+            quantity=1,
+            total_price=5.0,
+            cost_price=2.0,
+            lucro_total=3.0,
+            sale_code='B00002',
+            payment_method='PIX',
+        )
+        tomorrow = today() + timedelta(days=1)
+        monkeypatch.setattr(
+            separate_payment_methods, 'today', lambda: tomorrow
+        )
+        return await separating_sales_by_payments(company.id)
+
+    result = db(scenario)
+    assert result['PIX']['sales_count'] == 1
+    assert result['PIX']['sales_list'] == []
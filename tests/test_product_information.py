@@ -0,0 +1,31 @@
+from conftest import create_company, create_product
+
+
+def test_products_by_category_pages_one_category(db):
+    from qodo.controllers.products.monitoring_products import ProductInfo
+    from qodo.core.stock_summary import UNCATEGORIZED
+
+    async def scenario():
+        company = await create_company()
+        for code in ('A1', 'A2', 'A3'):
+            await create_product(company, product_code=code, group='Bebidas')
+        await create_product(company, product_code='B1', group='Doces')
+        await create_product(company, product_code='C1')
+
+        info = ProductInfo(company.id)
+        first = await info.get_products_by_category('Bebidas', limit=2)
+        second = await info.get_products_by_category(
+            'Bebidas', first['next_cursor'], limit=2
+        )
+        loose = await info.get_products_by_category(UNCATEGORIZED)
+        return first, second, loose, await info.get_category_rollups()
+
+    first, second, loose, categories = db(scenario)
+    assert len(first['items']) == 2 and first['has_more']
+    assert len(second['items']) == 1 and not second['has_more']
+    assert [item['category'] for item in loose['items']] == [UNCATEGORIZED]
+    assert {row['category']: row['total_produtos'] for row in categories} == {
+        'Bebidas': 3,
+        'Doces': 1,
+        UNCATEGORIZED: 1,
+    }
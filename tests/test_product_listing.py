@@ -0,0 +1,22 @@
+from conftest import create_company, create_product
+
+from qodo.controllers.products.product_listing import (
+    count_products,
+    list_products_page,
+)
+
+
+def test_count_covers_every_page(db):
+    async def scenario():
+        company = await create_company()
+        for code in ('A1', 'A2', 'A3'):
+            await create_product(company, product_code=code, group='Bebidas')
+        await create_product(company, product_code='B1', group='Doces')
+
+        page = await list_products_page(company.id, limit=2, group='Bebidas')
+        total = await count_products(company.id, group='Bebidas')
+        return page, total
+
+    page, total = db(scenario)
+    assert len(page['items']) == 2 and page['has_more']
+    assert total == 3
@@ -0,0 +1,20 @@
+from datetime import date
+
+
+def test_reports_on_an_empty_period(monkeypatch, tmp_path):
+    from qodo.controllers import report_controller
+    from qodo.core import analytics_export
+
+    monkeypatch.setattr(analytics_export, 'ANALYTICS_DIR', tmp_path)
+    start, end = date(2026, 1, 1), date(2026, 1, 31)
+
+    margins = report_controller.margin_analysis(1, start, end, 10)
+    assert margins['margem_geral'] == 0.0
+    assert margins['maiores_lucros'] == []
+    assert margins['menores_margens'] == []
+    assert set(margins['faixas'].values()) == {0}
+
+    comparison = report_controller.period_comparison(1, start, end)
+    assert comparison['atual']['totais']['receita'] == 0.0
+    assert comparison['atual']['por_pagamento'] == {}
+    assert set(comparison['variacao'].values()) == {0.0}
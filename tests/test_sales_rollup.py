@@ -0,0 +1,49 @@
+import asyncio
+
+from conftest import create_company, create_product
+
+from qodo.core.sales_rollup import sales_rollup
+from qodo.model.sale import Sales
+from qodo.model.sales_rollup import SalesRollupState
+
+
+async def _sale(company, product, code, total):
+    return await Sales.create(
+        usuario=company,
+        produto=product,
+        product_name='P',
+        quantity=1,
+        total_price=total,
+        cost_price=total / 2,
+        lucro_total=total / 2,
+        sale_code=code,
+        payment_method='PIX',
+    )
+
+
+def test_concurrent_ensure_builds_once(db):
+    async def scenario():
+        company = await create_company()
+        product = await create_product(company)
+        await _sale(company, product, 'A00001', 10.0)
+        await _sale(company, product, 'A00002', 5.0)
+        sales_rollup._ready.discard(company.id)
+
+        await asyncio.gather(
+            sales_rollup.ensure(company.id), sales_rollup.ensure(company.id)
+        )
+        # Venda depois da reconstrução: soma incremental
+        sale = await _sale(company, product, 'A00003', 2.5)
+        await sales_rollup.record_sale(sale)
+
+        states = await SalesRollupState.filter(
+            usuario_id=company.id
+        ).values_list('completo', flat=True)
+        totals = await sales_rollup.totals(company.id)
+        sales_rollup._ready.discard(company.id)
+        return states, totals
+
+    states, totals = db(scenario)
+    assert states == [True]
+    assert totals['vendas'] == 3
+    assert totals['receita'] == 17.5
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+
+from conftest import create_company, create_product
+
+from qodo.core.stock_alerts import stock_alerts
+
+
+def test_page_keeps_both_alerts_of_a_product(db):
+    async def scenario():
+        company = await create_company()
+        expired = datetime.now() - timedelta(days=1)
+        for name in ('A', 'B', 'C'):
+            # Cada produto gera reposição e validade
+            await create_product(
+                company, name=name, stock=0, stoke_min=1,
+                date_expired=expired,
+            )
+        await stock_alerts.reconcile(company.id)
+
+        seen, cursor = [], None
+        while True:
+            page = await stock_alerts.page(company.id, cursor=cursor, limit=1)
+            seen.extend(
+                (item['product_id'], item['tipo']) for item in page['items']
+            )
+            if not page['has_more']:
+                return seen
+            cursor = page['next_cursor']
+
+    seen = db(scenario)
+    assert len(seen) == 6
+    assert len(set(seen)) == 6
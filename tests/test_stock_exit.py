@@ -0,0 +1,38 @@
+from conftest import create_company, create_product
+
+from qodo.controllers.products.inventario.stoke_exit import StockExit
+
+
+def test_archive_publishes_after_commit(db, monkeypatch):
+    from tortoise import connections
+
+    from qodo.core import catalog
+
+    published = []
+
+    async def publish(user_id, event):
+        # Conexão em uso no momento do evento: transação ainda aberta?
+        connection = connections.get('default')
+        published.append((event['type'], type(connection).__name__))
+
+    monkeypatch.setattr(catalog.event_bus, 'publish', publish)
+
+    async def scenario():
+        from qodo.model.catalog import ProdutoRemovido
+        from qodo.model.product import Produto
+
+        company = await create_company()
+        product = await create_product(company, product_code='A1', stock=3)
+        await StockExit(
+            company_id=company.id, product_code='A1', detail='vencido'
+        ).remove_product_total()
+        return (
+            await Produto.filter(id=product.id).exists(),
+            await ProdutoRemovido.filter(produto_id=product.id).count(),
+        )
+
+    exists, tombstones = db(scenario)
+    assert not exists
+    assert tombstones == 1
+    assert [kind for kind, _ in published] == ['product.removed']
+    assert 'Transaction' not in published[0][1]
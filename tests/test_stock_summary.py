@@ -0,0 +1,62 @@
+from conftest import create_company, create_product
+
+from qodo.core.stock_summary import stock_summary
+from qodo.model.catalog import ResumoEstoque
+
+
+def test_rebuild_aggregates_in_sql(db):
+    async def scenario():
+        company = await create_company()
+        await create_product(
+            company, name='A', stock=10, stoke_min=2,
+            cost_price=1.5, sale_price=3.0, group='Bebidas',
+        )
+        await create_product(
+            company, name='B', stock=2, stoke_min=2,
+            cost_price=2.0, sale_price=5.0, group='Bebidas',
+        )
+        await create_product(
+            company, name='C', stock=0, stoke_min=1,
+            cost_price=4.0, sale_price=9.0,
+        )
+        summary = await stock_summary.rebuild(company.id)
+        categories = await stock_summary.by_category(company.id)
+        row = await ResumoEstoque.get(usuario_id=company.id)
+        return summary, categories, row
+
+    summary, categories, row = db(scenario)
+
+    assert summary == {
+        'total_produtos': 3,
+        'total_itens': 12,
+        'valor_custo': 19.0,
+        'valor_venda': 40.0,
+        # estoque <= mínimo (mesmo critério dos alertas)
+        'estoque_baixo': 2,
+    }
+    assert row.valor_custo == 19.0 and not row.desatualizado
+
+    by_name = {item['category']: item for item in categories}
+    assert by_name['Bebidas']['valor_venda'] == 40.0
+    assert by_name['Bebidas']['estoque_baixo'] == 1
+    assert by_name['Sem categoria']['total_itens'] == 0
+
+
+def test_apply_deltas_tracks_low_stock(db):
+    async def scenario():
+        company = await create_company()
+        product = await create_product(
+            company, stock=5, stoke_min=3, cost_price=1.0, sale_price=2.0
+        )
+        await stock_summary.rebuild(company.id)
+
+        # Venda de 2 unidades: estoque chega ao mínimo
+        product.stock = 3
+        await product.save()
+        await stock_summary.apply_deltas(company.id, {product.id: -2})
+        return await stock_summary.get(company.id)
+
+    summary = db(scenario)
+    assert summary['total_itens'] == 3
+    assert summary['valor_custo'] == 3.0
+    assert summary['estoque_baixo'] == 1
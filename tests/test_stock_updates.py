@@ -0,0 +1,78 @@
+from contextlib import asynccontextmanager
+
+from conftest import create_company, create_product
+from tortoise.expressions import F
+
+from qodo.core.stock_ledger import ADJUSTMENT, REVERSAL
+
+
+def test_deleted_sale_keeps_concurrent_stock_changes(db, monkeypatch):
+    from qodo.controllers.sales import delete_sales
+    from qodo.model.product import Produto
+    from qodo.model.sale import Sales
+
+    in_transaction = delete_sales.in_transaction
+
+    @asynccontextmanager
+    async def after_concurrent_sale():
+        # Outra venda baixa o estoque depois que a rota leu o produto
+        await Produto.all().update(stock=F('stock') - 2)
+        async with in_transaction() as connection:
+            yield connection
+
+    monkeypatch.setattr(
+        delete_sales, 'in_transaction', after_concurrent_sale
+    )
+
+    async def scenario():
+        from qodo.model.stock_movement import MovimentoEstoque
+
+        company = await create_company()
+        product = await create_product(company, product_code='A1', stock=10)
+        sale = await Sales.create(
+            usuario=company,
+            produto=product,
+            product_name=product.name,
+            quantity=3,
+            total_price=6.0,
+            cost_price=3.0,
+            payment_method='PIX',
+        )
+        result = await delete_sales.delete_or_update_sale(company.id, sale.id)
+        await product.refresh_from_db()
+        movements = await MovimentoEstoque.filter(
+            usuario_id=company.id
+        ).values_list('quantidade', 'tipo')
+        return result, product.stock, movements
+
+    result, stock, movements = db(scenario)
+    assert result['status'] == 200, result
+    assert stock == 11
+    assert movements == [(3, REVERSAL)]
+
+
+def test_product_update_records_stock_adjustment(db):
+    from qodo.routes.products.update import update_product
+    from qodo.schemas.schema_product import ProductUpdateSchema
+
+    async def scenario():
+        from qodo.model.product import Produto
+        from qodo.model.stock_movement import MovimentoEstoque
+
+        company = await create_company()
+        product = await create_product(company, product_code='A1', stock=10)
+        await update_product(
+            code='A1',
+            name=None,
+            update_data=ProductUpdateSchema(stock=4, sale_price=3.5),
+            current_user=company,
+        )
+        product = await Produto.get(id=product.id)
+        movements = await MovimentoEstoque.filter(
+            usuario_id=company.id
+        ).values_list('produto_id', 'quantidade', 'tipo')
+        return product, movements
+
+    product, movements = db(scenario)
+    assert (product.stock, product.sale_price) == (4, 3.5)
+    assert movements == [(product.id, -6, ADJUSTMENT)]